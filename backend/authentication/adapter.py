@@ -1,11 +1,46 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from allauth.account.adapter import DefaultAccountAdapter
 
+from core.timing import phase
+
+from .metrics import EMAIL_SEND_LATENCY, EMAILS_SENT
 from .utils import generate_verification_code
 
+_deferred_mail = ContextVar("deferred_mail", default=None)
+
+
+@contextmanager
+def deferred_mail():
+    """
+    Queue emails sent through the adapter and deliver them when the block
+    exits cleanly; they are dropped if it raises.
+
+    Wrap it around ``transaction.atomic()`` so that no SMTP round trip
+    happens while the transaction holds its locks, and no email goes out for
+    rows that were rolled back.
+    """
+    queue = []
+    token = _deferred_mail.set(queue)
+    try:
+        yield
+    finally:
+        _deferred_mail.reset(token)
+    for send in queue:
+        send()
+
 
 class CustomAccountAdapter(DefaultAccountAdapter):
     """Send short verification codes for email confirmation."""
 
+    def add_message(self, request, *args, **kwargs):
+        # API clients never render Django messages; storing them only grows
+        # the messages cookie that is re-encoded on every later response
+        if request.path.startswith("/api/"):
+            return
+        super().add_message(request, *args, **kwargs)
+
     def send_confirmation_mail(self, request, emailconfirmation, signup):
         ctx = {
             "user": emailconfirmation.email_address.user,
@@ -30,3 +65,15 @@ class CustomAccountAdapter(DefaultAccountAdapter):
             email_template = "account/email/email_confirmation"
 
         self.send_mail(email_template, emailconfirmation.email_address.email, ctx)
+
+    def send_mail(self, template_prefix, email, context):
+        queue = _deferred_mail.get()
+        if queue is not None:
+            queue.append(lambda: self._send_mail(template_prefix, email, context))
+        else:
+            self._send_mail(template_prefix, email, context)
+
+    def _send_mail(self, template_prefix, email, context):
+        with EMAIL_SEND_LATENCY.time(template=template_prefix), phase("email"):
+            super().send_mail(template_prefix, email, context)
+        EMAILS_SENT.inc(template=template_prefix)
@@ -1,5 +1,171 @@
-from django.contrib import admin
+from allauth.account import signals
+from allauth.account.admin import EmailAddressAdmin
+from allauth.account.models import EmailAddress
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
 
-admin.site.register(User, UserAdmin)
+from core.paginator import EstimatedCountPaginator
+
+from .filters import verified_email_exists
+from .models import AuditEvent, User
+from .user_cache import invalidate_users
+
+
+def _verifiable(queryset):
+    """Exclude addresses already verified by another account."""
+    taken = EmailAddress.objects.filter(
+        email__iexact=OuterRef("email"), verified=True
+    ).exclude(pk=OuterRef("pk"))
+    return queryset.filter(verified=False).exclude(Exists(taken))
+
+
+def _verify_addresses(request, queryset):
+    """Mark addresses verified with one UPDATE; returns the number updated."""
+    queryset = _verifiable(queryset)
+    if signals.email_confirmed.has_listeners(EmailAddress):
+        addresses = list(queryset)
+        updated = EmailAddress.objects.filter(
+            pk__in=[address.pk for address in addresses]
+        ).update(verified=True)
+        invalidate_users({address.user_id for address in addresses})
+        for address in addresses:
+            address.verified = True
+            signals.email_confirmed.send(
+                sender=EmailAddress, request=request, email_address=address
+            )
+        return updated
+    rows = dict(queryset.values_list("pk", "user_id"))
+    updated = EmailAddress.objects.filter(pk__in=rows).update(verified=True)
+    # update() skips post_save, so drop cached state explicitly
+    invalidate_users(set(rows.values()))
+    return updated
+
+
+class EmailVerifiedFilter(admin.SimpleListFilter):
+    title = _("email verified")
+    parameter_name = "email_verified"
+
+    def lookups(self, request, model_admin):
+        return (("yes", _("Yes")), ("no", _("No")))
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(email_verified=True)
+        if self.value() == "no":
+            return queryset.filter(email_verified=False)
+        return queryset
+
+
+@admin.register(User)
+class CustomUserAdmin(UserAdmin):
+    list_display = (
+        "username",
+        "email",
+        "email_verified",
+        "first_name",
+        "last_name",
+        "is_active",
+        "is_staff",
+    )
+    list_filter = ("is_active", "is_staff", "is_superuser", EmailVerifiedFilter)
+    actions = ["verify_emails", "deactivate_users"]
+    # Large user tables: no COUNT(*) for the unfiltered total
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(email_verified=verified_email_exists())
+        )
+
+    @admin.display(
+        boolean=True, ordering="email_verified", description=_("email verified")
+    )
+    def email_verified(self, obj):
+        return obj.email_verified
+
+    @admin.action(description=_("Verify email addresses of selected users"))
+    def verify_emails(self, request, queryset):
+        users = queryset.exclude(email="")
+        verified = _verify_addresses(
+            request, EmailAddress.objects.filter(user__in=users.values("pk"))
+        )
+
+        # Users registered before allauth tracked their address
+        missing = users.filter(
+            ~Exists(EmailAddress.objects.filter(user=OuterRef("pk")))
+        ).values_list("pk", "email")
+        created = EmailAddress.objects.bulk_create(
+            [
+                EmailAddress(user_id=pk, email=email, verified=True, primary=True)
+                for pk, email in missing
+            ],
+            ignore_conflicts=True,
+        )
+        invalidate_users([address.user_id for address in created])
+
+        self.message_user(
+            request,
+            _("Verified %(count)d email address(es).")
+            % {"count": verified + len(created)},
+            level=messages.SUCCESS,
+        )
+
+    @admin.action(description=_("Deactivate selected users"))
+    def deactivate_users(self, request, queryset):
+        ids = list(queryset.filter(is_active=True).values_list("pk", flat=True))
+        updated = User.objects.filter(pk__in=ids).update(is_active=False)
+        # update() skips post_save, so drop cached state explicitly
+        invalidate_users(ids)
+        self.message_user(
+            request,
+            _("Deactivated %(count)d user(s).") % {"count": updated},
+            level=messages.SUCCESS,
+        )
+
+
+class BulkEmailAddressAdmin(EmailAddressAdmin):
+    """allauth's EmailAddress admin with a set-based verify action."""
+
+    list_select_related = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.action(description=_("Mark selected email addresses as verified"))
+    def make_verified(self, request, queryset):
+        updated = _verify_addresses(request, queryset)
+        self.message_user(
+            request,
+            _("Marked %(count)d email address(es) as verified.") % {"count": updated},
+            level=messages.SUCCESS,
+        )
+
+
+admin.site.unregister(EmailAddress)
+admin.site.register(EmailAddress, BulkEmailAddressAdmin)
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    """Read-only view of the append-only audit log."""
+
+    list_display = ("created_at", "event_type", "email", "user_id", "ip_address")
+    list_filter = ("event_type",)
+    search_fields = ("=email",)
+    # Newest first along the primary key (events are appended in time order)
+    ordering = ("-pk",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,137 @@
+"""
+Buffered writer for ``AuditEvent`` rows.
+
+``record()`` only builds an unsaved model instance and appends it to an
+in-process buffer; a background thread writes the buffer with one
+``bulk_create`` every ``AUDIT_FLUSH_INTERVAL`` seconds, or sooner once
+``AUDIT_BATCH_SIZE`` events are waiting. Request handlers therefore never
+wait on an insert, and events recorded inside a transaction that is later
+rolled back are still kept. The buffer is bounded (``AUDIT_MAX_BUFFER``);
+when the database can't keep up, the oldest events are dropped and counted.
+
+Values come from untrusted requests, so ``email`` is truncated to fit its
+column, and a batch the database rejects is split in halves until the
+offending rows are isolated: one bad row never costs the rest of the batch.
+
+With ``AUDIT_FLUSH_INTERVAL = None`` (the test settings) no thread is
+started and events are written by calling ``flush()``.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+
+from .metrics import AUDIT_EVENTS
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+EMAIL_MAX_LENGTH = AuditEvent._meta.get_field("email").max_length
+
+
+class AuditWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer = deque()
+        self._thread = None
+        self._pid = None
+
+    def record(self, event_type, email="", user_id=None, ip_address=None, **data):
+        event = AuditEvent(
+            event_type=event_type,
+            email=str(email or "")[:EMAIL_MAX_LENGTH],
+            user_id=user_id,
+            ip_address=ip_address or None,
+            data=data,
+        )
+        with self._lock:
+            if len(self._buffer) >= settings.AUDIT_MAX_BUFFER:
+                self._buffer.popleft()
+                AUDIT_EVENTS.inc(outcome="dropped")
+            self._buffer.append(event)
+            pending = len(self._buffer)
+        self._ensure_thread()
+        if pending >= settings.AUDIT_BATCH_SIZE:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every buffered event now; returns the number written."""
+        with self._lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+        if not events:
+            return 0
+        try:
+            written = self._write(events)
+        except Exception:
+            logger.exception(
+                "Dropping %d audit events that could not be written", len(events)
+            )
+            written = 0
+        if written < len(events):
+            AUDIT_EVENTS.inc(len(events) - written, outcome="dropped")
+        if written:
+            AUDIT_EVENTS.inc(written, outcome="written")
+        return written
+
+    def _write(self, events):
+        """
+        Insert ``events``, bisecting on errors caused by row values; returns
+        the number written. Other errors (e.g. the database being down)
+        propagate and drop the batch.
+        """
+        try:
+            with transaction.atomic():
+                AuditEvent.objects.bulk_create(
+                    events, batch_size=settings.AUDIT_BATCH_SIZE
+                )
+            return len(events)
+        except (DataError, IntegrityError):
+            if len(events) == 1:
+                logger.exception("Dropping an audit event the database rejected")
+                return 0
+        middle = len(events) // 2
+        return self._write(events[:middle]) + self._write(events[middle:])
+
+    def clear(self):
+        with self._lock:
+            self._buffer.clear()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _ensure_thread(self):
+        interval = settings.AUDIT_FLUSH_INTERVAL
+        pid = os.getpid()
+        if interval is None or self._pid == pid:
+            return
+        with self._lock:
+            # Threads don't survive a fork; start one per worker process
+            if self._pid != pid:
+                self._thread = threading.Thread(
+                    target=self._run, args=(interval,), name="audit-writer", daemon=True
+                )
+                self._thread.start()
+                self._pid = pid
+
+    def _run(self, interval):
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+
+
+audit_writer = AuditWriter()
+record = audit_writer.record
+flush = audit_writer.flush
+
+# Write what is still buffered when a worker shuts down cleanly
+atexit.register(audit_writer.flush)
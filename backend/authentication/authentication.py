@@ -0,0 +1,21 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from .user_cache import is_user_active
+
+
+class CachedUserJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that doesn't load the user row.
+
+    ``request.user`` is simplejwt's ``TokenUser`` built from the token claims;
+    deleted and deactivated accounts are rejected through the cached active
+    flag of ``authentication.user_cache`` instead of a query.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not is_user_active(user.id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,41 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .user_cache import cached_permissions
+
+PERM_CACHE_ATTRS = {"user": "_user_perm_cache", "group": "_group_perm_cache"}
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` whose permission lookups are shared across requests.
+
+    ``ModelBackend`` only caches permissions on the user instance, and JWT
+    authentication loads a fresh instance per request, so every request that
+    checks a permission paid for the group and permission queries again. Here
+    both sets are loaded together and kept in the cache (see
+    ``authentication.user_cache``) until the user's groups or permissions
+    change.
+
+    Only ``has_perm``-style checks go through here: the Django admin and any
+    view whose permission class asks for a model permission. The API's admin
+    endpoints (user list and export) use ``IsAdminUser``, which reads
+    ``is_staff`` from the request's user and never reaches this backend.
+    """
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        if not hasattr(user_obj, PERM_CACHE_ATTRS[from_name]):
+            perms = cached_permissions(
+                user_obj.pk, lambda: self._load_permissions(user_obj)
+            )
+            for name, attr in PERM_CACHE_ATTRS.items():
+                setattr(user_obj, attr, perms[name])
+        return getattr(user_obj, PERM_CACHE_ATTRS[from_name])
+
+    def _load_permissions(self, user_obj):
+        return {
+            name: super(CachedModelBackend, self)._get_permissions(user_obj, None, name)
+            for name in PERM_CACHE_ATTRS
+        }
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The denylist, user and permission versions, idempotency locks and
+    verification status rely on every worker process seeing the same cache.
+    """
+    if settings.SHARED_CACHE:
+        return []
+    message = "The default cache is local to each process; workers won't see each other's writes."
+    hint = "Set REDIS_URL to a Redis server shared by all worker processes."
+    if settings.DEBUG:
+        return [Warning(message, hint=hint, id="authentication.W001")]
+    return [Error(message, hint=hint, id="authentication.E001")]
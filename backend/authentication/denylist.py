@@ -0,0 +1,159 @@
+"""
+Refresh token denylist.
+
+A revoked ``jti`` is written to the database (durable) and to the cache with
+a TTL equal to the token's remaining lifetime. Every worker keeps an
+in-process Bloom filter of revoked ids, kept current by fetching only recent
+rows whenever the shared version counter in the cache moves. Rows are
+fetched by revocation time with an overlap window rather than by primary
+key, because a revocation can commit after one with a higher id. The cache
+entry, the local filter and the version counter are only written once the
+revoking transaction commits. Checking a token that was never revoked - the common case -
+costs one cache read and a few bit probes; only Bloom filter hits go on to
+the cache entry and, if that was evicted, the database.
+"""
+
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+CACHE_PREFIX = "jwt_denylist"
+VERSION_KEY = f"{CACHE_PREFIX}:version"
+# Each sync re-reads revocations this far back from the previous one, so a
+# transaction that commits late (up to this long) is still picked up
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+class BloomFilter:
+    def __init__(self, size_bits, hashes):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bytearray(size_bits // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class TokenDenylist:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop local state; the next check rebuilds it from the database."""
+        self._bloom = None
+        self._synced_at = None
+        self._version = None
+
+    @property
+    def capacity(self):
+        # ~1% false positives with 7 hash functions at 10 bits per entry
+        return self.bloom_bits // 10
+
+    @property
+    def bloom_bits(self):
+        return getattr(settings, "JWT_DENYLIST_BLOOM_BITS", 1 << 24)
+
+    def _cache_key(self, jti):
+        return f"{CACHE_PREFIX}:{jti}"
+
+    def _rebuild(self):
+        now = timezone.now()
+        RevokedToken.objects.filter(expires_at__lte=now).delete()
+        bloom = BloomFilter(self.bloom_bits, hashes=7)
+        for jti in (
+            RevokedToken.objects.filter(expires_at__gt=now)
+            .values_list("jti", flat=True)
+            .iterator(chunk_size=10000)
+        ):
+            bloom.add(jti)
+        self._bloom = bloom
+        self._synced_at = now
+
+    def _sync(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, 0, timeout=None)
+            version = 0
+        if self._bloom is not None and version == self._version:
+            return
+
+        with self._lock:
+            if self._bloom is None or self._bloom.count > self.capacity:
+                self._rebuild()
+            else:
+                since = self._synced_at - SYNC_OVERLAP
+                self._synced_at = timezone.now()
+                for jti in RevokedToken.objects.filter(
+                    revoked_at__gte=since
+                ).values_list("jti", flat=True):
+                    # The overlap re-reads rows already in the filter
+                    if jti not in self._bloom:
+                        self._bloom.add(jti)
+            self._version = version
+
+    def revoke(self, jti, expires_at):
+        """Deny ``jti`` until ``expires_at`` (when the token expires anyway)."""
+        ttl = int((expires_at - timezone.now()).total_seconds())
+        if ttl <= 0:
+            return
+
+        # ignore_conflicts: revoking an already revoked token is a no-op
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True
+        )
+        # A revocation that is rolled back must not leave the token denied
+        transaction.on_commit(lambda: self._revoked(jti, ttl))
+
+    def _revoked(self, jti, ttl):
+        cache.set(self._cache_key(jti), 1, timeout=ttl)
+        if self._bloom is not None:
+            self._bloom.add(jti)
+        self._bump_version()
+
+    def _bump_version(self):
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, 1, timeout=None)
+            return
+        # Our own revocation is already in the local filter; only resync
+        # when another worker revoked something in between
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        if cache.get(self._cache_key(jti)):
+            return True
+        # Bloom false positive or evicted cache entry
+        return RevokedToken.objects.filter(
+            jti=jti, expires_at__gt=timezone.now()
+        ).exists()
+
+
+denylist = TokenDenylist()
@@ -0,0 +1,81 @@
+"""
+Email domain blocklist/allowlist backed by ``core.hashindex`` files.
+
+Each index holds hashed domain names; an address matches when its domain or
+any parent domain is listed, so listing ``example.com`` also covers
+``mail.example.com``. The allowlist holds exceptions to the blocklist
+(block ``example.com``, allow ``corp.example.com``); the most specific
+listed domain decides, so ``bad.corp.example.com`` can still be blocked
+under an allowed ``corp.example.com``. Indexes are rebuilt with
+``manage.py build_domain_index`` and picked up by running workers without a
+restart.
+"""
+
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.hashindex import HashIndex, IndexFormatError
+
+KEY_WIDTH = 8
+
+
+def domain_key(domain):
+    return hashlib.blake2b(domain.encode("utf-8"), digest_size=KEY_WIDTH).digest()
+
+
+def normalize_domain(domain):
+    domain = domain.strip().strip(".").lower()
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return domain
+
+
+def domain_suffixes(domain):
+    """``a.b.com`` -> ``a.b.com``, ``b.com``, ``com``."""
+    labels = domain.split(".")
+    return [".".join(labels[i:]) for i in range(len(labels))]
+
+
+def _open(path):
+    if not path:
+        return None
+    try:
+        return HashIndex(path)
+    except (OSError, IndexFormatError) as exc:
+        raise ImproperlyConfigured(f"Cannot open email domain index {path}: {exc}")
+
+
+class EmailDomainPolicy:
+    def __init__(self, blocklist_path=None, allowlist_path=None):
+        self.blocklist = _open(blocklist_path)
+        self.allowlist = _open(allowlist_path)
+
+    def is_blocked(self, email):
+        if self.blocklist is None:
+            return False
+        _, _, domain = email.rpartition("@")
+        if not domain:
+            return False
+        # Most specific first; on a tie the allowlist exception wins
+        for suffix in domain_suffixes(normalize_domain(domain)):
+            key = domain_key(suffix)
+            if self.allowlist is not None and self.allowlist.contains(key):
+                return False
+            if self.blocklist.contains(key):
+                return True
+        return False
+
+
+@lru_cache(maxsize=1)
+def domain_policy():
+    return EmailDomainPolicy(
+        settings.EMAIL_DOMAIN_BLOCKLIST_PATH, settings.EMAIL_DOMAIN_ALLOWLIST_PATH
+    )
+
+
+def is_email_domain_blocked(email):
+    return domain_policy().is_blocked(email)
@@ -0,0 +1,31 @@
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from django_filters import rest_framework as filters
+
+User = get_user_model()
+
+
+def verified_email_exists():
+    """``EXISTS`` subquery for a verified allauth address of the outer user."""
+    return Exists(EmailAddress.objects.filter(user=OuterRef("pk"), verified=True))
+
+
+class UserFilter(filters.FilterSet):
+    """
+    Filters for the admin user listing.
+
+    ``verified`` relies on the ``email_verified`` annotation added by the
+    view's queryset, so filtering and rendering share one subquery.
+    """
+
+    email_domain = filters.CharFilter(method="filter_email_domain")
+    verified = filters.BooleanFilter(field_name="email_verified")
+    date_joined = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = User
+        fields = ["email_domain", "verified", "date_joined", "is_active"]
+
+    def filter_email_domain(self, queryset, name, value):
+        return queryset.filter(email__iendswith="@" + value.lstrip("@"))
@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from authentication.email_domains import KEY_WIDTH, domain_key, normalize_domain
+from core.hashindex import write_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Build an email domain index (blocklist or allowlist) from files with "
+        "one domain per line; '#' starts a comment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources", nargs="+", help="Domain list files ('-' for stdin)."
+        )
+        parser.add_argument(
+            "--output", "-o", required=True, help="Index file to write."
+        )
+
+    def handle(self, *args, sources, output, **options):
+        count = write_index(self._keys(sources), output, KEY_WIDTH)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} domains to {output}"))
+
+    def _keys(self, sources):
+        for path in sources:
+            stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+            with stream:
+                for line in stream:
+                    domain = normalize_domain(line.split("#", 1)[0])
+                    if domain:
+                        yield domain_key(domain)
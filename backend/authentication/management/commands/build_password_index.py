@@ -0,0 +1,115 @@
+import gzip
+import sys
+from pathlib import Path
+
+from django.contrib.auth import password_validation
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.password_validation import password_key
+from core.hashindex import write_index
+
+DJANGO_COMMON_PASSWORDS = (
+    Path(password_validation.__file__).resolve().parent / "common-passwords.txt.gz"
+)
+
+
+def _open(path):
+    if path == "-":
+        return sys.stdin.buffer
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the memory-mapped breached password index used by "
+        "BreachedPasswordValidator from plaintext lists or SHA-1 hash dumps."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources",
+            nargs="*",
+            help="Input files (.gz supported, '-' for stdin). Defaults to Django's common password list.",
+        )
+        parser.add_argument(
+            "--output", "-o", required=True, help="Index file to write."
+        )
+        parser.add_argument(
+            "--format",
+            dest="fmt",
+            choices=("plain", "sha1"),
+            default="plain",
+            help="'plain': one password per line; 'sha1': HASH[:COUNT] lines as in breach corpora.",
+        )
+        parser.add_argument(
+            "--min-count",
+            type=int,
+            default=1,
+            help="With --format sha1, skip hashes seen fewer times than this.",
+        )
+        parser.add_argument(
+            "--width",
+            type=int,
+            default=8,
+            help="Bytes of each SHA-1 digest to keep (1-20).",
+        )
+        parser.add_argument(
+            "--no-django-common",
+            action="store_true",
+            help="Don't include Django's common password list.",
+        )
+        parser.add_argument("--run-size", type=int, default=5_000_000)
+
+    def handle(
+        self,
+        *args,
+        sources,
+        output,
+        fmt,
+        min_count,
+        width,
+        no_django_common,
+        run_size,
+        **options,
+    ):
+        if not 1 <= width <= 20:
+            raise CommandError("--width must be between 1 and 20.")
+
+        inputs = [(path, fmt) for path in sources]
+        if not no_django_common:
+            inputs.append((DJANGO_COMMON_PASSWORDS, "plain"))
+
+        count = write_index(
+            self._keys(inputs, min_count), output, width, run_size=run_size
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} hashes to {output}"))
+
+    def _keys(self, inputs, min_count):
+        for path, fmt in inputs:
+            try:
+                stream = _open(str(path))
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+            with stream:
+                for number, line in enumerate(stream, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if fmt == "plain":
+                        yield password_key(line.decode("utf-8", "replace"))
+                        continue
+                    digest, _, count = line.partition(b":")
+                    try:
+                        key = bytes.fromhex(digest.decode("ascii"))
+                        seen = int(count) if count else None
+                    except ValueError:
+                        key = None
+                    if key is None or len(key) != 20:
+                        raise CommandError(
+                            f"Invalid SHA-1 line {number} in {path}: {line[:60]!r}"
+                        )
+                    if seen is not None and seen < min_count:
+                        continue
+                    yield key
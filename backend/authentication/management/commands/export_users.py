@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.export import CHUNK_SIZE, FORMATS, stream_users
+from core.db_routers import replica_reads
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every user to CSV or JSON Lines without loading the table into memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", dest="fmt", choices=sorted(FORMATS), default="csv"
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Compress the output with gzip."
+        )
+        parser.add_argument(
+            "--output", "-o", default="-", help="Destination file ('-' for stdout)."
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, fmt, gzip, output, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+
+        # A long read-only scan: keep it off the primary when replicas exist
+        with replica_reads():
+            chunks = stream_users(fmt, gzip, chunk_size=chunk_size)
+            if output == "-":
+                self._write(sys.stdout.buffer, chunks)
+                return
+            with open(output, "wb") as destination:
+                size = self._write(destination, chunks)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {size} bytes to {output}"))
+
+    @staticmethod
+    def _write(destination, chunks):
+        size = 0
+        for chunk in chunks:
+            destination.write(chunk)
+            size += len(chunk)
+        destination.flush()
+        return size
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authentication.models import AuditEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete audit events older than the retention period, in primary key batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.AUDIT_RETENTION_DAYS,
+            help="Keep events from the last DAYS days (default: AUDIT_RETENTION_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, days, batch_size, **options):
+        if days < 0 or batch_size < 1:
+            raise CommandError("--days must be >= 0 and --batch-size positive.")
+        cutoff = timezone.now() - timedelta(days=days)
+
+        # Events are appended in time order, so the expired rows are the
+        # low end of the primary key: read it in batches (an index range scan
+        # each) and stop at the first event inside the retention period,
+        # rather than searching the whole table for old created_at values.
+        deleted = 0
+        while True:
+            batch = list(
+                AuditEvent.objects.order_by("pk").values_list("pk", "created_at")[
+                    :batch_size
+                ]
+            )
+            expired = [pk for pk, created_at in batch if created_at < cutoff]
+            if expired:
+                count, _ = AuditEvent.objects.filter(
+                    pk__lte=expired[-1], created_at__lt=cutoff
+                ).delete()
+                deleted += count
+            if len(expired) < batch_size:
+                break
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} audit events before {cutoff:%Y-%m-%d}"
+            )
+        )
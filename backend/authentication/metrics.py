@@ -0,0 +1,43 @@
+from core.metrics import Counter, Histogram
+
+REQUEST_LATENCY = Histogram(
+    "auth_request_duration_seconds",
+    "Latency of authentication endpoints.",
+    labelnames=("endpoint",),
+)
+
+REGISTRATIONS = Counter(
+    "auth_registrations",
+    "Registration attempts by outcome.",
+    labelnames=("outcome",),
+)
+
+LOGINS = Counter(
+    "auth_logins",
+    "Login attempts by outcome.",
+    labelnames=("outcome",),
+)
+
+VERIFICATIONS = Counter(
+    "auth_email_verifications",
+    "Email verification attempts by method and outcome.",
+    labelnames=("method", "outcome"),
+)
+
+EMAILS_SENT = Counter(
+    "auth_emails_sent",
+    "Emails sent by the account adapter, by template.",
+    labelnames=("template",),
+)
+
+EMAIL_SEND_LATENCY = Histogram(
+    "auth_email_send_duration_seconds",
+    "Time spent rendering and sending account emails.",
+    labelnames=("template",),
+)
+
+AUDIT_EVENTS = Counter(
+    "auth_audit_events",
+    "Audit events by outcome (written, dropped).",
+    labelnames=("outcome",),
+)
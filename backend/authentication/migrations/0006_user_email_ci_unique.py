@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:16
+
+import django.db.models.functions.text
+from django.core.management.base import CommandError
+from django.db import migrations, models
+
+# How many duplicate groups the error message lists
+DUPLICATES_SHOWN = 20
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Stop before adding the constraint if emails differ only by case.
+
+    Registration used to compare emails exactly, so such accounts can exist.
+    Which one to keep (and what to do with the others' sessions, social
+    accounts and data) is a decision for an operator, so nothing is merged
+    or renamed automatically.
+    """
+    User = apps.get_model("authentication", "User")
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .exclude(email="")
+        .annotate(email_lower=django.db.models.functions.text.Lower("email"))
+        .values("email_lower")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .order_by("email_lower")
+        .values_list("email_lower", flat=True)
+    )
+    if not duplicates:
+        return
+
+    lines = []
+    for email in duplicates[:DUPLICATES_SHOWN]:
+        accounts = (
+            User.objects.using(schema_editor.connection.alias)
+            .filter(email__iexact=email)
+            .order_by("id")
+            .values_list("id", "email")
+        )
+        lines.append(", ".join(f"#{pk} {address}" for pk, address in accounts))
+    if len(duplicates) > DUPLICATES_SHOWN:
+        lines.append(f"... and {len(duplicates) - DUPLICATES_SHOWN} more")
+    raise CommandError(
+        f"{len(duplicates)} email address(es) are used by several users that "
+        "differ only by letter case, so the case-insensitive unique constraint "
+        "cannot be added:\n  "
+        + "\n  ".join(lines)
+        + "\nMerge these accounts or change their emails (Django admin or "
+        "`manage.py shell`), then run `manage.py migrate` again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("authentication", "0005_user_date_joined_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("email", ""), _negated=True),
+                name="user_email_ci_unique",
+            ),
+        ),
+    ]
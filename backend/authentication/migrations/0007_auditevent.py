@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0006_user_email_ci_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("code_invalid", "Invalid verification code"),
+                            ("code_expired", "Expired verification code"),
+                            ("lockout", "Verification locked out"),
+                            ("unknown_email", "Verification for unknown email"),
+                            ("verified", "Email verified"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("email", models.CharField(blank=True, max_length=254)),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                ("ip_address", models.GenericIPAddressField(blank=True, null=True)),
+                ("data", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["event_type", "created_at"],
+                        name="auditevent_type_created",
+                    ),
+                    models.Index(
+                        fields=["email", "created_at"], name="auditevent_email_created"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -1,6 +1,115 @@
-from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from core.timing import phase
 
 
 class User(AbstractUser):
-    pass
+    # Indexed for admin search/filtering and email lookups at login
+    email = models.EmailField(_("email address"), blank=True, db_index=True)
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Registration relies on this instead of checking before inserting
+            models.UniqueConstraint(
+                Lower("email"), condition=~Q(email=""), name="user_email_ci_unique"
+            ),
+        ]
+        indexes = [
+            # Keyset pagination of the admin user listing
+            models.Index(fields=["date_joined", "id"], name="user_date_joined_id"),
+        ]
+
+    def set_password(self, raw_password):
+        with phase("hash"):
+            super().set_password(raw_password)
+
+    def check_password(self, raw_password):
+        with phase("hash"):
+            return super().check_password(raw_password)
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh token ``jti`` that must no longer be accepted.
+
+    Rows are only needed until the token would have expired anyway, so the
+    table stays small; the indexed ``revoked_at`` lets workers fetch new
+    revocations incrementally.
+    """
+
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class UserSession(models.Model):
+    """
+    A device/session holding a refresh token, recorded at login.
+
+    ``jti`` follows the session through refresh token rotation. The
+    (user, expires_at) index makes listing and counting a user's active
+    sessions a single index range scan.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sessions")
+    jti = models.CharField(max_length=64, unique=True)
+    user_agent = models.CharField(max_length=255, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    issued_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "expires_at"], name="usersession_user_expires"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.jti}"
+
+
+class AuditEvent(models.Model):
+    """
+    Append-only record of a security-relevant authentication event.
+
+    Written in batches by ``authentication.audit``. There are no foreign keys
+    or unique constraints besides the primary key, and every secondary index
+    leads with or ends in ``created_at``, so the table can be range
+    partitioned by time and old rows pruned without touching live ones.
+    """
+
+    class EventType(models.TextChoices):
+        CODE_INVALID = "code_invalid", _("Invalid verification code")
+        CODE_EXPIRED = "code_expired", _("Expired verification code")
+        LOCKOUT = "lockout", _("Verification locked out")
+        UNKNOWN_EMAIL = "unknown_email", _("Verification for unknown email")
+        VERIFIED = "verified", _("Email verified")
+
+    event_type = models.CharField(max_length=32, choices=EventType.choices)
+    email = models.CharField(max_length=254, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["event_type", "created_at"], name="auditevent_type_created"
+            ),
+            models.Index(
+                fields=["email", "created_at"], name="auditevent_email_created"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type}:{self.email}"
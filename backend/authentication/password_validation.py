@@ -0,0 +1,56 @@
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.utils.translation import gettext as _
+
+from core.hashindex import HashIndex, IndexFormatError
+
+
+@lru_cache(maxsize=None)
+def open_password_index(path):
+    """One shared mapping per index file and process."""
+    try:
+        return HashIndex(path)
+    except (OSError, IndexFormatError) as exc:
+        raise ImproperlyConfigured(f"Cannot open password index {path}: {exc}")
+
+
+def password_key(password):
+    """Index key of a password: its SHA-1 digest (the format breach corpora use)."""
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+class BreachedPasswordValidator:
+    """
+    Reject passwords listed in a memory-mapped index of SHA-1 hash prefixes
+    (see ``manage.py build_password_index``).
+
+    Replaces Django's ``CommonPasswordValidator`` when ``PASSWORD_INDEX_PATH``
+    is set: the index includes Django's common password list by default, and
+    opening it costs nothing whatever its size.
+    """
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path or settings.PASSWORD_INDEX_PATH
+
+    @property
+    def index(self):
+        return open_password_index(self.index_path)
+
+    def validate(self, password, user=None):
+        index = self.index
+        # Breach corpora are case-sensitive; Django's common list is
+        # lowercased, like CommonPasswordValidator's comparison
+        normalized = password.lower().strip()
+        if index.contains(password_key(password)) or (
+            normalized != password and index.contains(password_key(normalized))
+        ):
+            raise ValidationError(
+                _("This password has appeared in a data breach and can't be used."),
+                code="password_breached",
+            )
+
+    def get_help_text(self):
+        return _("Your password can't be one that has appeared in a data breach.")
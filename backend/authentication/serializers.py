@@ -1,34 +1,97 @@
-from dj_rest_auth.registration.serializers import RegisterSerializer
-from dj_rest_auth.registration.views import VerifyEmailSerializer
+from allauth.account import app_settings as allauth_account_settings
+from allauth.account.adapter import get_adapter
+from allauth.account.models import EmailAddress
+from dj_rest_auth.registration.serializers import (
+    RegisterSerializer,
+    VerifyEmailSerializer,
+)
+from dj_rest_auth.serializers import UserDetailsSerializer
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from allauth.account import app_settings as allauth_account_settings
-from allauth.utils import get_username_max_length
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from .denylist import denylist
+from .email_domains import is_email_domain_blocked
+from .models import UserSession
+from .sessions import rotate_session
+from .tokens import RefreshToken
+from .user_cache import is_user_active
+from .utils import username_max_length
 
 User = get_user_model()
 
 
 class CustomRegisterSerializer(RegisterSerializer):
-    username = serializers.CharField(
-        max_length=get_username_max_length(),
-        min_length=allauth_account_settings.USERNAME_MIN_LENGTH,
-        required=False,
-    )
     first_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
     last_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # Built here rather than at import so the max length comes from the
+        # (cached) user model field instead of being frozen at import time
+        fields["username"] = serializers.CharField(
+            max_length=username_max_length(),
+            min_length=allauth_account_settings.USERNAME_MIN_LENGTH,
+            required=False,
+        )
+        return fields
+
+    def to_internal_value(self, data):
+        # Cheapest rejection first: a blocked domain fails before field
+        # validation runs any query, password check or hashing
+        email = data.get("email") if hasattr(data, "get") else None
+        if isinstance(email, str) and is_email_domain_blocked(email):
+            raise serializers.ValidationError(
+                {"email": ["Registrations from this email domain are not allowed."]}
+            )
+        return super().to_internal_value(data)
+
     def validate_email(self, email):
-        email = super().validate_email(email)
-        if User.objects.filter(email=email).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return email
+        # Uniqueness is enforced by the ``user_email_ci_unique`` constraint
+        # when the user is inserted (see ``CustomRegisterView``), instead of
+        # a check-then-insert that costs queries and still races.
+        return get_adapter().clean_email(email)
+
+    def save(self, request):
+        adapter = get_adapter()
+        user = adapter.new_user(request)
+        self.cleaned_data = self.get_cleaned_data()
+        user = adapter.save_user(request, user, self, commit=False)
+        if "password1" in self.cleaned_data:
+            try:
+                adapter.clean_password(self.cleaned_data["password1"], user=user)
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError(
+                    detail=serializers.as_serializer_error(exc)
+                )
+        user.save()
+        self.custom_signup(request, user)
+        # The user is brand new, so allauth's setup_user_email lookups (existing
+        # addresses, stashed session email, duplicates) can only come back
+        # empty: insert the primary address directly.
+        if user.email:
+            address = EmailAddress.objects.create(
+                user=user, email=user.email.lower(), primary=True, verified=False
+            )
+            EmailAddress.objects.fill_cache_for_user(user, [address])
+        return user
 
     def get_cleaned_data(self):
         data = super().get_cleaned_data()
-        data.update({
-            'first_name': self.validated_data.get('first_name', ''),
-            'last_name': self.validated_data.get('last_name', ''),
-        })
+        data.update(
+            {
+                "first_name": self.validated_data.get("first_name", ""),
+                "last_name": self.validated_data.get("last_name", ""),
+            }
+        )
         return data
 
 
@@ -44,3 +107,94 @@ class CustomVerifyEmailSerializer(VerifyEmailSerializer):
         if not attrs.get("code") and not attrs.get("key"):
             raise serializers.ValidationError("Either 'code' or 'key' is required.")
         return attrs
+
+
+class TokenClaimsSerializer(TokenObtainPairSerializer):
+    """Token claims serializer used by dj-rest-auth to issue login tokens."""
+
+    token_class = RefreshToken
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that rotates refresh tokens and revokes the old one
+    in ``authentication.denylist``.
+
+    simplejwt only revokes on rotation through its ``token_blacklist`` app,
+    which costs an ``OutstandingToken`` insert per login and a join per
+    refresh, so rotation is handled here instead. The active-user check reads
+    a cached flag rather than loading the user row.
+    """
+
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        if user_id:
+            if not is_user_active(user_id):
+                raise AuthenticationFailed(
+                    self.error_messages["no_active_account"],
+                    "no_active_account",
+                )
+
+        data = {"access": str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            old_jti = refresh[jwt_settings.JTI_CLAIM]
+            refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            rotate_session(old_jti, refresh)
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+    """Verify signature and expiry, and reject revoked refresh tokens."""
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+
+        if token.get(jwt_settings.TOKEN_TYPE_CLAIM) == RefreshToken.token_type:
+            if denylist.is_revoked(token.get(jwt_settings.JTI_CLAIM)):
+                raise serializers.ValidationError("Token is blacklisted")
+
+        return {}
+
+
+class UserSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserSession
+        fields = ("id", "user_agent", "ip_address", "issued_at", "expires_at")
+        read_only_fields = fields
+
+
+class CurrentUserSerializer(UserDetailsSerializer):
+    """dj-rest-auth's user details plus the email verification state."""
+
+    email_verified = serializers.BooleanField(read_only=True)
+
+    class Meta(UserDetailsSerializer.Meta):
+        fields = (*UserDetailsSerializer.Meta.fields, "email_verified")
+
+
+class UserAdminSerializer(serializers.ModelSerializer):
+    email_verified = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = (
+            "id",
+            "email",
+            "username",
+            "first_name",
+            "last_name",
+            "is_active",
+            "date_joined",
+            "email_verified",
+        )
+        read_only_fields = fields
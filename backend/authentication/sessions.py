@@ -0,0 +1,60 @@
+"""
+Per-user device/session registry for refresh tokens.
+
+A row is written at login, follows its refresh token through rotation and is
+deleted (with the token revoked) on logout, on explicit revocation, or when
+the user exceeds ``MAX_SESSIONS_PER_USER`` and it is the oldest session.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .denylist import denylist
+from .models import UserSession
+from .utils import client_ip
+
+
+def active_sessions(user):
+    return UserSession.objects.filter(user=user, expires_at__gt=timezone.now())
+
+
+def record_session(user, refresh, request):
+    """Register the session for a freshly issued refresh token."""
+    UserSession.objects.create(
+        user=user,
+        jti=refresh[jwt_settings.JTI_CLAIM],
+        user_agent=request.META.get("HTTP_USER_AGENT", "")[:255],
+        ip_address=client_ip(request),
+        issued_at=datetime_from_epoch(refresh["iat"]),
+        expires_at=datetime_from_epoch(refresh["exp"]),
+    )
+    enforce_session_cap(user)
+
+
+def enforce_session_cap(user):
+    """Revoke the oldest sessions beyond ``MAX_SESSIONS_PER_USER``."""
+    cap = getattr(settings, "MAX_SESSIONS_PER_USER", None)
+    if not cap:
+        return
+    evicted = list(active_sessions(user).order_by("-expires_at", "-pk")[cap:])
+    for session in evicted:
+        revoke_session(session)
+
+
+def rotate_session(old_jti, refresh):
+    """Point the session at the refresh token that replaced ``old_jti``."""
+    UserSession.objects.filter(jti=old_jti).update(
+        jti=refresh[jwt_settings.JTI_CLAIM],
+        expires_at=datetime_from_epoch(refresh["exp"]),
+    )
+
+
+def revoke_session(session):
+    denylist.revoke(session.jti, session.expires_at)
+    session.delete()
+
+
+def forget_session(jti):
+    UserSession.objects.filter(jti=jti).delete()
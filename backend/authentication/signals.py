@@ -0,0 +1,85 @@
+from allauth.account.models import EmailAddress
+from allauth.account.signals import email_confirmed
+from django.contrib.auth.models import Group, Permission
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .email_domains import domain_policy
+from .models import User
+from .user_cache import (
+    invalidate_all_permissions,
+    invalidate_user,
+    invalidate_user_permissions,
+)
+from .utils import clear_config_cache
+from .verification_status import publish_verified
+
+# Settings that values cached in ``authentication.utils`` are derived from
+CACHED_SETTINGS = {
+    "SECRET_KEY",
+    "AUTH_USER_MODEL",
+    "ACCOUNT_USER_MODEL_USERNAME_FIELD",
+}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_state(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return  # login bookkeeping changes nothing cached
+    invalidate_user(instance.pk)
+    # is_superuser decides between "all permissions" and the user's own
+    invalidate_user_permissions([instance.pk])
+
+
+@receiver(post_save, sender=EmailAddress)
+@receiver(post_delete, sender=EmailAddress)
+def invalidate_user_email_state(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permission_cache(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_user_permissions([instance.pk])
+    elif pk_set is not None:
+        invalidate_user_permissions(pk_set)
+    else:
+        # group.user_set.clear() / permission.user_set.clear(): members unknown
+        invalidate_all_permissions()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permission_cache(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_all_permissions()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_permission_cache(sender, **kwargs):
+    invalidate_all_permissions()
+
+
+@receiver(email_confirmed)
+def publish_verification_status(sender, email_address, **kwargs):
+    # Open status streams learn about it once the confirmation is committed
+    user_id = email_address.user_id
+    transaction.on_commit(lambda: publish_verified(user_id))
+
+
+@receiver(setting_changed)
+def clear_cached_settings(setting, **kwargs):
+    if setting in CACHED_SETTINGS:
+        clear_config_cache()
+    elif setting in ("EMAIL_DOMAIN_BLOCKLIST_PATH", "EMAIL_DOMAIN_ALLOWLIST_PATH"):
+        domain_policy.cache_clear()
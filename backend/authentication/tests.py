@@ -1,12 +1,14 @@
+import io
+from unittest.mock import patch
+
 import pytest
-from django.test import TestCase
+from allauth.account.models import EmailAddress, EmailConfirmation
 from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils import timezone
-from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from allauth.account.models import EmailAddress, EmailConfirmation
-from unittest.mock import patch
+from rest_framework.test import APIClient, APITestCase
 
 User = get_user_model()
 
@@ -17,11 +19,11 @@ class RegistrationEndpointTests(APITestCase):
 
     def setUp(self):
         self.client = APIClient()
-        self.registration_url = reverse('rest_register')
+        self.registration_url = reverse("rest_register")
         self.valid_payload = {
-            'email': 'test@example.com',
-            'password1': 'testpassword123',
-            'password2': 'testpassword123',
+            "email": "test@example.com",
+            "password1": "testpassword123",
+            "password2": "testpassword123",
         }
 
     def test_successful_registration(self):
@@ -29,56 +31,92 @@ class RegistrationEndpointTests(APITestCase):
         response = self.client.post(self.registration_url, self.valid_payload)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(User.objects.filter(email='test@example.com').exists())
+        self.assertTrue(User.objects.filter(email="test@example.com").exists())
 
         # With EMAIL_VERIFICATION = "mandatory", no tokens are returned immediately
-        self.assertIn('detail', response.data)
-        self.assertEqual(response.data['detail'], 'Verification e-mail sent.')
-        self.assertNotIn('access', response.data)
-        self.assertNotIn('refresh', response.data)
+        self.assertIn("detail", response.data)
+        self.assertEqual(response.data["detail"], "Verification e-mail sent.")
+        self.assertNotIn("access", response.data)
+        self.assertNotIn("refresh", response.data)
 
     def test_registration_with_email_verification_optional(self):
         """Test registration when email verification is optional (returns tokens immediately)"""
-        with patch('allauth.account.app_settings.EMAIL_VERIFICATION', 'optional'):
+        with patch("allauth.account.app_settings.EMAIL_VERIFICATION", "optional"):
             response = self.client.post(self.registration_url, self.valid_payload)
 
             self.assertEqual(response.status_code, status.HTTP_201_CREATED)
             # With optional verification, tokens should be returned immediately
-            self.assertIn('access', response.data)
-            self.assertIn('refresh', response.data)
-            self.assertIn('user', response.data)
+            self.assertIn("access", response.data)
+            self.assertIn("refresh", response.data)
+            self.assertIn("user", response.data)
 
     def test_registration_duplicate_email(self):
         """Test registration with existing email"""
         # Create user first
         User.objects.create_user(
-            email='test@example.com',
-            password='password123',
-            username='existinguser'
+            email="test@example.com", password="password123", username="existinguser"
         )
 
         response = self.client.post(self.registration_url, self.valid_payload)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('email', response.data)
+        self.assertIn("email", response.data)
+
+    def test_registration_duplicate_email_differing_in_case(self):
+        """The unique constraint catches duplicates without a pre-check"""
+        from django.core import mail
+
+        User.objects.create_user(
+            email="test@example.com", password="password123", username="existinguser"
+        )
+        payload = {**self.valid_payload, "email": "Test@Example.com"}
+
+        response = self.client.post(self.registration_url, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertFalse(EmailAddress.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_registration_mail_is_deferred_until_rows_are_written(self):
+        """Confirmation mail is queued during the transaction, dropped on rollback"""
+        from django.core import mail
+
+        from .adapter import CustomAccountAdapter, deferred_mail
+
+        adapter = CustomAccountAdapter()
+        user = User(username="deferred", email="a@example.com")
+        context = {"code": "123456", "key": "k", "activate_url": "", "user": user}
+
+        with deferred_mail():
+            adapter.send_mail(
+                "account/email/email_confirmation", "a@example.com", context
+            )
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+        with self.assertRaises(RuntimeError), deferred_mail():
+            adapter.send_mail(
+                "account/email/email_confirmation", "a@example.com", context
+            )
+            raise RuntimeError
+        self.assertEqual(len(mail.outbox), 1)
 
     def test_registration_password_mismatch(self):
         """Test registration with mismatched passwords"""
         payload = self.valid_payload.copy()
-        payload['password2'] = 'differentpassword'
+        payload["password2"] = "differentpassword"
 
         response = self.client.post(self.registration_url, payload)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('non_field_errors', response.data)
+        self.assertIn("non_field_errors", response.data)
 
     def test_registration_weak_password(self):
         """Test registration with weak password"""
         payload = self.valid_payload.copy()
-        payload.update({
-            'password1': '123',
-            'password2': '123'
-        })
+        payload.update({"password1": "123", "password2": "123"})
 
         response = self.client.post(self.registration_url, payload)
 
@@ -87,55 +125,50 @@ class RegistrationEndpointTests(APITestCase):
     def test_registration_missing_email(self):
         """Test registration without email"""
         payload = self.valid_payload.copy()
-        del payload['email']
+        del payload["email"]
 
         response = self.client.post(self.registration_url, payload)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('email', response.data)
+        self.assertIn("email", response.data)
         self.assertEqual(User.objects.count(), 0)
 
     def test_registration_with_username_and_email(self):
         """Test registration succeeds when username is supplied alongside email"""
         payload = self.valid_payload.copy()
-        payload.update({
-            'email': 'usernamed@example.com',
-            'username': 'usernamed'
-        })
+        payload.update({"email": "usernamed@example.com", "username": "usernamed"})
 
         response = self.client.post(self.registration_url, payload)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        user = User.objects.get(email='usernamed@example.com')
-        self.assertEqual(user.username, 'usernamed')
-        self.assertEqual(response.data['detail'], 'Verification e-mail sent.')
+        user = User.objects.get(email="usernamed@example.com")
+        self.assertEqual(user.username, "usernamed")
+        self.assertEqual(response.data["detail"], "Verification e-mail sent.")
 
     def test_registration_with_first_and_last_name(self):
         """Test registration persists first and last name fields"""
         payload = self.valid_payload.copy()
-        payload.update({
-            'email': 'nameduser@example.com',
-            'first_name': 'Jane',
-            'last_name': 'Doe'
-        })
+        payload.update(
+            {"email": "nameduser@example.com", "first_name": "Jane", "last_name": "Doe"}
+        )
 
         response = self.client.post(self.registration_url, payload)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        user = User.objects.get(email='nameduser@example.com')
-        self.assertEqual(user.first_name, 'Jane')
-        self.assertEqual(user.last_name, 'Doe')
-        self.assertEqual(response.data['detail'], 'Verification e-mail sent.')
+        user = User.objects.get(email="nameduser@example.com")
+        self.assertEqual(user.first_name, "Jane")
+        self.assertEqual(user.last_name, "Doe")
+        self.assertEqual(response.data["detail"], "Verification e-mail sent.")
 
     def test_registration_invalid_email_format(self):
         """Test registration with invalid email format"""
         payload = self.valid_payload.copy()
-        payload['email'] = 'invalid-email'
+        payload["email"] = "invalid-email"
 
         response = self.client.post(self.registration_url, payload)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('email', response.data)
+        self.assertIn("email", response.data)
 
 
 @pytest.mark.django_db
@@ -144,67 +177,58 @@ class LoginEndpointTests(APITestCase):
 
     def setUp(self):
         self.client = APIClient()
-        self.login_url = reverse('rest_login')
-        self.email = 'test@example.com'
-        self.password = 'testpassword123'
+        self.login_url = reverse("rest_login")
+        self.email = "test@example.com"
+        self.password = "testpassword123"
 
         # Create a test user
         self.user = User.objects.create_user(
-            email=self.email,
-            password=self.password,
-            username='testuser'
+            email=self.email, password=self.password, username="testuser"
         )
 
         # Create verified email address
         EmailAddress.objects.create(
-            user=self.user,
-            email=self.email,
-            verified=True,
-            primary=True
+            user=self.user, email=self.email, verified=True, primary=True
         )
 
     def test_successful_login_with_email(self):
         """Test successful login with email"""
-        response = self.client.post(self.login_url, {
-            'email': self.email,
-            'password': self.password
-        })
-
+        response = self.client.post(
+            self.login_url, {"email": self.email, "password": self.password}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('access', response.data)
-        self.assertIn('refresh', response.data)
-        self.assertIn('user', response.data)
-        self.assertEqual(response.data['user']['email'], self.email)
+        self.assertIn("access", response.data)
+        self.assertIn("refresh", response.data)
+        self.assertIn("user", response.data)
+        self.assertEqual(response.data["user"]["email"], self.email)
 
     def test_login_with_username_fails_when_email_only(self):
         """Test that username login fails when only email login is configured"""
-        response = self.client.post(self.login_url, {
-            'username': self.user.username,
-            'password': self.password
-        })
+        response = self.client.post(
+            self.login_url, {"username": self.user.username, "password": self.password}
+        )
 
         # Should fail because current configuration only allows email login
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('non_field_errors', response.data)
-        self.assertIn('Must include "email"', str(response.data['non_field_errors'][0]))
+        self.assertIn("non_field_errors", response.data)
+        self.assertIn('Must include "email"', str(response.data["non_field_errors"][0]))
 
     def test_login_with_wrong_password(self):
         """Test login with incorrect password"""
-        response = self.client.post(self.login_url, {
-            'email': self.email,
-            'password': 'wrongpassword'
-        })
+        response = self.client.post(
+            self.login_url, {"email": self.email, "password": "wrongpassword"}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('non_field_errors', response.data)
+        self.assertIn("non_field_errors", response.data)
 
     def test_login_with_nonexistent_user(self):
         """Test login with non-existent user"""
-        response = self.client.post(self.login_url, {
-            'email': 'nonexistent@example.com',
-            'password': self.password
-        })
+        response = self.client.post(
+            self.login_url,
+            {"email": "nonexistent@example.com", "password": self.password},
+        )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
@@ -213,10 +237,9 @@ class LoginEndpointTests(APITestCase):
         self.user.is_active = False
         self.user.save()
 
-        response = self.client.post(self.login_url, {
-            'email': self.email,
-            'password': self.password
-        })
+        response = self.client.post(
+            self.login_url, {"email": self.email, "password": self.password}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
@@ -228,12 +251,10 @@ class LoginEndpointTests(APITestCase):
 
     def test_login_missing_password(self):
         """Test login without password"""
-        response = self.client.post(self.login_url, {
-            'email': self.email
-        })
+        response = self.client.post(self.login_url, {"email": self.email})
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('password', response.data)
+        self.assertIn("password", response.data)
 
     def test_login_with_unverified_email(self):
         """Test login with unverified email when verification is required"""
@@ -242,44 +263,41 @@ class LoginEndpointTests(APITestCase):
         email_address.verified = False
         email_address.save()
 
-        with patch('allauth.account.app_settings.EMAIL_VERIFICATION', 'mandatory'):
-            response = self.client.post(self.login_url, {
-                'email': self.email,
-                'password': self.password
-            })
+        with patch("allauth.account.app_settings.EMAIL_VERIFICATION", "mandatory"):
+            response = self.client.post(
+                self.login_url, {"email": self.email, "password": self.password}
+            )
 
             self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_user_data_in_response(self):
         """Test that user data is correctly returned in login response"""
-        self.user.first_name = 'Test'
-        self.user.last_name = 'User'
+        self.user.first_name = "Test"
+        self.user.last_name = "User"
         self.user.save()
 
-        response = self.client.post(self.login_url, {
-            'email': self.email,
-            'password': self.password
-        })
+        response = self.client.post(
+            self.login_url, {"email": self.email, "password": self.password}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        user_data = response.data['user']
-        self.assertEqual(user_data['pk'], self.user.pk)
-        self.assertEqual(user_data['username'], self.user.username)
-        self.assertEqual(user_data['email'], self.user.email)
-        self.assertEqual(user_data['first_name'], 'Test')
-        self.assertEqual(user_data['last_name'], 'User')
+        user_data = response.data["user"]
+        self.assertEqual(user_data["pk"], self.user.pk)
+        self.assertEqual(user_data["username"], self.user.username)
+        self.assertEqual(user_data["email"], self.user.email)
+        self.assertEqual(user_data["first_name"], "Test")
+        self.assertEqual(user_data["last_name"], "User")
 
     def test_jwt_tokens_are_valid(self):
         """Test that returned JWT tokens are valid"""
-        response = self.client.post(self.login_url, {
-            'email': self.email,
-            'password': self.password
-        })
+        response = self.client.post(
+            self.login_url, {"email": self.email, "password": self.password}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        access_token = response.data['access']
-        refresh_token = response.data['refresh']
+        access_token = response.data["access"]
+        refresh_token = response.data["refresh"]
 
         # Tokens should be non-empty strings
         self.assertTrue(isinstance(access_token, str))
@@ -293,18 +311,20 @@ class AuthenticationIntegrationTests(TestCase):
     """Integration tests using Django TestCase"""
 
     def setUp(self):
-        self.email = 'integration@example.com'
-        self.password = 'ComplexPassword2024!'
+        self.email = "integration@example.com"
+        self.password = "ComplexPassword2024!"
 
     def test_registration_to_login_flow(self):
         """Test complete flow from registration to login"""
         # Register user
-        registration_response = self.client.post('/api/auth/registration/', {
-            'email': self.email,
-            'password1': self.password,
-            'password2': self.password
-        })
-
+        registration_response = self.client.post(
+            "/api/auth/registration/",
+            {
+                "email": self.email,
+                "password1": self.password,
+                "password2": self.password,
+            },
+        )
 
         self.assertIn(registration_response.status_code, [status.HTTP_201_CREATED])
 
@@ -318,16 +338,14 @@ class AuthenticationIntegrationTests(TestCase):
         email_address.save()
 
         # Login with the registered user
-        login_response = self.client.post('/api/auth/login/', {
-            'email': self.email,
-            'password': self.password
-        })
-
+        login_response = self.client.post(
+            "/api/auth/login/", {"email": self.email, "password": self.password}
+        )
 
         self.assertEqual(login_response.status_code, status.HTTP_200_OK)
         login_data = login_response.json()
-        self.assertIn('access', login_data)
-        self.assertIn('refresh', login_data)
+        self.assertIn("access", login_data)
+        self.assertIn("refresh", login_data)
 
 
 @pytest.mark.django_db
@@ -336,40 +354,33 @@ class CustomVerifyEmailViewTests(APITestCase):
 
     def setUp(self):
         self.client = APIClient()
-        self.verify_url = reverse('rest_verify_email')
-        self.email = 'verify@example.com'
-        self.password = 'VerifyPassword2024!'
+        self.verify_url = reverse("rest_verify_email")
+        self.email = "verify@example.com"
+        self.password = "VerifyPassword2024!"
 
         # Create a test user
         self.user = User.objects.create_user(
-            email=self.email,
-            password=self.password,
-            username='verifyuser'
+            email=self.email, password=self.password, username="verifyuser"
         )
 
         # Create unverified email address
         self.email_address = EmailAddress.objects.create(
-            user=self.user,
-            email=self.email,
-            verified=False,
-            primary=True
+            user=self.user, email=self.email, verified=False, primary=True
         )
 
     def test_code_verification_missing_parameters(self):
         """Test code verification with missing parameters"""
         # Missing code - falls back to key verification which fails
-        response = self.client.post(self.verify_url, {
-            'email': self.email
-        })
+        response = self.client.post(self.verify_url, {"email": self.email})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Invalid verification', str(response.data['detail']))
+        self.assertIn("Invalid verification", str(response.data["detail"]))
 
         # Missing email but has code - should trigger our custom handler
-        response = self.client.post(self.verify_url, {
-            'code': '123456'
-        })
+        response = self.client.post(self.verify_url, {"code": "123456"})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('email and verification code are required', str(response.data['detail']))
+        self.assertIn(
+            "email and verification code are required", str(response.data["detail"])
+        )
 
     def test_code_verification_already_verified_email(self):
         """Test code verification with already verified email"""
@@ -377,47 +388,43 @@ class CustomVerifyEmailViewTests(APITestCase):
         self.email_address.verified = True
         self.email_address.save()
 
-        response = self.client.post(self.verify_url, {
-            'email': self.email,
-            'code': '123456'
-        })
+        response = self.client.post(
+            self.verify_url, {"email": self.email, "code": "123456"}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('already verified', str(response.data['detail']))
+        self.assertIn("already verified", str(response.data["detail"]))
 
     def test_code_verification_invalid_email(self):
         """Test code verification with invalid email"""
-        response = self.client.post(self.verify_url, {
-            'email': 'nonexistent@example.com',
-            'code': '123456'
-        })
+        response = self.client.post(
+            self.verify_url, {"email": "nonexistent@example.com", "code": "123456"}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Invalid email address', str(response.data['detail']))
+        self.assertIn("Invalid email address", str(response.data["detail"]))
 
     def test_code_verification_invalid_code(self):
         """Test code verification with invalid code"""
         # Create a confirmation record
-        confirmation = EmailConfirmation.objects.create(
-            email_address=self.email_address,
-            key='test-confirmation-key'
+        EmailConfirmation.objects.create(
+            email_address=self.email_address, key="test-confirmation-key"
         )
 
-        response = self.client.post(self.verify_url, {
-            'email': self.email,
-            'code': '000000'  # Wrong code
-        })
+        response = self.client.post(
+            self.verify_url, {"email": self.email, "code": "000000"}  # Wrong code
+        )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Invalid or expired', str(response.data['detail']))
+        self.assertIn("Invalid or expired", str(response.data["detail"]))
 
     def test_code_verification_with_valid_code(self):
         """Test code verification with valid code"""
         # Create a confirmation record
         confirmation = EmailConfirmation.objects.create(
             email_address=self.email_address,
-            key='test-confirmation-key',
-            sent=timezone.now()
+            key="test-confirmation-key",
+            sent=timezone.now(),
         )
 
         # Import the view to get the expected code
@@ -425,13 +432,12 @@ class CustomVerifyEmailViewTests(APITestCase):
 
         expected_code = generate_verification_code(confirmation.key)
 
-        response = self.client.post(self.verify_url, {
-            'email': self.email,
-            'code': expected_code
-        })
+        response = self.client.post(
+            self.verify_url, {"email": self.email, "code": expected_code}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('successfully verified', str(response.data['detail']))
+        self.assertIn("successfully verified", str(response.data["detail"]))
 
         # Verify that email address is now marked as verified
         self.email_address.refresh_from_db()
@@ -441,43 +447,43 @@ class CustomVerifyEmailViewTests(APITestCase):
         """Test that key verification still works (fallback to parent)"""
         # Create a confirmation record
         confirmation = EmailConfirmation.objects.create(
-            email_address=self.email_address,
-            key='test-key-12345',
-            sent=timezone.now()
+            email_address=self.email_address, key="test-key-12345", sent=timezone.now()
         )
 
-        response = self.client.post(self.verify_url, {
-            'key': confirmation.key
-        })
+        response = self.client.post(self.verify_url, {"key": confirmation.key})
 
         # The parent class should handle this
         # Result depends on the actual key validation logic
         # For now, we just check that it doesn't crash
-        self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST])
+        self.assertIn(
+            response.status_code, [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST]
+        )
 
     def test_code_verification_exceeds_max_attempts(self):
         """Lock the confirmation after repeated invalid attempts"""
-        from .views import CustomVerifyEmailView
         from .utils import generate_verification_code
+        from .views import CustomVerifyEmailView
 
         confirmation = EmailConfirmation.objects.create(
             email_address=self.email_address,
-            key='adapter-confirmation-key',
-            sent=timezone.now()
+            key="adapter-confirmation-key",
+            sent=timezone.now(),
         )
 
         actual_code = generate_verification_code(confirmation.key)
-        wrong_code = '111111' if actual_code != '111111' else '222222'
+        wrong_code = "111111" if actual_code != "111111" else "222222"
 
         last_response = None
         for _ in range(CustomVerifyEmailView.MAX_VERIFICATION_ATTEMPTS):
-            last_response = self.client.post(self.verify_url, {
-                'email': self.email,
-                'code': wrong_code
-            })
+            last_response = self.client.post(
+                self.verify_url, {"email": self.email, "code": wrong_code}
+            )
 
         self.assertEqual(last_response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Too many incorrect verification attempts', str(last_response.data['detail']))
+        self.assertIn(
+            "Too many incorrect verification attempts",
+            str(last_response.data["detail"]),
+        )
         self.assertFalse(EmailConfirmation.objects.filter(pk=confirmation.pk).exists())
 
 
@@ -511,7 +517,9 @@ class CustomAccountAdapterTests(TestCase):
         expected_code = generate_verification_code(confirmation.key)
 
         with patch.object(
-            adapter, "get_email_confirmation_url", return_value="https://example.com/verify"
+            adapter,
+            "get_email_confirmation_url",
+            return_value="https://example.com/verify",
         ), patch.object(adapter, "send_mail") as mock_send_mail:
             adapter.send_confirmation_mail(None, confirmation, signup=True)
 
@@ -519,4 +527,1433 @@ class CustomAccountAdapterTests(TestCase):
         self.assertEqual(to_address, user.email)
         self.assertEqual(context["code"], expected_code)
         self.assertEqual(context["key"], confirmation.key)
-        self.assertTrue(context["activate_url"].startswith("https://example.com/verify"))
+        self.assertTrue(
+            context["activate_url"].startswith("https://example.com/verify")
+        )
+
+
+class TokenDenylistTests(TestCase):
+    """Refresh token rotation and revocation through the denylist."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from .denylist import denylist
+
+        cache.clear()
+        denylist.reset()
+        self.user = User.objects.create_user(
+            email="rotate@example.com", password="RotatePass123!", username="rotate"
+        )
+
+    def test_revoked_jti_is_denied_and_others_are_not(self):
+        from datetime import timedelta
+
+        from .denylist import denylist
+
+        denylist.revoke("revoked-jti", timezone.now() + timedelta(hours=1))
+
+        self.assertTrue(denylist.is_revoked("revoked-jti"))
+        self.assertFalse(denylist.is_revoked("other-jti"))
+
+    def test_revocation_survives_cache_eviction(self):
+        from datetime import timedelta
+
+        from django.core.cache import cache
+
+        from .denylist import denylist
+
+        denylist.revoke("evicted-jti", timezone.now() + timedelta(hours=1))
+        cache.clear()
+        denylist.reset()
+
+        self.assertTrue(denylist.is_revoked("evicted-jti"))
+
+    def test_revocation_committed_out_of_order_is_picked_up(self):
+        from datetime import timedelta
+
+        from django.core.cache import cache
+
+        from .denylist import VERSION_KEY, denylist
+        from .models import RevokedToken
+
+        expires_at = timezone.now() + timedelta(hours=1)
+        RevokedToken.objects.create(pk=100, jti="newer-jti", expires_at=expires_at)
+        self.assertTrue(denylist.is_revoked("newer-jti"))
+
+        # Lower id, allocated earlier, committed after the last sync
+        RevokedToken.objects.create(
+            pk=50,
+            jti="late-jti",
+            expires_at=expires_at,
+            revoked_at=timezone.now() - timedelta(seconds=30),
+        )
+        cache.incr(VERSION_KEY)
+
+        self.assertTrue(denylist.is_revoked("late-jti"))
+
+    def test_rolled_back_revocation_is_not_denied(self):
+        from datetime import timedelta
+
+        from django.db import transaction
+
+        from .denylist import denylist
+
+        self.assertFalse(denylist.is_revoked("rolled-back-jti"))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                denylist.revoke("rolled-back-jti", timezone.now() + timedelta(hours=1))
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(denylist.is_revoked("rolled-back-jti"))
+
+    def test_expired_tokens_are_not_stored(self):
+        from datetime import timedelta
+
+        from .denylist import denylist
+        from .models import RevokedToken
+
+        denylist.revoke("old-jti", timezone.now() - timedelta(seconds=1))
+
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_refresh_rotates_and_revokes_previous_token(self):
+        from rest_framework_simplejwt.exceptions import TokenError
+
+        from .serializers import CustomTokenRefreshSerializer
+        from .tokens import RefreshToken
+
+        refresh = RefreshToken.for_user(self.user)
+        serializer = CustomTokenRefreshSerializer(data={"refresh": str(refresh)})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(serializer.is_valid())
+
+        self.assertIn("access", serializer.validated_data)
+        self.assertNotEqual(serializer.validated_data["refresh"], str(refresh))
+        with self.assertRaises(TokenError):
+            RefreshToken(str(refresh))
+        RefreshToken(serializer.validated_data["refresh"])
+
+    def test_refresh_rejects_inactive_user(self):
+        from rest_framework.exceptions import AuthenticationFailed
+
+        from .serializers import CustomTokenRefreshSerializer
+        from .tokens import RefreshToken
+
+        refresh = RefreshToken.for_user(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        serializer = CustomTokenRefreshSerializer(data={"refresh": str(refresh)})
+        with self.assertRaises(AuthenticationFailed):
+            serializer.is_valid(raise_exception=True)
+
+
+@pytest.mark.django_db
+class TokenEndpointTests(APITestCase):
+    """Refresh, verify and logout endpoints built on the denylist."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from .denylist import denylist
+
+        cache.clear()
+        denylist.reset()
+        self.client = APIClient()
+        self.email = "tokens@example.com"
+        self.password = "TokensPass2024!"
+        self.user = User.objects.create_user(
+            email=self.email, password=self.password, username="tokens"
+        )
+        EmailAddress.objects.create(
+            user=self.user, email=self.email, verified=True, primary=True
+        )
+        response = self.client.post(
+            reverse("rest_login"), {"email": self.email, "password": self.password}
+        )
+        self.access = response.data["access"]
+        self.refresh = response.data["refresh"]
+
+    def test_refresh_returns_rotated_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("token_refresh"), {"refresh": self.refresh}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+
+        # The rotated-out token can't be replayed
+        response = self.client.post(reverse("token_refresh"), {"refresh": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_does_not_load_user_row_when_cached(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": self.refresh})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                reverse("token_refresh"), {"refresh": response.data["refresh"]}
+            )
+
+        self.assertFalse(
+            [q for q in queries if 'FROM "authentication_user"' in q["sql"]]
+        )
+
+    def test_refresh_rejected_after_user_deactivated(self):
+        self.client.post(reverse("token_refresh"), {"refresh": self.refresh})
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": self.refresh})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_verify_accepts_valid_and_rejects_revoked_tokens(self):
+        response = self.client.post(reverse("token_verify"), {"token": self.access})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("rest_logout"), {"refresh": self.refresh})
+        response = self.client.post(reverse("token_verify"), {"token": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_logout_revokes_refresh_token(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("rest_logout"), {"refresh": self.refresh}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_requires_refresh_token(self):
+        response = self.client.post(reverse("rest_logout"), {})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@pytest.mark.django_db
+class SessionRegistryTests(APITestCase):
+    """Device sessions recorded at login, listed and revoked per user."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from .denylist import denylist
+
+        cache.clear()
+        denylist.reset()
+        self.client = APIClient()
+        self.email = "sessions@example.com"
+        self.password = "SessionsPass2024!"
+        self.user = User.objects.create_user(
+            email=self.email, password=self.password, username="sessions"
+        )
+        EmailAddress.objects.create(
+            user=self.user, email=self.email, verified=True, primary=True
+        )
+
+    def login(self, user_agent="test-agent"):
+        response = self.client.post(
+            reverse("rest_login"),
+            {"email": self.email, "password": self.password},
+            HTTP_USER_AGENT=user_agent,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_login_records_session(self):
+        from .models import UserSession
+        from .tokens import RefreshToken
+
+        tokens = self.login(user_agent="Firefox")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        response = self.client.get(reverse("session_list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["user_agent"], "Firefox")
+        self.assertEqual(
+            UserSession.objects.get().jti, RefreshToken(tokens["refresh"])["jti"]
+        )
+
+    def test_session_records_client_address_from_proxy(self):
+        from django.test import override_settings
+
+        from .models import UserSession
+
+        self.login()
+        self.assertEqual(UserSession.objects.get().ip_address, "127.0.0.1")
+
+        with override_settings(CLIENT_IP_HEADER="X-Forwarded-For"):
+            self.client.post(
+                reverse("rest_login"),
+                {"email": self.email, "password": self.password},
+                HTTP_X_FORWARDED_FOR="10.0.0.9, 203.0.113.7",
+            )
+        with override_settings(CLIENT_IP_HEADER="X-Real-IP"):
+            self.client.post(
+                reverse("rest_login"),
+                {"email": self.email, "password": self.password},
+                HTTP_X_REAL_IP="not-an-address",
+            )
+
+        self.assertEqual(
+            list(
+                UserSession.objects.order_by("pk").values_list("ip_address", flat=True)
+            ),
+            ["127.0.0.1", "203.0.113.7", "127.0.0.1"],
+        )
+
+    def test_session_follows_refresh_rotation(self):
+        from .models import UserSession
+        from .tokens import RefreshToken
+
+        tokens = self.login()
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": tokens["refresh"]}
+        )
+
+        self.assertEqual(UserSession.objects.count(), 1)
+        session = UserSession.objects.get()
+        self.assertEqual(session.jti, RefreshToken(response.data["refresh"])["jti"])
+
+    def test_revoking_session_revokes_its_refresh_token(self):
+        from .models import UserSession
+
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        session = UserSession.objects.get()
+
+        response = self.client.delete(reverse("session_revoke", args=[session.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cannot_revoke_another_users_session(self):
+        from datetime import timedelta
+
+        from .models import UserSession
+
+        other = User.objects.create_user(
+            email="other@example.com", password="x", username="other"
+        )
+        session = UserSession.objects.create(
+            user=other,
+            jti="other-jti",
+            issued_at=timezone.now(),
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        response = self.client.delete(reverse("session_revoke", args=[session.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cap_evicts_oldest_session(self):
+        from django.test import override_settings
+
+        from .models import UserSession
+
+        with override_settings(MAX_SESSIONS_PER_USER=2):
+            first = self.login()
+            self.login()
+            self.login()
+
+        self.assertEqual(UserSession.objects.filter(user=self.user).count(), 2)
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": first["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_forgets_session(self):
+        from .models import UserSession
+
+        tokens = self.login()
+        self.client.post(reverse("rest_logout"), {"refresh": tokens["refresh"]})
+
+        self.assertFalse(UserSession.objects.exists())
+
+
+@pytest.mark.django_db
+class UserAdminBulkActionTests(TestCase):
+    """Set-based admin actions on users and email addresses"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin123"
+        )
+        self.client.force_login(self.admin)
+        self.changelist_url = reverse("admin:authentication_user_changelist")
+        self.users = [
+            User.objects.create_user(
+                username=f"bulk{i}", email=f"bulk{i}@example.com", password="x"
+            )
+            for i in range(5)
+        ]
+        for user in self.users[:3]:
+            EmailAddress.objects.create(
+                user=user, email=user.email, verified=False, primary=True
+            )
+
+    def post_action(self, action, users):
+        return self.client.post(
+            self.changelist_url,
+            {
+                "action": action,
+                "_selected_action": [user.pk for user in users],
+            },
+        )
+
+    def test_verify_emails_updates_and_creates_addresses(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post_action("verify_emails", self.users)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            EmailAddress.objects.filter(user__in=self.users, verified=True).count(), 5
+        )
+        # One UPDATE and one INSERT regardless of the selection size
+        statements = [q["sql"].split()[0] for q in ctx.captured_queries]
+        self.assertEqual(statements.count("UPDATE"), 1)
+        self.assertEqual(statements.count("INSERT"), 1)
+
+    def test_verify_emails_skips_address_verified_by_another_user(self):
+        EmailAddress.objects.create(
+            user=self.users[4], email=self.users[0].email, verified=True, primary=False
+        )
+
+        self.post_action("verify_emails", self.users[:1])
+
+        self.assertFalse(EmailAddress.objects.get(user=self.users[0]).verified)
+
+    def test_deactivate_users_invalidates_cached_state(self):
+        from .user_cache import is_user_active
+
+        self.assertTrue(is_user_active(self.users[0].pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_action("deactivate_users", self.users[:2])
+
+        self.assertFalse(
+            User.objects.filter(
+                pk__in=[u.pk for u in self.users[:2]], is_active=True
+            ).exists()
+        )
+        self.assertTrue(User.objects.get(pk=self.users[2].pk).is_active)
+        self.assertFalse(is_user_active(self.users[0].pk))
+
+    def test_changelist_filters_by_email_verified(self):
+        EmailAddress.objects.filter(user=self.users[0]).update(verified=True)
+
+        response = self.client.get(self.changelist_url, {"email_verified": "yes"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [user.pk for user in response.context["cl"].result_list], [self.users[0].pk]
+        )
+
+    def test_email_address_make_verified_is_set_based(self):
+        url = reverse("admin:account_emailaddress_changelist")
+        addresses = EmailAddress.objects.filter(user__in=self.users[:3])
+
+        response = self.client.post(
+            url,
+            {
+                "action": "make_verified",
+                "_selected_action": list(addresses.values_list("pk", flat=True)),
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(addresses.filter(verified=True).count(), 3)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Falls back to an exact count outside PostgreSQL"""
+
+    def test_exact_count_on_sqlite(self):
+        from core.paginator import EstimatedCountPaginator
+
+        User.objects.create_user(username="p1", email="p1@example.com", password="x")
+        paginator = EstimatedCountPaginator(User.objects.order_by("pk"), 10)
+
+        self.assertEqual(paginator.count, 1)
+
+
+@pytest.mark.django_db
+class UserListEndpointTests(APITestCase):
+    """Admin user listing with filters and keyset pagination"""
+
+    def setUp(self):
+        from datetime import timedelta
+
+        self.url = reverse("user_list")
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@corp.example", password="admin123"
+        )
+        self.client.force_authenticate(self.admin)
+        start = timezone.now() - timedelta(days=30)
+        self.users = []
+        for i in range(7):
+            user = User.objects.create_user(
+                username=f"list{i}",
+                email=f'list{i}@{"corp" if i % 2 else "mail"}.example',
+                password="x",
+            )
+            User.objects.filter(pk=user.pk).update(
+                date_joined=start + timedelta(days=i)
+            )
+            self.users.append(user)
+        EmailAddress.objects.create(
+            user=self.users[0], email=self.users[0].email, verified=True
+        )
+        EmailAddress.objects.create(
+            user=self.users[1], email=self.users[1].email, verified=False
+        )
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(self.users[0])
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_keyset_pages_cover_every_user_once(self):
+        seen = []
+        url = f"{self.url}?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+
+        expected = list(
+            User.objects.order_by("-date_joined", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_page_query_uses_keyset_not_offset(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        first = self.client.get(self.url, {"page_size": 2})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data["next"])
+
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn("OFFSET", sql)
+        # Leading bound on date_joined so the index is used as a range
+        self.assertIn('"date_joined" <= ', sql)
+        self.assertNotIn('"password"', sql)
+
+    def test_filters(self):
+        response = self.client.get(self.url, {"email_domain": "corp.example"})
+        emails = {row["email"] for row in response.data["results"]}
+        self.assertTrue(emails)
+        self.assertTrue(all(email.endswith("@corp.example") for email in emails))
+
+        response = self.client.get(self.url, {"verified": "true"})
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.users[0].pk]
+        )
+        self.assertTrue(response.data["results"][0]["email_verified"])
+
+        joined = User.objects.get(pk=self.users[3].pk).date_joined
+        response = self.client.get(self.url, {"date_joined_before": joined.isoformat()})
+        self.assertEqual(
+            {row["id"] for row in response.data["results"]},
+            {u.pk for u in self.users[:4]},
+        )
+
+    def test_invalid_cursor(self):
+        import base64
+        import json
+
+        def encode(values):
+            return (
+                base64.urlsafe_b64encode(json.dumps(values).encode())
+                .decode()
+                .rstrip("=")
+            )
+
+        for cursor in [
+            "not-a-cursor",
+            encode(["2024-13-45T00:00:00+00:00", 1]),
+            encode(["2024-01-01T00:00:00+00:00", "abc"]),
+            encode(["2024-01-01T00:00:00+00:00", None]),
+            encode([[], 1]),
+            encode(["2024-01-01T00:00:00+00:00"]),
+        ]:
+            response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, cursor)
+
+
+@pytest.mark.django_db
+class UserExportTests(APITestCase):
+    """Streaming CSV/JSONL user export"""
+
+    def setUp(self):
+        self.url = reverse("user_export")
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin123"
+        )
+        for i in range(5):
+            User.objects.create_user(
+                username=f"exp{i}", email=f"exp{i}@example.com", password="x"
+            )
+        EmailAddress.objects.create(
+            user=self.admin, email=self.admin.email, verified=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.get(username="exp0"))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv_export_is_streamed(self):
+        import csv
+        import io
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            'attachment; filename="users.csv"', response["Content-Disposition"]
+        )
+        rows = list(
+            csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(len(rows), 6)
+        self.assertNotIn("password", rows[0])
+        self.assertEqual(rows[0]["email_verified"], "True")
+
+    def test_gzipped_jsonl_export_with_filter(self):
+        import gzip
+        import json
+
+        response = self.client.get(
+            self.url, {"fmt": "jsonl", "gzip": "1", "verified": "false"}
+        )
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        lines = (
+            gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        )
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 5)
+        self.assertFalse(any(record["email_verified"] for record in records))
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {"fmt": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunks_are_buffered(self):
+        from . import export
+
+        with patch.object(export, "BUFFER_SIZE", 500):
+            chunks = list(export.stream_users("jsonl", chunk_size=2))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertLess(len(chunks), 6)
+
+    def test_management_command_writes_file(self):
+        import gzip
+        import io
+        import os
+        import tempfile
+
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.jsonl.gz")
+            call_command(
+                "export_users",
+                "--format",
+                "jsonl",
+                "--gzip",
+                "-o",
+                path,
+                stderr=io.StringIO(),
+            )
+            with gzip.open(path, "rt") as f:
+                self.assertEqual(len(f.read().splitlines()), 6)
+
+
+class ConfigCacheTests(TestCase):
+    """Settings-derived values are cached and follow setting_changed"""
+
+    def test_verification_code_follows_secret_key(self):
+        from django.test import override_settings
+
+        from .utils import generate_verification_code
+
+        before = generate_verification_code("cache-key")
+        with override_settings(SECRET_KEY="another-secret-key-for-tests"):
+            changed = generate_verification_code("cache-key")
+            self.assertEqual(
+                changed,
+                generate_verification_code("cache-key", "another-secret-key-for-tests"),
+            )
+        self.assertNotEqual(before, changed)
+        self.assertEqual(generate_verification_code("cache-key"), before)
+
+    def test_registration_does_not_send_django_messages(self):
+        response = self.client.post(
+            reverse("rest_register"),
+            {
+                "email": "messages@example.com",
+                "password1": "StrongPass123!",
+                "password2": "StrongPass123!",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("messages", response.cookies)
+
+    def test_register_serializer_username_max_length(self):
+        from .serializers import CustomRegisterSerializer
+
+        field = CustomRegisterSerializer().fields["username"]
+        self.assertEqual(field.max_length, User._meta.get_field("username").max_length)
+
+
+class BreachedPasswordValidatorTests(TestCase):
+    """Memory-mapped breached password index"""
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        from django.core.management import call_command
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        source = os.path.join(self.tmp.name, "breached.txt")
+        with open(source, "w") as f:
+            f.write("Tr0ub4dor&3\ncorrect horse battery staple\n")
+        self.index_path = os.path.join(self.tmp.name, "passwords.idx")
+        call_command(
+            "build_password_index", source, "-o", self.index_path, stdout=io.StringIO()
+        )
+
+    def validate(self, password):
+        from django.contrib.auth.password_validation import validate_password
+        from django.test import override_settings
+
+        validators = [
+            {
+                "NAME": "authentication.password_validation.BreachedPasswordValidator",
+                "OPTIONS": {"index_path": self.index_path},
+            }
+        ]
+        with override_settings(AUTH_PASSWORD_VALIDATORS=validators):
+            validate_password(password)
+
+    def test_rejects_listed_passwords(self):
+        from django.core.exceptions import ValidationError
+
+        with self.assertRaises(ValidationError) as ctx:
+            self.validate("Tr0ub4dor&3")
+        self.assertEqual(ctx.exception.error_list[0].code, "password_breached")
+
+    def test_includes_django_common_passwords_case_insensitively(self):
+        from django.core.exceptions import ValidationError
+
+        with self.assertRaises(ValidationError):
+            self.validate("Password123")
+
+    def test_accepts_unlisted_passwords(self):
+        self.validate("StrongPass123!unlisted")
+
+    def test_sha1_dump_format(self):
+        import hashlib
+        import os
+
+        from django.core.exceptions import ValidationError
+        from django.core.management import call_command
+
+        from .password_validation import BreachedPasswordValidator
+
+        dump = os.path.join(self.tmp.name, "pwned.txt")
+        rare = hashlib.sha1(b"rarely-seen").hexdigest().upper()
+        often = hashlib.sha1(b"often-seen").hexdigest().upper()
+        with open(dump, "w") as f:
+            f.write(f"{rare}:1\n{often}:250\n")
+        path = os.path.join(self.tmp.name, "pwned.idx")
+        call_command(
+            "build_password_index",
+            dump,
+            "-o",
+            path,
+            "--format",
+            "sha1",
+            "--min-count",
+            "10",
+            "--no-django-common",
+            stdout=io.StringIO(),
+        )
+
+        validator = BreachedPasswordValidator(index_path=path)
+        self.assertEqual(len(validator.index), 1)
+        validator.validate("rarely-seen")
+        with self.assertRaises(ValidationError):
+            validator.validate("often-seen")
+
+    def test_sha1_dump_reports_malformed_line(self):
+        import hashlib
+        import os
+
+        from django.core.management import CommandError, call_command
+
+        dump = os.path.join(self.tmp.name, "bad.txt")
+        digest = hashlib.sha1(b"fine").hexdigest().upper()
+        with open(dump, "wb") as f:
+            f.write(f"{digest}:12\r\n{digest}:lots\r\n".encode())
+        path = os.path.join(self.tmp.name, "bad.idx")
+
+        with self.assertRaisesMessage(CommandError, "line 2"):
+            call_command(
+                "build_password_index",
+                dump,
+                "-o",
+                path,
+                "--format",
+                "sha1",
+                "--no-django-common",
+                stdout=io.StringIO(),
+            )
+        self.assertFalse(os.path.exists(path))
+
+
+class EmailDomainPolicyTests(APITestCase):
+    """Blocked email domains are rejected before any registration work"""
+
+    def setUp(self):
+        import tempfile
+
+        from django.test import override_settings
+
+        from .email_domains import domain_policy
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.blocklist = self.build(
+            "blocklist", "mailinator.com\n# comment\nExample.ORG.\n"
+        )
+        self.allowlist = self.build("allowlist", "corp.example.org\n")
+        overrides = override_settings(
+            EMAIL_DOMAIN_BLOCKLIST_PATH=self.blocklist,
+            EMAIL_DOMAIN_ALLOWLIST_PATH=self.allowlist,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(domain_policy.cache_clear)
+        self.url = reverse("rest_register")
+
+    def build(self, name, content):
+        import os
+
+        from django.core.management import call_command
+
+        source = os.path.join(self.tmp.name, f"{name}.txt")
+        with open(source, "w") as f:
+            f.write(content)
+        path = os.path.join(self.tmp.name, f"{name}.idx")
+        call_command("build_domain_index", source, "-o", path, stdout=io.StringIO())
+        return path
+
+    def register(self, email):
+        return self.client.post(
+            self.url,
+            {
+                "email": email,
+                "password1": "StrongPass123!",
+                "password2": "StrongPass123!",
+            },
+        )
+
+    def test_rejects_blocked_domains_and_subdomains_without_queries(self):
+        for email in ("a@mailinator.com", "b@eu.mx.Mailinator.com", "c@example.org."):
+            with self.assertNumQueries(0):
+                response = self.register(email)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("email", response.data)
+        self.assertFalse(User.objects.exists())
+
+    def test_allowlist_overrides_blocklist(self):
+        from .email_domains import is_email_domain_blocked
+
+        self.assertFalse(is_email_domain_blocked("x@corp.example.org"))
+        self.assertFalse(is_email_domain_blocked("x@eu.corp.example.org"))
+        self.assertTrue(is_email_domain_blocked("x@other.example.org"))
+        self.assertFalse(is_email_domain_blocked("x@notmailinator.com"))
+        response = self.register("new@corp.example.org")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_most_specific_listed_domain_wins(self):
+        from .email_domains import domain_policy, is_email_domain_blocked
+
+        self.build("blocklist", "example.org\nbad.corp.example.org\n")
+        domain_policy().blocklist.refresh()
+
+        self.assertFalse(is_email_domain_blocked("x@corp.example.org"))
+        self.assertTrue(is_email_domain_blocked("x@bad.corp.example.org"))
+        self.assertTrue(is_email_domain_blocked("x@eu.bad.corp.example.org"))
+        self.assertTrue(is_email_domain_blocked("x@other.example.org"))
+
+    def test_rebuilt_index_is_picked_up(self):
+        from .email_domains import domain_policy, is_email_domain_blocked
+
+        self.assertFalse(is_email_domain_blocked("x@tempmail.dev"))
+        self.build("blocklist", "tempmail.dev\n")
+        domain_policy().blocklist.refresh()
+        self.assertTrue(is_email_domain_blocked("x@tempmail.dev"))
+        self.assertFalse(is_email_domain_blocked("x@mailinator.com"))
+
+
+class PermissionCacheTests(APITestCase):
+    """Permission sets are cached across user instances until they change"""
+
+    def setUp(self):
+        from django.contrib.auth.models import Group, Permission
+
+        self.staff = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="staff123",
+            is_staff=True,
+        )
+        self.view_user = Permission.objects.get(
+            content_type__app_label="authentication", codename="view_user"
+        )
+        self.group = Group.objects.create(name="support")
+        self.group.permissions.add(self.view_user)
+        self.staff.groups.add(self.group)
+
+    def fresh(self):
+        # A new instance per check, as JWT authentication loads per request
+        return User.objects.get(pk=self.staff.pk)
+
+    def committed(self):
+        # Versions are bumped on commit; run those callbacks in the test
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def test_permission_checks_are_cache_hits_across_instances(self):
+        self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("authentication.view_user"))
+            self.assertFalse(user.has_perm("authentication.delete_user"))
+
+    def test_admin_endpoints_only_require_staff(self):
+        url = reverse("user_list")
+        with self.committed():
+            self.staff.groups.clear()
+        self.client.force_authenticate(self.fresh())
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_invalidation_waits_for_commit(self):
+        self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.staff.groups.remove(self.group)
+            # Still the entry for the committed state until the commit
+            self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        self.assertFalse(self.fresh().has_perm("authentication.view_user"))
+
+    def test_membership_changes_invalidate(self):
+        self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.staff.groups.remove(self.group)
+        self.assertFalse(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.group.user_set.add(self.staff)
+        self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.group.user_set.clear()
+        self.assertFalse(self.fresh().has_perm("authentication.view_user"))
+
+    def test_group_and_direct_permission_changes_invalidate(self):
+        self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.group.permissions.remove(self.view_user)
+        self.assertFalse(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.staff.user_permissions.add(self.view_user)
+        self.assertTrue(self.fresh().has_perm("authentication.view_user"))
+        with self.committed():
+            self.view_user.user_set.remove(self.staff)
+        self.assertFalse(self.fresh().has_perm("authentication.view_user"))
+
+    def test_superuser_flag_change_invalidates(self):
+        self.assertNotIn(
+            "authentication.delete_user", self.fresh().get_all_permissions()
+        )
+        self.staff.is_superuser = True
+        with self.committed():
+            self.staff.save()
+        self.assertIn("authentication.delete_user", self.fresh().get_all_permissions())
+
+
+class CurrentUserEndpointTests(APITestCase):
+    """Current user details with ETag-based conditional requests"""
+
+    def setUp(self):
+        self.url = reverse("rest_user_details")
+        self.user = User.objects.create_user(
+            email="me@example.com", password="MePass2024!", username="me"
+        )
+        self.address = EmailAddress.objects.create(
+            user=self.user, email=self.user.email, verified=False, primary=True
+        )
+        self.address.verified = True
+        self.address.save()
+        response = self.client.post(
+            reverse("rest_login"),
+            {
+                "email": "me@example.com",
+                "password": "MePass2024!",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_returns_details_with_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "me@example.com")
+        self.assertTrue(response.data["email_verified"])
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_matching_etag_is_answered_without_queries(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_patch_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {"first_name": "Ada"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["first_name"], "Ada")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["first_name"], "Ada")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_patch_with_stale_if_match_fails(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url, {"first_name": "Ada"}, format="json")
+        response = self.client.patch(
+            self.url, {"first_name": "Grace"}, format="json", HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Ada")
+
+    def test_email_is_read_only(self):
+        response = self.client.patch(
+            self.url, {"email": "other@example.com"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "me@example.com")
+
+    def test_email_address_changes_invalidate(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.address.verified = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.address.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["email_verified"])
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_version_is_read_before_the_row(self):
+        from unittest import mock
+
+        from . import views
+        from .user_cache import invalidate_user
+
+        load = views.CurrentUserView.get_object
+
+        def get_object_during_write(view):
+            # A write commits while the row is being loaded
+            with self.captureOnCommitCallbacks(execute=True):
+                User.objects.filter(pk=self.user.pk).update(first_name="Late")
+                invalidate_user(self.user.pk)
+            return load(view)
+
+        with mock.patch.object(
+            views.CurrentUserView, "get_object", get_object_during_write
+        ):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data["first_name"], "Late")
+        # The ETag predates the write, so the next request isn't answered 304
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_requests_need_a_shared_cache(self):
+        from django.test import override_settings
+
+        etag = self.client.get(self.url)["ETag"]
+        with override_settings(SHARED_CACHE=False):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("ETag", response)
+            self.assertIn("no-store", response["Cache-Control"])
+
+            response = self.client.patch(
+                self.url, {"first_name": "Ada"}, format="json", HTTP_IF_MATCH=etag
+            )
+            self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+
+class VerificationStatusStreamTests(TestCase):
+    """Server-sent verification status for pending signups"""
+
+    def setUp(self):
+        from .verification_status import make_status_token
+
+        self.user = User.objects.create_user(
+            email="pending@example.com", password="PendingPass2024!", username="pending"
+        )
+        self.address = EmailAddress.objects.create(
+            user=self.user, email=self.user.email, verified=False, primary=True
+        )
+        self.url = reverse("verification_status")
+        self.token = make_status_token(self.user.pk)
+
+    async def open_stream(self):
+        response = await self.async_client.get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return aiter(response.streaming_content)
+
+    async def next_event(self, stream):
+        import asyncio
+
+        return (await asyncio.wait_for(anext(stream), timeout=5)).decode()
+
+    def test_registration_returns_status_token(self):
+        from .verification_status import read_status_token
+
+        response = self.client.post(
+            reverse("rest_register"),
+            {
+                "email": "new@example.com",
+                "password1": "StrongPass123!",
+                "password2": "StrongPass123!",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(email="new@example.com")
+        self.assertEqual(read_status_token(response.json()["status_token"]), user.pk)
+
+    def test_rejects_invalid_token(self):
+        response = self.client.get(self.url, {"token": self.token + "x"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_refused_under_wsgi(self):
+        # The WSGI handler would buffer the whole stream before sending it
+        response = self.client.get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    async def test_streams_confirmation_in_this_process(self):
+        from .verification_status import broker, publish_verified
+
+        stream = await self.open_stream()
+        self.assertIn('"verified": false', await self.next_event(stream))
+        self.assertEqual(broker.subscriber_count(), 1)
+
+        publish_verified(self.user.pk)
+        self.assertIn('"verified": true', await self.next_event(stream))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_poller_picks_up_confirmations_from_other_workers(self):
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        from .verification_status import _status_key
+
+        with override_settings(VERIFICATION_STATUS_POLL_INTERVAL=0.01):
+            stream = await self.open_stream()
+            self.assertIn('"verified": false', await self.next_event(stream))
+            # Another worker only has the cache in common with this one
+            await cache.aset(_status_key(self.user.pk), True)
+            self.assertIn('"verified": true', await self.next_event(stream))
+
+    async def test_already_verified_address_ends_immediately(self):
+        self.address.verified = True
+        await self.address.asave()
+        stream = await self.open_stream()
+        self.assertIn('"verified": true', await self.next_event(stream))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    def test_code_verification_publishes_after_commit(self):
+        from django.core.cache import cache
+
+        from .utils import generate_verification_code
+        from .verification_status import _status_key
+
+        confirmation = EmailConfirmation.create(self.address)
+        confirmation.sent = timezone.now()
+        confirmation.save()
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse("rest_verify_email"),
+                {
+                    "email": self.user.email,
+                    "code": generate_verification_code(confirmation.key),
+                },
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNone(cache.get(_status_key(self.user.pk)))
+        for callback in callbacks:
+            callback()
+        self.assertTrue(cache.get(_status_key(self.user.pk)))
+
+
+class AuditEventTests(APITestCase):
+    """Security events are buffered and written in batches"""
+
+    def setUp(self):
+        self.url = reverse("rest_verify_email")
+        self.user = User.objects.create_user(
+            email="audit@example.com", password="AuditPass2024!", username="audit"
+        )
+        self.address = EmailAddress.objects.create(
+            user=self.user, email=self.user.email, verified=False, primary=True
+        )
+        self.confirmation = EmailConfirmation.create(self.address)
+        self.confirmation.sent = timezone.now()
+        self.confirmation.save()
+
+    def test_events_are_buffered_until_flushed(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from . import audit
+        from .models import AuditEvent
+
+        response = self.client.post(
+            self.url, {"email": self.user.email, "code": "000000"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            self.url, {"email": "ghost@example.com", "code": "000000"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(AuditEvent.objects.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(audit.flush(), 2)
+        # One INSERT for the batch (plus the test transaction's savepoint)
+        self.assertEqual([q["sql"].split()[0] for q in queries].count("INSERT"), 1)
+        invalid, unknown = AuditEvent.objects.order_by("pk")
+        self.assertEqual(invalid.event_type, AuditEvent.EventType.CODE_INVALID)
+        self.assertEqual(invalid.user_id, self.user.pk)
+        self.assertEqual(invalid.data, {"attempts": 1})
+        self.assertEqual(invalid.ip_address, "127.0.0.1")
+        self.assertEqual(unknown.event_type, AuditEvent.EventType.UNKNOWN_EMAIL)
+        self.assertEqual(unknown.email, "ghost@example.com")
+
+    def test_lockout_and_success_are_recorded(self):
+        from . import audit
+        from .models import AuditEvent
+        from .utils import generate_verification_code
+        from .views import CustomVerifyEmailView
+
+        for _ in range(CustomVerifyEmailView.MAX_VERIFICATION_ATTEMPTS):
+            self.client.post(self.url, {"email": self.user.email, "code": "000000"})
+        confirmation = EmailConfirmation.create(self.address)
+        confirmation.sent = timezone.now()
+        confirmation.save()
+        self.client.post(
+            self.url,
+            {
+                "email": self.user.email,
+                "code": generate_verification_code(confirmation.key),
+            },
+        )
+        audit.flush()
+
+        event_types = list(
+            AuditEvent.objects.order_by("pk").values_list("event_type", flat=True)
+        )
+        self.assertEqual(
+            event_types[-2:],
+            [AuditEvent.EventType.LOCKOUT, AuditEvent.EventType.VERIFIED],
+        )
+
+    def test_untrusted_email_is_truncated(self):
+        from . import audit
+        from .models import AuditEvent
+
+        response = self.client.post(
+            self.url, {"email": "x" * 300 + "@example.com", "code": "000000"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        audit.record(AuditEvent.EventType.UNKNOWN_EMAIL, email=["not", "a", "string"])
+        audit.flush()
+
+        emails = list(AuditEvent.objects.order_by("pk").values_list("email", flat=True))
+        self.assertEqual(
+            [len(email) for email in emails], [254, len("['not', 'a', 'string']")]
+        )
+
+    def test_rejected_row_does_not_drop_the_batch(self):
+        from unittest import mock
+
+        from django.db import DataError
+
+        from core.metrics import REGISTRY
+
+        from . import audit
+        from .models import AuditEvent
+
+        bulk_create = AuditEvent.objects.bulk_create
+
+        def reject_bad_rows(events, **kwargs):
+            if any(event.email == "bad@example.com" for event in events):
+                raise DataError("value too long for type character varying(254)")
+            return bulk_create(events, **kwargs)
+
+        for email in (
+            "a@example.com",
+            "bad@example.com",
+            "b@example.com",
+            "c@example.com",
+        ):
+            audit.record(AuditEvent.EventType.UNKNOWN_EMAIL, email=email)
+        with mock.patch.object(
+            AuditEvent.objects, "bulk_create", side_effect=reject_bad_rows
+        ):
+            self.assertEqual(audit.flush(), 3)
+
+        self.assertEqual(
+            sorted(AuditEvent.objects.values_list("email", flat=True)),
+            ["a@example.com", "b@example.com", "c@example.com"],
+        )
+        output = REGISTRY.generate_latest()
+        self.assertIn('auth_audit_events_total{outcome="dropped"} 1', output)
+        self.assertIn('auth_audit_events_total{outcome="written"} 3', output)
+
+    def test_buffer_is_bounded(self):
+        from django.test import override_settings
+
+        from . import audit
+        from .models import AuditEvent
+
+        with override_settings(AUDIT_MAX_BUFFER=3):
+            for i in range(5):
+                audit.record(
+                    AuditEvent.EventType.UNKNOWN_EMAIL, email=f"{i}@example.com"
+                )
+            self.assertEqual(audit.audit_writer.pending(), 3)
+        audit.flush()
+        self.assertEqual(
+            list(AuditEvent.objects.order_by("pk").values_list("email", flat=True)),
+            ["2@example.com", "3@example.com", "4@example.com"],
+        )
+
+    def test_prune_removes_only_expired_events(self):
+        from datetime import timedelta
+
+        from django.core.management import call_command
+
+        from .models import AuditEvent
+
+        now = timezone.now()
+        AuditEvent.objects.bulk_create(
+            [
+                AuditEvent(
+                    event_type="code_invalid",
+                    email=f"{age}@example.com",
+                    created_at=now - timedelta(days=age),
+                )
+                for age in (120, 100, 95, 10, 1)
+            ]
+        )
+        out = io.StringIO()
+        call_command(
+            "prune_audit_events", "--days", "90", "--batch-size", "2", stdout=out
+        )
+
+        self.assertIn("Deleted 3", out.getvalue())
+        self.assertEqual(
+            sorted(AuditEvent.objects.values_list("email", flat=True)),
+            ["10@example.com", "1@example.com"],
+        )
+
+
+class EmailCaseUniqueMigrationTests(TransactionTestCase):
+    """The 0006 migration refuses to run over emails differing only by case"""
+
+    def _migrate(self, target=None):
+        from django.db import connection
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(target or executor.loader.graph.leaf_nodes())
+
+    def tearDown(self):
+        self._migrate()
+
+    def test_stops_with_the_duplicate_accounts(self):
+        from django.core.management.base import CommandError
+
+        self._migrate([("authentication", "0005_user_date_joined_index")])
+        # Bulk insert: no signals writing to tables 0005 does not have yet
+        User.objects.bulk_create(
+            [
+                User(email=email, username=email)
+                for email in ("dup@example.com", "Dup@Example.com", "other@example.com")
+            ]
+        )
+
+        with self.assertRaises(CommandError) as raised:
+            self._migrate([("authentication", "0006_user_email_ci_unique")])
+
+        message = str(raised.exception)
+        self.assertIn("1 email address(es)", message)
+        self.assertIn("dup@example.com, #", message)
+        self.assertIn("Dup@Example.com", message)
+        self.assertNotIn("other@example.com", message)
+
+        User.objects.filter(email="Dup@Example.com").update(email="dup2@example.com")
+        self._migrate([("authentication", "0006_user_email_ci_unique")])
@@ -1,14 +1,43 @@
 # authentication/urls.py
 
 from django.urls import path
-from .views import CustomVerifyEmailView
-from dj_rest_auth.views import LoginView as DjRestAuthLoginView
-from dj_rest_auth.registration.views import RegisterView as DjRestAuthRegisterView
-from dj_rest_auth.registration.views import VerifyEmailView as DjRestAuthVerifyEmailView
+from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
+
+from .views import (
+    CurrentUserView,
+    CustomLoginView,
+    CustomLogoutView,
+    CustomRegisterView,
+    CustomVerifyEmailView,
+    SessionListView,
+    SessionRevokeView,
+    UserExportView,
+    UserListView,
+    verification_status,
+)
+
 urlpatterns = [
     # Authentication endpoints
-    path("login/", DjRestAuthLoginView.as_view(), name="rest_login"),
-    path("registration/", DjRestAuthRegisterView.as_view(), name="rest_register"),
+    path("login/", CustomLoginView.as_view(), name="rest_login"),
+    path("logout/", CustomLogoutView.as_view(), name="rest_logout"),
+    # JWT endpoints (renewing a session costs an HMAC check, not a password hash)
+    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    # Current user (conditional GET via ETag)
+    path("user/", CurrentUserView.as_view(), name="rest_user_details"),
+    # Device sessions
+    path("sessions/", SessionListView.as_view(), name="session_list"),
+    path("sessions/<int:pk>/", SessionRevokeView.as_view(), name="session_revoke"),
+    # Admin user listing
+    path("users/", UserListView.as_view(), name="user_list"),
+    path("users/export/", UserExportView.as_view(), name="user_export"),
+    path("registration/", CustomRegisterView.as_view(), name="rest_register"),
+    # Server-sent events: verification status of a pending signup
+    path(
+        "registration/status/",
+        verification_status,
+        name="verification_status",
+    ),
     # Email verification endpoint
     path(
         "registration/verify-email/",
@@ -0,0 +1,128 @@
+"""
+Cached per-user state that is read on hot paths without loading the user row.
+
+Entries are invalidated by the receivers in ``authentication.signals``
+whenever the user is saved or deleted. The same receivers bump the user's
+version counter (``user_version``), which also changes on email address
+updates and backs the current-user endpoint's ETag. Like the permission
+versions below, this happens once the writing transaction commits, so no
+request can cache rows from before the commit under the new state.
+
+Permission sets are cached under a key that embeds two version counters: one
+per user (bumped when the user, their groups or their direct permissions
+change) and a global one (bumped when any group's permissions, a group or a
+permission change, since those affect every member). Bumping a version makes
+the old entries unreachable; they simply expire. Permission versions are
+bumped only once the changing transaction commits: bumped earlier, a request
+running in between could compute the set from the old rows and cache it
+under the new version.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+ACTIVE_CACHE_PREFIX = "user_active"
+ACTIVE_CACHE_TIMEOUT = 300  # seconds
+
+USER_VERSION_PREFIX = "user_version"
+
+PERMS_CACHE_PREFIX = "user_perms"
+PERMS_CACHE_TIMEOUT = 300  # seconds
+PERMS_VERSION_PREFIX = "perms_version"
+GLOBAL_PERMS_VERSION_KEY = f"{PERMS_VERSION_PREFIX}:global"
+
+
+def _active_key(user_id):
+    return f"{ACTIVE_CACHE_PREFIX}:{user_id}"
+
+
+def is_user_active(user_id):
+    """Return whether ``user_id`` exists and is active, caching the answer."""
+    key = _active_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = get_user_model().objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, active, timeout=ACTIVE_CACHE_TIMEOUT)
+    return active
+
+
+def _user_version_key(user_id):
+    return f"{USER_VERSION_PREFIX}:{user_id}"
+
+
+def _versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start a missing (or evicted) counter at a fresh value so it can
+            # never line up with anything derived from an earlier incarnation
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def user_version(user_id):
+    """Counter that changes whenever the user or their email addresses change."""
+    return _versions([_user_version_key(user_id)])[0]
+
+
+def invalidate_user(user_id):
+    def invalidate():
+        cache.delete(_active_key(user_id))
+        _bump(_user_version_key(user_id))
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_users(user_ids):
+    """Bulk variant of ``invalidate_user`` for queryset ``update()`` calls."""
+    # A deleted version counter restarts at a fresh value, which is as good
+    # as a bump and takes a single round trip for the whole batch
+    keys = [_active_key(user_id) for user_id in user_ids] + [
+        _user_version_key(user_id) for user_id in user_ids
+    ]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _perms_version_key(user_id):
+    return f"{PERMS_VERSION_PREFIX}:user:{user_id}"
+
+
+def cached_permissions(user_id, compute):
+    """
+    Return ``{"user": set, "group": set}`` of permission names for
+    ``user_id``, calling ``compute()`` to build it on a cache miss.
+    """
+    global_version, version = _versions(
+        [GLOBAL_PERMS_VERSION_KEY, _perms_version_key(user_id)]
+    )
+    key = f"{PERMS_CACHE_PREFIX}:{user_id}:{global_version}:{version}"
+    perms = cache.get(key)
+    if perms is None:
+        perms = compute()
+        cache.set(key, perms, timeout=PERMS_CACHE_TIMEOUT)
+    return perms
+
+
+def invalidate_user_permissions(user_ids):
+    keys = [_perms_version_key(user_id) for user_id in user_ids]
+
+    def bump():
+        for key in keys:
+            _bump(key)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_all_permissions():
+    transaction.on_commit(lambda: _bump(GLOBAL_PERMS_VERSION_KEY))
@@ -1,16 +1,62 @@
 import hashlib
 import hmac
+import ipaddress
+from functools import lru_cache
 from typing import Optional
 
 
+@lru_cache(maxsize=1)
+def _keyed_hmac():
+    """HMAC-SHA256 keyed with SECRET_KEY, copied per code instead of re-keyed."""
+    from django.conf import settings
+
+    secret_key = getattr(settings, "SECRET_KEY", "foo")
+    return hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+@lru_cache(maxsize=1)
+def username_max_length():
+    """Resolve allauth's username max length once, after the app registry is ready."""
+    from allauth.utils import get_username_max_length
+
+    return get_username_max_length()
+
+
+def clear_config_cache():
+    """Forget values derived from settings; connected to ``setting_changed``."""
+    _keyed_hmac.cache_clear()
+    username_max_length.cache_clear()
+
+
 def generate_verification_code(key: str, secret_key: Optional[str] = None) -> str:
     """Return a stable 6-digit verification code derived from confirmation key."""
     if secret_key is None:
+        digest = _keyed_hmac().copy()
+        digest.update(key.encode("utf-8"))
+    else:
+        digest = hmac.new(
+            secret_key.encode("utf-8"), key.encode("utf-8"), hashlib.sha256
+        )
+    numeric_digits = "".join(filter(str.isdigit, digest.hexdigest()))[:6]
+    return numeric_digits.zfill(6)
 
-        from django.conf import settings
 
-        secret_key = getattr(settings, "SECRET_KEY", "foo")
+def client_ip(request) -> Optional[str]:
+    """
+    Address of the client making ``request``.
 
-    digest = hmac.new(secret_key.encode("utf-8"), key.encode("utf-8"), hashlib.sha256)
-    numeric_digits = "".join(filter(str.isdigit, digest.hexdigest()))[:6]
-    return numeric_digits.zfill(6)
+    Behind the reverse proxy ``REMOTE_ADDR`` is the proxy's own address; with
+    ``CLIENT_IP_HEADER`` set, the address the proxy put in that header is
+    used instead. For ``X-Forwarded-For`` only the last hop, appended by our
+    proxy, is trusted: earlier entries come from the client.
+    """
+    from django.conf import settings
+
+    header = settings.CLIENT_IP_HEADER
+    if header:
+        value = request.headers.get(header, "").split(",")[-1].strip()
+        try:
+            return str(ipaddress.ip_address(value))
+        except ValueError:
+            pass
+    return request.META.get("REMOTE_ADDR") or None
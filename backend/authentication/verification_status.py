@@ -0,0 +1,164 @@
+"""
+Email verification status notifications for pending signups.
+
+Registration hands the client a signed status token; the client opens the
+``verification_status`` server-sent events stream with it and is told the
+moment the address is verified, instead of polling.
+
+Delivery has two legs:
+
+* ``publish_verified`` (called after the confirming transaction commits)
+  records the new status in the cache and wakes the subscribers of this
+  process directly.
+* Subscribers connected to *other* worker processes are woken by a poller,
+  one per event loop, that checks the cache for every user it has
+  subscribers for with a single ``get_many`` per interval. The cost is per
+  worker, not per open connection, so a worker can hold thousands of idle
+  streams.
+"""
+
+import asyncio
+import json
+import threading
+
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+TOKEN_SALT = "authentication.verification_status"
+STATUS_CACHE_PREFIX = "verification_status"
+STATUS_CACHE_TIMEOUT = 3600  # seconds
+
+KEEPALIVE_INTERVAL = 15  # seconds; keeps proxies from timing the stream out
+STREAM_MAX_AGE = 300  # seconds; EventSource reconnects by itself
+RECONNECT_DELAY_MS = 3000
+
+
+def make_status_token(user_id):
+    return signing.dumps(user_id, salt=TOKEN_SALT, compress=False)
+
+
+def read_status_token(token):
+    """Return the user id in ``token``; raises ``signing.BadSignature``."""
+    return signing.loads(
+        token, salt=TOKEN_SALT, max_age=settings.VERIFICATION_STATUS_TOKEN_MAX_AGE
+    )
+
+
+def _status_key(user_id):
+    return f"{STATUS_CACHE_PREFIX}:{user_id}"
+
+
+class _Subscription:
+    __slots__ = ("user_id", "loop", "event")
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def notify(self):
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # the subscriber's loop has already closed
+
+
+class VerificationBroker:
+    """In-process registry of open status streams, keyed by user id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._pollers = {}
+
+    def subscribe(self, user_id):
+        loop = asyncio.get_running_loop()
+        subscription = _Subscription(user_id, loop)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            if loop not in self._pollers:
+                self._pollers[loop] = loop.create_task(self._poll(loop))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def notify(self, user_id):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.notify()
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _waiting(self, loop):
+        with self._lock:
+            waiting = {
+                subscription.user_id
+                for subscribers in self._subscribers.values()
+                for subscription in subscribers
+                if subscription.loop is loop and not subscription.event.is_set()
+            }
+            if not waiting:
+                self._pollers.pop(loop, None)
+            return waiting
+
+    async def _poll(self, loop):
+        # Exits once this loop has no waiting subscribers; the next
+        # subscribe() starts a new poller.
+        while True:
+            await asyncio.sleep(settings.VERIFICATION_STATUS_POLL_INTERVAL)
+            waiting = self._waiting(loop)
+            if not waiting:
+                return
+            found = await cache.aget_many([_status_key(user_id) for user_id in waiting])
+            for user_id in waiting:
+                if found.get(_status_key(user_id)):
+                    self.notify(user_id)
+
+
+broker = VerificationBroker()
+
+
+def publish_verified(user_id):
+    cache.set(_status_key(user_id), True, timeout=STATUS_CACHE_TIMEOUT)
+    broker.notify(user_id)
+
+
+def _event(verified):
+    return f"event: status\ndata: {json.dumps({'verified': verified})}\n\n"
+
+
+async def status_events(user_id):
+    """Server-sent events for ``user_id``: the current status, then the change."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_MAX_AGE
+    # Subscribe before reading the status so a confirmation in between
+    # still wakes this stream
+    subscription = broker.subscribe(user_id)
+    try:
+        verified = await EmailAddress.objects.filter(
+            user_id=user_id, verified=True
+        ).aexists()
+        yield f"retry: {RECONNECT_DELAY_MS}\n" + _event(verified)
+        while not verified:
+            try:
+                await asyncio.wait_for(subscription.event.wait(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                if loop.time() >= deadline:
+                    return
+                yield ": keepalive\n\n"
+            else:
+                verified = True
+                yield _event(True)
+    finally:
+        broker.unsubscribe(subscription)
@@ -1,29 +1,349 @@
-from dj_rest_auth.registration.views import VerifyEmailView
-from rest_framework.response import Response
-from rest_framework import status
-from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
+import logging
 from datetime import timedelta
-from allauth.account.models import EmailAddress, EmailConfirmation
+
 from allauth.account.adapter import get_adapter
-from rest_framework.permissions import AllowAny
+from allauth.account.models import EmailAddress, EmailConfirmation
+from dj_rest_auth.app_settings import api_settings as rest_auth_settings
+from dj_rest_auth.registration.views import RegisterView, VerifyEmailView
+from dj_rest_auth.views import LoginView, LogoutView
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth import logout as django_logout
+from django.core import signing
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import transaction
-from .serializers import CustomVerifyEmailSerializer
-import logging
-from .utils import generate_verification_code
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.utils.translation import gettext_lazy as _
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import serializers, status
+from rest_framework.generics import DestroyAPIView, GenericAPIView, ListAPIView
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+
+from core.idempotency import IdempotencyMixin
+from core.pagination import KeysetPagination
+
+from . import audit
+from .adapter import deferred_mail
+from .authentication import CachedUserJWTAuthentication
+from .export import FORMATS, export_filename, stream_users
+from .filters import UserFilter, verified_email_exists
+from .metrics import LOGINS, REGISTRATIONS, REQUEST_LATENCY, VERIFICATIONS
+from .models import AuditEvent
+from .serializers import (
+    CurrentUserSerializer,
+    CustomVerifyEmailSerializer,
+    UserAdminSerializer,
+    UserSessionSerializer,
+)
+from .sessions import active_sessions, forget_session, record_session, revoke_session
+from .tokens import RefreshToken
+from .user_cache import user_version
+from .utils import client_ip, generate_verification_code
+from .verification_status import make_status_token, read_status_token, status_events
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-class CustomVerifyEmailView(VerifyEmailView):
+class CustomLoginView(LoginView):
+    """
+    dj-rest-auth login view instrumented with latency and outcome metrics
+    that records a device session for the issued refresh token.
+    """
+
+    def login(self):
+        super().login()
+        record_session(self.user, self.refresh_token, self.request)
+
+    def dispatch(self, request, *args, **kwargs):
+        with REQUEST_LATENCY.time(endpoint="login"):
+            response = super().dispatch(request, *args, **kwargs)
+        if request.method == "POST":
+            LOGINS.inc(outcome="success" if response.status_code == 200 else "failure")
+        return response
+
+
+class CustomRegisterView(IdempotencyMixin, RegisterView):
+    """
+    dj-rest-auth registration view instrumented with latency and outcome
+    metrics. Retries carrying the same ``Idempotency-Key`` replay the first
+    response instead of registering again.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with REQUEST_LATENCY.time(endpoint="register"):
+            response = super().dispatch(request, *args, **kwargs)
+        if request.method == "POST":
+            REGISTRATIONS.inc(
+                outcome="success" if response.status_code == 201 else "failure"
+            )
+        return response
+
+    def perform_create(self, serializer):
+        # User, EmailAddress and EmailConfirmation are written in one
+        # transaction; the confirmation email goes out after it commits.
+        try:
+            with deferred_mail(), transaction.atomic():
+                user = super().perform_create(serializer)
+                # Tokens are only issued here when email verification isn't mandatory
+                if getattr(self, "refresh_token", None) is not None:
+                    record_session(user, self.refresh_token, self.request)
+        except IntegrityError:
+            email = serializer.validated_data.get("email", "")
+            if email and User.objects.filter(email__iexact=email).exists():
+                raise serializers.ValidationError(
+                    {"email": [_("A user with this email already exists.")]}
+                )
+            raise
+        return user
+
+    def get_response_data(self, user):
+        data = super().get_response_data(user)
+        if data is not None:
+            # Lets the client follow verification over the status stream
+            data["status_token"] = make_status_token(user.pk)
+        return data
+
+
+async def verification_status(request):
+    """
+    Server-sent events stream of a pending signup's email verification
+    status, for the ``status_token`` returned at registration (passed as the
+    ``token`` query parameter, since ``EventSource`` can't send headers).
+
+    Async so that an open stream costs a coroutine rather than a worker
+    thread. Under WSGI, Django would collect the whole stream before sending
+    anything while holding a thread for up to ``STREAM_MAX_AGE``, so the
+    stream is refused there and clients fall back to polling.
+    """
+    try:
+        user_id = read_status_token(request.GET.get("token", ""))
+    except signing.BadSignature:
+        return JsonResponse(
+            {"detail": _("Invalid or expired status token.")}, status=403
+        )
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": _("The status stream needs the ASGI application (core.asgi).")},
+            status=501,
+        )
+
+    response = StreamingHttpResponse(
+        status_events(user_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Let Nginx pass events through as they are written
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class CustomLogoutView(LogoutView):
+    """
+    Revoke the submitted refresh token in the denylist.
+
+    dj-rest-auth only revokes JWTs through simplejwt's ``token_blacklist``
+    app; access tokens are short-lived and simply expire.
+    """
+
+    def logout(self, request):
+        refresh = request.data.get("refresh")
+        if not refresh:
+            return Response(
+                {"detail": _("Refresh token was not included in request data.")},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        try:
+            token = RefreshToken(refresh)
+        except TokenError:
+            return Response(
+                {"detail": _("Token is invalid or expired.")},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        token.blacklist()
+        forget_session(token["jti"])
+
+        if rest_auth_settings.SESSION_LOGIN:
+            django_logout(request)
+
+        return Response(
+            {"detail": _("Successfully logged out.")},
+            status=status.HTTP_200_OK,
+        )
+
+
+class SessionListView(ListAPIView):
+    """Active device sessions of the current user, newest first."""
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = UserSessionSerializer
+
+    def get_queryset(self):
+        return active_sessions(self.request.user).order_by("-expires_at", "-pk")
+
+
+class SessionRevokeView(DestroyAPIView):
+    """Revoke one of the current user's sessions and its refresh token."""
+
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return active_sessions(self.request.user)
+
+    def perform_destroy(self, instance):
+        revoke_session(instance)
+
+
+def _etag_matches(header, etag, weak):
+    tags = parse_etags(header)
+    if weak:
+        tags = [tag.removeprefix("W/") for tag in tags]
+    return "*" in tags or etag in tags
+
+
+class CurrentUserView(GenericAPIView):
+    """
+    The authenticated user's details, with conditional GET.
+
+    The strong ETag is derived from the user's version counter
+    (``authentication.user_cache.user_version``), which changes whenever the
+    user or one of their email addresses is saved. Authentication reads the
+    token and cached flags only, so a matching ``If-None-Match`` is answered
+    with 304 without any query. PATCH honours ``If-Match``.
+
+    The version has to be shared by every worker process, so conditional
+    requests are only supported with a shared cache (``SHARED_CACHE``);
+    without one, responses carry no ETag and ``If-Match`` always fails.
+    """
+
+    serializer_class = CurrentUserSerializer
+    authentication_classes = [CachedUserJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        queryset = User.objects.annotate(email_verified=verified_email_exists())
+        return get_object_or_404(queryset, pk=self.request.user.id)
+
+    def etag(self):
+        if not settings.SHARED_CACHE:
+            return None
+        return f'"{self.request.user.id}-{user_version(self.request.user.id)}"'
+
+    def respond(self, etag, data=None, status_code=status.HTTP_200_OK):
+        response = Response(data, status=status_code)
+        if etag is None:
+            patch_cache_control(response, private=True, no_store=True)
+        else:
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        # Read the version before the row: a write committing in between then
+        # pairs the new body with the old ETag, which only costs a full
+        # response next time, never a 304 for stale data
+        etag = self.etag()
+        if_none_match = request.headers.get("If-None-Match")
+        if etag and if_none_match and _etag_matches(if_none_match, etag, weak=True):
+            return self.respond(etag, status_code=status.HTTP_304_NOT_MODIFIED)
+        return self.respond(etag, self.get_serializer(self.get_object()).data)
+
+    def patch(self, request, *args, **kwargs):
+        if_match = request.headers.get("If-Match")
+        if if_match:
+            etag = self.etag()
+            if etag is None or not _etag_matches(if_match, etag, weak=False):
+                return self.respond(
+                    etag, status_code=status.HTTP_412_PRECONDITION_FAILED
+                )
+        with transaction.atomic():
+            user = self.get_object()
+            serializer = self.get_serializer(user, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        # The version was bumped when the save committed, so this is the new ETag
+        return self.respond(self.etag(), serializer.data)
+
+
+class UserListView(ListAPIView):
+    """
+    Admin listing of users with their email verification state.
+
+    Keyset-paginated on (date_joined, id) and limited to the serialized
+    columns, so any page is one index range scan.
+    """
+
+    serializer_class = UserAdminSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return User.objects.only(
+            "id",
+            "email",
+            "username",
+            "first_name",
+            "last_name",
+            "is_active",
+            "date_joined",
+        ).annotate(email_verified=verified_email_exists())
+
+
+class UserExportView(GenericAPIView):
+    """
+    Admin export of users as CSV or JSON Lines, streamed row by row.
+
+    Query parameters: ``fmt`` (``csv`` or ``jsonl``), ``gzip=1`` to
+    compress on the fly, plus the filters of the user listing.
+    """
+
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
+
+    def get_queryset(self):
+        return User.objects.annotate(email_verified=verified_email_exists())
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.query_params.get("fmt", "csv")
+        if fmt not in FORMATS:
+            return Response(
+                {"detail": _("Unsupported export format.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        compress = request.query_params.get("gzip") in ("1", "true")
+        queryset = self.filter_queryset(self.get_queryset())
+
+        response = StreamingHttpResponse(
+            stream_users(fmt, compress, queryset=queryset),
+            content_type="application/gzip" if compress else FORMATS[fmt],
+        )
+        filename = export_filename(fmt, compress)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # Let Nginx pass chunks through instead of buffering the whole export
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class CustomVerifyEmailView(IdempotencyMixin, VerifyEmailView):
     """
     Enhanced email verification view with code and key support
     Implements security features similar to dj-rest-auth VerifyEmailView
+
+    Retries carrying the same ``Idempotency-Key`` replay the first response,
+    so they don't count as further failed attempts.
     """
+
     permission_classes = (AllowAny,)
     serializer_class = CustomVerifyEmailSerializer
 
@@ -33,11 +353,19 @@ class CustomVerifyEmailView(VerifyEmailView):
     RATE_LIMIT_WINDOW = 60  # seconds
     ATTEMPT_CACHE_PREFIX = "verify_attempts"
 
+    # Set by get_valid_confirmation when the code matched an expired record
+    found_expired = False
+
     def get_serializer(self, *args, **kwargs):
-        return CustomVerifyEmailSerializer(*args, **kwargs)
+        # dj-rest-auth's VerifyEmailView hard-codes its own serializer class
+        return self.serializer_class(*args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        with REQUEST_LATENCY.time(endpoint="verify_email"):
+            return super().dispatch(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        logger.info(f"Email verification request from IP: {request.META.get('REMOTE_ADDR')}")
+        logger.info(f"Email verification request from IP: {client_ip(request)}")
 
         # Check if 'code' exists in request (custom behavior)
         if "code" in request.data:
@@ -45,8 +373,11 @@ class CustomVerifyEmailView(VerifyEmailView):
 
         # Use original secure behavior for 'key' verification
         try:
-            return super().post(request, *args, **kwargs)
+            response = super().post(request, *args, **kwargs)
+            VERIFICATIONS.inc(method="key", outcome="success")
+            return response
         except Exception as e:
+            VERIFICATIONS.inc(method="key", outcome="invalid")
             logger.error(f"Key verification failed: {e}")
             return Response(
                 {"detail": _("Invalid verification key.")},
@@ -63,6 +394,7 @@ class CustomVerifyEmailView(VerifyEmailView):
 
         # Input validation
         if not code or not email:
+            VERIFICATIONS.inc(method="code", outcome="missing_parameters")
             return Response(
                 {"detail": _("Both email and verification code are required.")},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -77,6 +409,7 @@ class CustomVerifyEmailView(VerifyEmailView):
 
             # Check if already verified
             if email_address.verified:
+                VERIFICATIONS.inc(method="code", outcome="already_verified")
                 return Response(
                     {"detail": _("Email is already verified.")},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -87,12 +420,30 @@ class CustomVerifyEmailView(VerifyEmailView):
             if not confirmation:
                 # Log failed attempt for security monitoring
                 logger.warning(
-                    f"Invalid verification code attempt for {email} from IP: {request.META.get('REMOTE_ADDR')}"
+                    f"Invalid verification code attempt for {email} from IP: {client_ip(request)}"
                 )
                 attempts, locked = self.record_failed_attempt(email_address)
+                if locked:
+                    outcome, event_type = "locked", AuditEvent.EventType.LOCKOUT
+                elif self.found_expired:
+                    outcome, event_type = "expired", AuditEvent.EventType.CODE_EXPIRED
+                else:
+                    outcome, event_type = "invalid", AuditEvent.EventType.CODE_INVALID
+                VERIFICATIONS.inc(method="code", outcome=outcome)
+                audit.record(
+                    event_type,
+                    email=email,
+                    user_id=user.pk,
+                    ip_address=client_ip(request),
+                    attempts=attempts,
+                )
                 if locked:
                     return Response(
-                        {"detail": _("Too many incorrect verification attempts. Request a new code.")},
+                        {
+                            "detail": _(
+                                "Too many incorrect verification attempts. Request a new code."
+                            )
+                        },
                         status=status.HTTP_400_BAD_REQUEST,
                     )
                 return Response(
@@ -103,6 +454,13 @@ class CustomVerifyEmailView(VerifyEmailView):
             # Perform secure confirmation
             self.perform_confirmation(request, confirmation, email_address)
             self.reset_failed_attempts(confirmation)
+            VERIFICATIONS.inc(method="code", outcome="success")
+            audit.record(
+                AuditEvent.EventType.VERIFIED,
+                email=email,
+                user_id=user.pk,
+                ip_address=client_ip(request),
+            )
 
             logger.info(f"Email {email} successfully verified with code")
 
@@ -112,24 +470,40 @@ class CustomVerifyEmailView(VerifyEmailView):
             )
 
         except User.DoesNotExist:
+            VERIFICATIONS.inc(method="code", outcome="unknown_email")
             logger.warning(f"Verification attempt for non-existent user: {email}")
+            audit.record(
+                AuditEvent.EventType.UNKNOWN_EMAIL,
+                email=email,
+                ip_address=client_ip(request),
+            )
             return Response(
                 {"detail": _("Invalid email address.")},
                 status=status.HTTP_400_BAD_REQUEST,  # Don't reveal user existence
             )
         except EmailAddress.DoesNotExist:
-            logger.warning(f"Verification attempt for non-existent email address: {email}")
+            VERIFICATIONS.inc(method="code", outcome="unknown_email")
+            logger.warning(
+                f"Verification attempt for non-existent email address: {email}"
+            )
+            audit.record(
+                AuditEvent.EventType.UNKNOWN_EMAIL,
+                email=email,
+                ip_address=client_ip(request),
+            )
             return Response(
                 {"detail": _("Invalid email address.")},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except ValidationError as e:
+            VERIFICATIONS.inc(method="code", outcome="error")
             logger.error(f"Validation error in email verification: {e}")
             return Response(
                 {"detail": _("Verification failed. Please try again.")},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as e:
+            VERIFICATIONS.inc(method="code", outcome="error")
             logger.error(f"Unexpected error in verify_by_code_secure: {e}")
             return Response(
                 {"detail": _("Verification failed. Please contact support.")},
@@ -151,7 +525,10 @@ class CustomVerifyEmailView(VerifyEmailView):
                 if self.validate_verification_code(confirmation, code):
                     # Check expiration
                     if self.is_confirmation_expired(confirmation):
-                        logger.info(f"Expired confirmation found for {email_address.email}")
+                        logger.info(
+                            f"Expired confirmation found for {email_address.email}"
+                        )
+                        self.found_expired = True
                         continue
 
                     return confirmation
@@ -210,7 +587,7 @@ class CustomVerifyEmailView(VerifyEmailView):
     def record_failed_attempt(self, email_address):
         confirmation = (
             EmailConfirmation.objects.filter(email_address=email_address)
-            .order_by('-sent')
+            .order_by("-sent")
             .first()
         )
         if not confirmation:
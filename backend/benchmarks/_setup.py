@@ -0,0 +1,31 @@
+"""Shared bootstrap for benchmark scripts: test settings and an in-memory, migrated DB."""
+
+import os
+import time
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings_test")
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def timeit(func, iterations):
+    """Return (total seconds, operations per second) for ``iterations`` calls."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return elapsed, iterations / elapsed
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name.ljust(width)}  {value}")
@@ -0,0 +1,92 @@
+"""
+DRF's stdlib JSON renderer/parser vs. the orjson-backed ones in core.
+
+Payloads mirror real responses: a login response (tokens + user), a page of
+the admin user listing and a validation error with lazy strings.
+
+Usage: python -m benchmarks.json_rendering [iterations]
+"""
+
+import io
+import sys
+
+from benchmarks._setup import report, setup, timeit
+
+
+def main(iterations=20000):
+    setup()
+
+    import datetime
+
+    from django.utils.translation import gettext_lazy as _
+    from rest_framework.exceptions import ErrorDetail
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer, orjson
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payloads = {
+        "login": {
+            "access": "e" * 300,
+            "refresh": "e" * 300,
+            "user": {
+                "pk": 1,
+                "email": "user@example.com",
+                "first_name": "",
+                "last_name": "",
+            },
+        },
+        "user page (50)": {
+            "next": "http://localhost/api/auth/users/?cursor=WyIyMDI1LTAxLTAxIiwxXQ",
+            "results": [
+                {
+                    "id": i,
+                    "email": f"user{i}@example.com",
+                    "username": f"user{i}",
+                    "first_name": "First",
+                    "last_name": "Last",
+                    "is_active": True,
+                    "date_joined": now,
+                    "email_verified": bool(i % 2),
+                }
+                for i in range(50)
+            ],
+        },
+        "error": {
+            "detail": _("Invalid or expired verification code."),
+            "email": [ErrorDetail("Enter a valid email address.", code="invalid")],
+        },
+    }
+
+    rows = [
+        ("orjson", "installed" if orjson is not None else "missing (stdlib fallback)")
+    ]
+    for name, payload in payloads.items():
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        _, stdlib_rate = timeit(lambda: stdlib.render(payload), iterations)
+        _, fast_rate = timeit(lambda: fast.render(payload), iterations)
+        rows.append(
+            (
+                f"render {name}",
+                f"{stdlib_rate:,.0f}/s -> {fast_rate:,.0f}/s ({fast_rate / stdlib_rate:.1f}x)",
+            )
+        )
+
+    body = JSONRenderer().render(payloads["user page (50)"])
+    stdlib_parser, fast_parser = JSONParser(), FastJSONParser()
+    _, stdlib_rate = timeit(lambda: stdlib_parser.parse(io.BytesIO(body)), iterations)
+    _, fast_rate = timeit(lambda: fast_parser.parse(io.BytesIO(body)), iterations)
+    rows.append(
+        (
+            "parse user page",
+            f"{stdlib_rate:,.0f}/s -> {fast_rate:,.0f}/s ({fast_rate / stdlib_rate:.1f}x)",
+        )
+    )
+
+    report(f"JSON rendering/parsing, stdlib -> fast ({iterations} iterations)", rows)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,70 @@
+"""
+Breached password index: build time, open cost and lookups/s, compared with
+Django's CommonPasswordValidator (which loads its list into a set per
+process).
+
+Usage: python -m benchmarks.password_index [entries]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks._setup import report, setup, timeit
+
+
+def main(entries=5_000_000):
+    setup()
+
+    from django.contrib.auth.password_validation import CommonPasswordValidator
+
+    from authentication.password_validation import (
+        BreachedPasswordValidator,
+        password_key,
+    )
+    from core.hashindex import HashIndex, write_index
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "passwords.idx")
+        start = time.perf_counter()
+        write_index(
+            (os.urandom(8) for _ in range(entries)), path, width=8, run_size=1_000_000
+        )
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = HashIndex(path)
+        open_ms = (time.perf_counter() - start) * 1000
+        hit = index._mapping.mm[16:24]
+        miss = password_key("definitely not in the index")
+
+        _, hit_rate = timeit(lambda: index.contains(hit), 200_000)
+        _, miss_rate = timeit(lambda: index.contains(miss), 200_000)
+
+        validator = BreachedPasswordValidator(index_path=path)
+        _, validate_rate = timeit(lambda: validator.validate("StrongPass123!"), 100_000)
+
+        start = time.perf_counter()
+        common = CommonPasswordValidator()
+        common_ms = (time.perf_counter() - start) * 1000
+        _, common_rate = timeit(lambda: common.validate("StrongPass123!"), 100_000)
+
+        rows = [
+            (
+                "index size",
+                f"{len(index):,} entries, {os.path.getsize(path) / 1e6:.0f} MB",
+            ),
+            ("build (external sort)", f"{build:.1f} s"),
+            ("open", f"{open_ms:.3f} ms"),
+            ("lookup hit", f"{hit_rate:,.0f}/s"),
+            ("lookup miss", f"{miss_rate:,.0f}/s"),
+            ("BreachedPasswordValidator.validate", f"{validate_rate:,.0f}/s"),
+            ("CommonPasswordValidator load (20k)", f"{common_ms:.1f} ms per process"),
+            ("CommonPasswordValidator.validate", f"{common_rate:,.0f}/s"),
+        ]
+    report("Breached password index", rows)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,90 @@
+"""
+SQL statements per registration: the constraint-based pipeline vs. the
+previous flow (exists() pre-checks, allauth's setup_user_email, no explicit
+transaction).
+
+Usage: python -m benchmarks.registration_queries [iterations]
+"""
+
+import sys
+from contextlib import contextmanager, nullcontext
+from unittest.mock import patch
+
+from benchmarks._setup import report, setup
+
+
+def main(iterations=20):
+    setup()
+
+    from dj_rest_auth.registration.serializers import RegisterSerializer
+    from dj_rest_auth.registration.views import RegisterView
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework import serializers
+    from rest_framework.test import APIClient
+
+    from authentication.serializers import CustomRegisterSerializer
+    from authentication.views import CustomRegisterView
+
+    User = get_user_model()
+
+    class PreviousRegisterSerializer(CustomRegisterSerializer):
+        def validate_email(self, email):
+            email = RegisterSerializer.validate_email(self, email)
+            if User.objects.filter(email=email).exists():
+                raise serializers.ValidationError(
+                    "A user with this email already exists."
+                )
+            return email
+
+        def save(self, request):
+            return RegisterSerializer.save(self, request)
+
+    @contextmanager
+    def previous():
+        with patch.object(
+            CustomRegisterView,
+            "get_serializer_class",
+            lambda self: PreviousRegisterSerializer,
+        ), patch.object(
+            CustomRegisterView, "perform_create", RegisterView.perform_create
+        ):
+            yield
+
+    client = APIClient()
+
+    def register(email):
+        response = client.post(
+            reverse("rest_register"),
+            {
+                "email": email,
+                "password1": "StrongPass123!",
+                "password2": "StrongPass123!",
+            },
+        )
+        assert response.status_code == 201, response.data
+
+    rows = []
+    for name, variant in (("previous", previous), ("constraint", nullcontext)):
+        with variant():
+            register(f"warm-{name}@example.com")
+            with CaptureQueriesContext(connection) as ctx:
+                for i in range(iterations):
+                    register(f"{name}{i}@example.com")
+        statements = [q["sql"].split()[0].upper() for q in ctx.captured_queries]
+        reads = statements.count("SELECT")
+        rows.append(
+            (
+                name,
+                f"{len(statements) / iterations:.1f} statements, "
+                f"{reads / iterations:.1f} SELECTs",
+            )
+        )
+
+    report(f"SQL per registration ({iterations} registrations)", rows)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
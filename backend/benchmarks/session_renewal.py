@@ -0,0 +1,71 @@
+"""
+CPU cost of renewing a session: refresh endpoint vs. logging in again.
+
+Uses Django's production password hasher (PBKDF2) rather than the fast test
+hasher, since that is what a re-login pays for.
+
+Usage: python -m benchmarks.session_renewal [iterations]
+"""
+
+import sys
+import time
+
+from benchmarks._setup import report, setup
+
+
+def cpu_per_call(func, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations
+
+
+def main(iterations=50):
+    setup()
+
+    from allauth.account.models import EmailAddress
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    with override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+    ):
+        user = get_user_model().objects.create_user(
+            username="bench", email="bench@example.com", password="BenchPass123!"
+        )
+        EmailAddress.objects.create(
+            user=user, email=user.email, verified=True, primary=True
+        )
+        client = APIClient()
+        credentials = {"email": user.email, "password": "BenchPass123!"}
+
+        def login():
+            response = client.post(reverse("rest_login"), credentials)
+            assert response.status_code == 200, response.content
+            return response.data["refresh"]
+
+        refresh_token = login()
+
+        def refresh():
+            nonlocal refresh_token
+            response = client.post(reverse("token_refresh"), {"refresh": refresh_token})
+            assert response.status_code == 200, response.content
+            refresh_token = response.data["refresh"]
+
+        login_cpu = cpu_per_call(login, iterations)
+        refresh_cpu = cpu_per_call(refresh, iterations)
+
+    report(
+        f"CPU per session renewal ({iterations} iterations, PBKDF2)",
+        [
+            ("re-login", f"{login_cpu * 1000:.2f} ms"),
+            ("refresh", f"{refresh_cpu * 1000:.2f} ms"),
+            ("ratio", f"{login_cpu / refresh_cpu:.0f}x"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""
+Refresh throughput with the denylist versus a per-refresh database lookup.
+
+Usage: python -m benchmarks.token_refresh [iterations]
+"""
+
+import sys
+from datetime import timedelta
+
+from benchmarks._setup import report, setup, timeit
+
+
+def main(iterations=2000):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+
+    from authentication.denylist import denylist
+    from authentication.models import RevokedToken
+    from authentication.serializers import CustomTokenRefreshSerializer
+    from authentication.tokens import RefreshToken
+
+    user = get_user_model().objects.create_user(
+        username="bench", email="bench@example.com", password="BenchPass123!"
+    )
+
+    # Realistic denylist size: previously rotated tokens of other sessions
+    expires = timezone.now() + timedelta(days=15)
+    RevokedToken.objects.bulk_create(
+        RevokedToken(jti=f"revoked-{i}", expires_at=expires) for i in range(50000)
+    )
+    denylist.reset()
+
+    jti = RefreshToken.for_user(user)["jti"]
+    denylist.is_revoked(jti)  # warm the Bloom filter
+
+    _, denylist_ops = timeit(lambda: denylist.is_revoked(jti), iterations)
+    _, db_ops = timeit(
+        lambda: RevokedToken.objects.filter(jti=jti).exists(), iterations
+    )
+
+    token = str(RefreshToken.for_user(user))
+
+    def refresh():
+        nonlocal token
+        serializer = CustomTokenRefreshSerializer(data={"refresh": token})
+        serializer.is_valid(raise_exception=True)
+        token = serializer.validated_data["refresh"]
+
+    refresh()
+    with CaptureQueriesContext(connection) as queries:
+        refresh()
+    _, refresh_ops = timeit(refresh, iterations)
+
+    report(
+        f"Revocation check ({iterations} iterations, 50k revoked tokens)",
+        [
+            ("denylist (cache + bloom)", f"{denylist_ops:,.0f} checks/s"),
+            ("database lookup", f"{db_ops:,.0f} checks/s"),
+        ],
+    )
+    report(
+        "Refresh with rotation",
+        [
+            ("throughput", f"{refresh_ops:,.0f} refreshes/s"),
+            ("queries per refresh", str(len(queries))),
+            ("statements", "; ".join(q["sql"].split(" ")[0] for q in queries)),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,74 @@
+"""
+Peak Python memory of the streaming user export vs. an in-memory export.
+
+The streaming export should stay flat as the table grows; building the
+whole export in memory (what ``dumpdata`` does) grows with the row count.
+
+Usage: python -m benchmarks.user_export [rows]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks._setup import report, setup
+
+
+def peak(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes, elapsed
+
+
+def main(rows=50000):
+    setup()
+
+    from django.contrib.auth import get_user_model
+
+    from authentication.export import export_queryset, stream_users
+
+    User = get_user_model()
+    rows_per_step = rows // 2
+    results = []
+    for step in (1, 2):
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"u{step}_{i}",
+                    email=f"u{step}_{i}@example.com",
+                    password="!",
+                )
+                for i in range(rows_per_step)
+            ],
+            batch_size=2000,
+        )
+        count = User.objects.count()
+
+        def streamed():
+            for _ in stream_users("jsonl", compress=True):
+                pass
+
+        def in_memory():
+            list(export_queryset())
+
+        stream_peak, stream_time = peak(streamed)
+        memory_peak, _ = peak(in_memory)
+        results.append(
+            (
+                f"{count} rows, streamed gzip jsonl",
+                f"{stream_peak / 1024:.0f} KiB peak, {stream_time:.2f} s",
+            )
+        )
+        results.append(
+            (f"{count} rows, list(queryset)", f"{memory_peak / 1024:.0f} KiB peak")
+        )
+
+    report("User export memory", results)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
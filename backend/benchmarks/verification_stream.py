@@ -0,0 +1,83 @@
+"""
+Verification status streams: memory per open stream, the per-worker cache
+poll that serves all of them, and the time to deliver a confirmation to
+every waiting stream.
+
+Usage: python -m benchmarks.verification_stream [streams]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from benchmarks._setup import report, setup
+
+
+def main(streams=5000):
+    setup()
+
+    from asgiref.sync import async_to_sync
+    from django.test import override_settings
+
+    from authentication.verification_status import (
+        _status_key,
+        broker,
+        publish_verified,
+        status_events,
+    )
+
+    async def run():
+        from django.core.cache import cache
+
+        async def consume(user_id, ready):
+            events = status_events(user_id)
+            await anext(events)  # current (pending) status
+            ready.release()
+            async for _ in events:
+                pass
+
+        ready = asyncio.Semaphore(0)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tasks = [
+            asyncio.create_task(consume(user_id, ready)) for user_id in range(streams)
+        ]
+        for _ in range(streams):
+            await ready.acquire()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        per_stream = (
+            sum(s.size_diff for s in after.compare_to(before, "filename")) / streams
+        )
+
+        keys = [_status_key(user_id) for user_id in range(streams)]
+        start = time.perf_counter()
+        await cache.aget_many(keys)
+        poll_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for user_id in range(streams):
+            publish_verified(user_id)
+        await asyncio.gather(*tasks)
+        deliver_ms = (time.perf_counter() - start) * 1000
+        assert broker.subscriber_count() == 0
+        return per_stream, poll_ms, deliver_ms
+
+    with override_settings(VERIFICATION_STATUS_POLL_INTERVAL=3600):
+        # async_to_sync keeps ORM calls on this thread, which owns the
+        # in-memory database
+        per_stream, poll_ms, deliver_ms = async_to_sync(run)()
+
+    report(
+        f"Verification status streams ({streams:,} open in one worker)",
+        [
+            ("memory per open stream", f"{per_stream / 1024:.1f} KiB"),
+            ("cache poll covering all streams", f"{poll_ms:.1f} ms per interval"),
+            ("publish + deliver to all", f"{deliver_ms:.0f} ms"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,78 @@
+"""
+Throughput of the code verification endpoint, with an optional profile.
+
+Each iteration verifies a fresh user's address with its 6-digit code, so
+every request takes the success path.
+
+Usage: python -m benchmarks.verify_email [iterations] [--profile]
+"""
+
+import cProfile
+import pstats
+import sys
+
+from benchmarks._setup import report, setup, timeit
+
+
+def main(iterations=300, profile=False):
+    setup()
+
+    from allauth.account.models import EmailAddress, EmailConfirmation
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    from authentication.utils import generate_verification_code
+
+    User = get_user_model()
+    payloads = []
+    for i in range(iterations + 1):
+        user = User.objects.create_user(
+            username=f"verify{i}", email=f"verify{i}@example.com", password="x"
+        )
+        address = EmailAddress.objects.create(user=user, email=user.email, primary=True)
+        confirmation = EmailConfirmation.objects.create(
+            email_address=address, key=f"bench-key-{i}", sent=timezone.now()
+        )
+        payloads.append(
+            {"email": user.email, "code": generate_verification_code(confirmation.key)}
+        )
+
+    client = APIClient()
+    url = reverse("rest_verify_email")
+    pending = iter(payloads)
+
+    def verify():
+        response = client.post(url, next(pending))
+        assert response.status_code == 200, response.data
+
+    verify()  # warm up lazy imports and URL resolution
+
+    profiler = cProfile.Profile() if profile else None
+    if profiler:
+        profiler.enable()
+    elapsed, rate = timeit(verify, iterations)
+    if profiler:
+        profiler.disable()
+
+    codes_elapsed, codes_rate = timeit(
+        lambda: generate_verification_code("bench-key"), 100000
+    )
+
+    report(
+        f"Email verification ({iterations} requests)",
+        [
+            ("verify requests/s", f"{rate:,.0f}"),
+            ("ms per request", f"{elapsed / iterations * 1000:.2f}"),
+            ("codes generated/s", f"{codes_rate:,.0f}"),
+        ],
+    )
+    if profiler:
+        print()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--profile"]
+    main(*(int(arg) for arg in args), profile="--profile" in sys.argv)
@@ -1,5 +1,151 @@
+import time
+
 import pytest
 
+DB_SETUP_TIMINGS = pytest.StashKey[list]()
+MIGRATE_SECONDS_CACHE_KEY = "db-snapshot/migrate-seconds"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-db-snapshot",
+        action="store_true",
+        help="Run every migration instead of restoring the cached test database snapshot.",
+    )
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(
+    request,
+    django_test_environment,
+    django_db_blocker,
+    django_db_use_migrations,
+    django_db_keepdb,
+    django_db_createdb,
+    django_db_modify_db_settings,
+):
+    """
+    pytest-django's database setup, restoring the migrated schema from a
+    snapshot (``core.db_snapshot``) rather than migrating in every session
+    and xdist worker. ``--create-db`` rebuilds the snapshot;
+    ``--no-db-snapshot``, ``--nomigrations`` and ``--reuse-db`` use the
+    regular setup.
+    """
+    from django.test.utils import setup_databases, teardown_databases
+    from pytest_django.fixtures import _disable_migrations, _get_databases_for_setup
+
+    from core import db_snapshot
+
+    config = request.config
+    verbosity = config.option.verbose
+    aliases, serialized_aliases = _get_databases_for_setup(request.session.items)
+    use_snapshot = (
+        django_db_use_migrations
+        and not django_db_keepdb
+        and not config.getoption("no_db_snapshot")
+        and getattr(config, "cache", None) is not None
+    )
+
+    with django_db_blocker.unblock():
+        if use_snapshot and db_snapshot.supports_snapshot(aliases):
+            db_cfg, timings = db_snapshot.setup_databases(
+                config.cache.mkdir("db-snapshot"),
+                aliases,
+                serialized_aliases,
+                verbosity=verbosity,
+                rebuild=django_db_createdb,
+            )
+        else:
+            if not django_db_use_migrations:
+                _disable_migrations()
+            start = time.perf_counter()
+            db_cfg = setup_databases(
+                verbosity=verbosity,
+                interactive=False,
+                aliases=aliases,
+                serialized_aliases=serialized_aliases,
+                keepdb=django_db_keepdb and not django_db_createdb,
+            )
+            timings = [("all", "migrations", time.perf_counter() - start)]
+    _record_db_setup(config, timings)
+
+    yield
+
+    if not django_db_keepdb:
+        with django_db_blocker.unblock():
+            try:
+                teardown_databases(db_cfg, verbosity=verbosity)
+            except Exception as exc:
+                request.node.warn(
+                    pytest.PytestWarning(
+                        f"Error when trying to teardown test databases: {exc!r}"
+                    )
+                )
+
+
+def _record_db_setup(config, timings):
+    config.stash.setdefault(DB_SETUP_TIMINGS, []).extend(timings)
+    migrated = [seconds for _, source, seconds in timings if source == "migrations"]
+    if migrated and getattr(config, "cache", None) is not None:
+        config.cache.set(MIGRATE_SECONDS_CACHE_KEY, sum(migrated))
+    # xdist workers hand their timings to the controller, which reports them
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["db_setup_timings"] = timings
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    timings = getattr(node, "workeroutput", {}).get("db_setup_timings")
+    if timings:
+        node.config.stash.setdefault(DB_SETUP_TIMINGS, []).extend(timings)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    timings = config.stash.get(DB_SETUP_TIMINGS, [])
+    if not timings:
+        return
+    terminalreporter.write_sep("-", "test database setup")
+    by_source = {}
+    for _, source, seconds in timings:
+        by_source.setdefault(source, []).append(seconds)
+    for source in ("migrations", "snapshot"):
+        if source in by_source:
+            runs = by_source[source]
+            label = "migrated" if source == "migrations" else "restored from snapshot"
+            terminalreporter.write_line(
+                f"{label}: {len(runs)}x, {sum(runs) / len(runs):.3f}s average"
+            )
+    if "migrations" not in by_source and config.cache is not None:
+        migrate_seconds = config.cache.get(MIGRATE_SECONDS_CACHE_KEY, None)
+        if migrate_seconds is not None:
+            terminalreporter.write_line(
+                f"migrating took {migrate_seconds:.3f}s when the snapshot was built"
+            )
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_state():
+    """
+    Start every test with an empty cache, denylist, metrics registry and
+    audit buffer.
+
+    Tests share these per-process singletons, and under xdist the order in
+    which a worker runs them is not fixed, so none may rely on state left
+    behind by another.
+    """
+    from django.core.cache import cache
+
+    from authentication.audit import audit_writer
+    from authentication.denylist import denylist
+    from core.metrics import REGISTRY
+
+    cache.clear()
+    denylist.reset()
+    REGISTRY.clear()
+    audit_writer.clear()
+    yield
+    audit_writer.clear()
+
 
 @pytest.fixture
 def admin_user(django_user_model, db):
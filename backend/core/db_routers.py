@@ -0,0 +1,97 @@
+"""
+Primary/replica database routing.
+
+Reads go to one of the aliases in ``settings.DATABASE_REPLICAS``; writes and
+migrations go to ``default`` (the primary). Routing state lives in a context
+variable set per request by ``core.middleware.PrimaryPinningMiddleware``:
+
+* unsafe HTTP methods are pinned to the primary for the whole request;
+* the first write pins the rest of the request, and the middleware sets a
+  short-lived cookie so the client's next requests also read from the
+  primary while replicas catch up (read-your-writes);
+* reads inside a transaction on the primary stay on the primary.
+
+Outside a request (shell, management commands, tests) everything uses the
+primary unless the code opts in with ``replica_reads()``.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = ContextVar("db_routing", default=None)
+
+
+@dataclass
+class RoutingState:
+    pinned: bool = False
+    wrote: bool = False
+
+
+def activate(pinned=False):
+    """Start routing reads to replicas; returns a token for ``deactivate``."""
+    return _state.set(RoutingState(pinned=pinned))
+
+
+def deactivate(token):
+    _state.reset(token)
+
+
+def current():
+    return _state.get()
+
+
+def pin_to_primary():
+    state = _state.get()
+    if state is not None:
+        state.pinned = True
+
+
+@contextmanager
+def replica_reads():
+    """Allow replica reads outside a request, e.g. in a long export."""
+    token = activate()
+    try:
+        yield
+    finally:
+        deactivate(token)
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", ())
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        aliases = replicas()
+        if (
+            state is None
+            or state.pinned
+            or not aliases
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        if db in replicas():
+            return False
+        return None
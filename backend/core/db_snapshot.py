@@ -0,0 +1,150 @@
+"""
+Snapshot of the migrated SQLite test database.
+
+Every test session, and every xdist worker within it, starts from an empty
+in-memory database and would otherwise run the full migration history of
+every installed app before the first test. ``setup_databases`` does that
+once: the migrated database is copied to a file with SQLite's backup API,
+keyed by a hash of every migration file (plus the Django and SQLite
+versions), and later sessions restore the file into the fresh in-memory
+database with the same API instead of migrating. Editing, adding or
+removing a migration changes the key, so a stale snapshot is never used.
+
+Only SQLite databases are supported; callers fall back to Django's own
+``setup_databases`` for anything else.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from importlib import import_module
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.test.utils import get_unique_databases_and_mirrors
+
+SNAPSHOT_SUFFIX = ".sqlite3"
+
+
+def schema_key():
+    """Hash of everything the migrated schema depends on."""
+    digest = hashlib.sha256()
+    digest.update(
+        f"django {django.get_version()}\0sqlite {sqlite3.sqlite_version}\0".encode()
+    )
+    for app_config in sorted(apps.get_app_configs(), key=lambda app: app.label):
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        try:
+            module = import_module(module_name) if module_name else None
+        except ImportError:
+            module = None
+        if module is not None:
+            files = sorted(Path(module.__path__[0]).glob("*.py"))
+        elif app_config.models_module is not None:
+            # Apps without migrations get their tables from run_syncdb
+            files = [Path(app_config.models_module.__file__)]
+        else:
+            continue
+        for path in files:
+            digest.update(f"{app_config.label}/{path.name}\0".encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def supports_snapshot(aliases):
+    test_databases, _ = get_unique_databases_and_mirrors(aliases)
+    return all(
+        connections[alias].vendor == "sqlite"
+        for _, db_aliases in test_databases.values()
+        for alias in db_aliases
+    )
+
+
+def _restore_test_db(connection, snapshot, serialize):
+    """Create the test database from ``snapshot``; False if there is none."""
+    if not snapshot.exists():
+        return False
+    creation = connection.creation
+    test_database_name = creation._create_test_db(verbosity=0, autoclobber=True)
+    connection.close()
+    settings.DATABASES[connection.alias]["NAME"] = test_database_name
+    connection.settings_dict["NAME"] = test_database_name
+    connection.ensure_connection()
+    with closing(sqlite3.connect(snapshot)) as source:
+        source.backup(connection.connection)
+    if serialize:
+        connection._test_serialized_contents = creation.serialize_db_to_string()
+    return True
+
+
+def _save_snapshot(connection, snapshot):
+    # Concurrent xdist workers may all build it; each writes a private file
+    # and renames it into place, so readers never see a partial snapshot.
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=snapshot.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with closing(sqlite3.connect(tmp_path)) as target:
+            connection.connection.backup(target)
+        os.replace(tmp_path, snapshot)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    for stale in snapshot.parent.glob(f"*-{connection.alias}{SNAPSHOT_SUFFIX}"):
+        if stale != snapshot:
+            stale.unlink(missing_ok=True)
+
+
+def setup_databases(
+    snapshot_dir, aliases, serialized_aliases=(), verbosity=0, rebuild=False
+):
+    """
+    Drop-in for ``django.test.utils.setup_databases`` that restores each test
+    database from a snapshot in ``snapshot_dir``, migrating (and saving a
+    new snapshot) only when none matches or ``rebuild`` is set.
+
+    Returns ``(old_names, timings)``: the first is what
+    ``teardown_databases`` expects, the second a list of
+    ``(alias, source, seconds)`` with ``source`` being ``"snapshot"`` or
+    ``"migrations"``.
+    """
+    key = schema_key()
+    test_databases, mirrored_aliases = get_unique_databases_and_mirrors(aliases)
+    old_names = []
+    timings = []
+    for db_name, db_aliases in test_databases.values():
+        first_alias = None
+        for alias in db_aliases:
+            connection = connections[alias]
+            old_names.append((connection, db_name, first_alias is None))
+            if first_alias is not None:
+                connection.creation.set_as_test_mirror(
+                    connections[first_alias].settings_dict
+                )
+                continue
+            first_alias = alias
+            snapshot = Path(snapshot_dir) / f"{key}-{alias}{SNAPSHOT_SUFFIX}"
+            serialize = alias in serialized_aliases
+            start = time.perf_counter()
+            if not rebuild and _restore_test_db(connection, snapshot, serialize):
+                source = "snapshot"
+            else:
+                connection.creation.create_test_db(
+                    verbosity=verbosity, autoclobber=True, serialize=serialize
+                )
+                _save_snapshot(connection, snapshot)
+                source = "migrations"
+            timings.append((alias, source, time.perf_counter() - start))
+
+    for alias, mirror_alias in mirrored_aliases.items():
+        connections[alias].creation.set_as_test_mirror(
+            connections[mirror_alias].settings_dict
+        )
+    return old_names, timings
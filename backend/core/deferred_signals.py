@@ -0,0 +1,166 @@
+"""
+Deferred signal receivers.
+
+Receivers connected with ``deferred_receiver`` / ``connect_deferred`` don't
+run while the signal is sent. The call is queued with
+``transaction.on_commit`` (so it never sees, or acts on, a transaction that
+is rolled back, and runs after any row locks are released) and then handed
+to a bounded thread pool, so a slow receiver adds nothing to the latency of
+the request that sent the signal::
+
+    from allauth.account.signals import user_signed_up
+
+    @deferred_receiver(user_signed_up)
+    def sync_to_crm(sender, user, **kwargs):
+        ...
+
+Backpressure: at most ``DEFERRED_SIGNAL_WORKERS`` receivers run at once and
+``DEFERRED_SIGNAL_QUEUE_SIZE`` more may wait; calls beyond that are dropped,
+logged and counted rather than queued without bound. Receivers run on a
+worker thread after the response may have been sent, so they must not rely
+on the request still being in progress. With ``DEFERRED_SIGNALS_EAGER``
+(used by the test settings) they run inline when the transaction commits.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFERRED_RECEIVER_RUNS = Counter(
+    "deferred_signal_receiver_runs",
+    "Deferred signal receiver calls by receiver and outcome (success, error, dropped).",
+    labelnames=("receiver", "outcome"),
+)
+
+DEFERRED_RECEIVER_LATENCY = Histogram(
+    "deferred_signal_receiver_duration_seconds",
+    "Time spent running deferred signal receivers.",
+    labelnames=("receiver",),
+)
+
+DEFERRED_QUEUE_WAIT = Histogram(
+    "deferred_signal_queue_wait_seconds",
+    "Time deferred receiver calls waited for a worker thread.",
+)
+
+
+class DeferredDispatcher:
+    """Runs receiver calls on a bounded thread pool, dropping calls when full."""
+
+    def __init__(self, max_workers=4, max_pending=1000):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._in_flight = 0
+        self._executor = None
+        self._pid = None
+
+    @property
+    def executor(self):
+        # Worker threads don't survive a fork; start a new pool in the child.
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix="deferred-signals"
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def dispatch(self, func, name, sender, kwargs):
+        """Queue one receiver call; returns False when it was dropped."""
+        if settings.DEFERRED_SIGNALS_EAGER:
+            self._run(func, name, sender, kwargs, time.perf_counter(), threaded=False)
+            return True
+
+        if not self._slots.acquire(blocking=False):
+            DEFERRED_RECEIVER_RUNS.inc(receiver=name, outcome="dropped")
+            logger.warning("Deferred signal queue is full, dropping call to %s", name)
+            return False
+        with self._idle:
+            self._in_flight += 1
+        self.executor.submit(
+            self._run, func, name, sender, kwargs, time.perf_counter(), threaded=True
+        )
+        return True
+
+    def _run(self, func, name, sender, kwargs, queued_at, threaded):
+        start = time.perf_counter()
+        if threaded:
+            DEFERRED_QUEUE_WAIT.observe(start - queued_at)
+            close_old_connections()
+        outcome = "error"
+        try:
+            func(sender, **kwargs)
+            outcome = "success"
+        except Exception:
+            logger.exception("Deferred signal receiver %s failed", name)
+        finally:
+            # Record the run before join() can see it finished
+            DEFERRED_RECEIVER_LATENCY.observe(
+                time.perf_counter() - start, receiver=name
+            )
+            DEFERRED_RECEIVER_RUNS.inc(receiver=name, outcome=outcome)
+            if threaded:
+                close_old_connections()
+                self._slots.release()
+                with self._idle:
+                    self._in_flight -= 1
+                    self._idle.notify_all()
+
+    def join(self, timeout=None):
+        """Wait until every queued call has finished; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout)
+
+
+@lru_cache(maxsize=1)
+def get_dispatcher():
+    return DeferredDispatcher(
+        settings.DEFERRED_SIGNAL_WORKERS, settings.DEFERRED_SIGNAL_QUEUE_SIZE
+    )
+
+
+def _receiver_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def connect_deferred(signal, func, sender=None, dispatch_uid=None, dispatcher=None):
+    """Connect ``func`` to ``signal`` so it runs after commit on the worker pool."""
+    name = _receiver_name(func)
+
+    def defer(sender, **kwargs):
+        target = dispatcher or get_dispatcher()
+        transaction.on_commit(lambda: target.dispatch(func, name, sender, kwargs))
+
+    signal.connect(defer, sender=sender, weak=False, dispatch_uid=dispatch_uid or name)
+    return defer
+
+
+def disconnect_deferred(signal, func, sender=None, dispatch_uid=None):
+    return signal.disconnect(
+        sender=sender, dispatch_uid=dispatch_uid or _receiver_name(func)
+    )
+
+
+def deferred_receiver(signal, sender=None, dispatch_uid=None):
+    """Decorator form of ``connect_deferred``."""
+
+    def decorator(func):
+        connect_deferred(signal, func, sender=sender, dispatch_uid=dispatch_uid)
+        return func
+
+    return decorator
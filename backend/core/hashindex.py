@@ -0,0 +1,204 @@
+"""
+Sorted, fixed-width binary index of hashed keys, memory-mapped and
+binary-searched.
+
+File layout: a 16-byte header (``b"HIDX"``, format version, record width,
+two reserved bytes, record count as an unsigned 64-bit integer), followed by
+``count`` records of ``width`` bytes in ascending byte order with no
+duplicates. Records are typically hash prefixes, so lookups are exact-match
+on the first ``width`` bytes of a digest.
+
+Opening an index maps the file read-only: it costs no parsing and no memory
+beyond the pages a lookup touches, and every process mapping the same file
+shares one page-cache copy. A lookup is a binary search, roughly
+``log2(count)`` record comparisons (about 30 for a billion entries).
+
+``write_index`` builds a file from an arbitrarily large iterable of keys
+with an external merge sort, writing to a temporary file that atomically
+replaces the target; ``HashIndex`` notices the new file (by inode, size and
+mtime) and remaps it without a restart.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+MAGIC = b"HIDX"
+VERSION = 1
+_HEADER = struct.Struct(">4sBBxxQ")
+HEADER_SIZE = _HEADER.size
+
+
+class IndexFormatError(ValueError):
+    pass
+
+
+class _Mapping:
+    """One open, memory-mapped index file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if stat.st_size < HEADER_SIZE:
+                raise IndexFormatError(f"{path} is too small to be an index")
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.count = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise IndexFormatError(f"{path} is not a version {VERSION} hash index")
+        if self.width == 0 or HEADER_SIZE + self.width * self.count != stat.st_size:
+            raise IndexFormatError(f"{path} is truncated or corrupt")
+
+    def contains(self, key):
+        key = key[: self.width]
+        if len(key) != self.width:
+            raise ValueError(f"keys must be at least {self.width} bytes")
+        mm, width = self.mm, self.width
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = HEADER_SIZE + mid * width
+            record = mm[start : start + width]
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+
+class HashIndex:
+    """
+    Read-only view of an index file that follows replacements of the file.
+
+    The file's identity is re-checked at most every ``check_interval``
+    seconds; a replaced file is mapped and swapped in, and the old mapping is
+    left for in-flight lookups and the garbage collector.
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self.path = os.fspath(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mapping = _Mapping(self.path)
+        self._checked_at = time.monotonic()
+
+    @property
+    def width(self):
+        return self._mapping.width
+
+    def __len__(self):
+        return self._mapping.count
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def contains(self, key):
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        return self._mapping.contains(key)
+
+    def refresh(self):
+        """Remap the file if it was replaced; returns True when it was."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return False  # keep serving the last good index
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if signature == self._mapping.signature:
+                return False
+            self._mapping = _Mapping(self.path)
+            return True
+
+
+def _write_run(records, directory):
+    run = tempfile.NamedTemporaryFile(dir=directory, prefix="hidx-run-", delete=False)
+    with run:
+        run.write(b"".join(sorted(set(records))))
+    return run.name
+
+
+def _read_run(path, width, buffer_records=65536):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(width * buffer_records)
+            if not block:
+                return
+            for start in range(0, len(block), width):
+                yield block[start : start + width]
+
+
+def _merge_runs(runs, width, out):
+    count = 0
+    previous = None
+    buffer = []
+    for record in heapq.merge(*(_read_run(run, width) for run in runs)):
+        if record == previous:
+            continue
+        previous = record
+        buffer.append(record)
+        count += 1
+        if len(buffer) >= 65536:
+            out.write(b"".join(buffer))
+            buffer = []
+    out.write(b"".join(buffer))
+    return count
+
+
+def write_index(keys, path, width, run_size=1_000_000):
+    """
+    Write ``keys`` (bytes, truncated to ``width``) to an index at ``path``.
+
+    Keys are sorted in runs of ``run_size`` records spilled to temporary
+    files next to ``path`` and then merged, so memory stays bounded by the
+    run size whatever the input size. Returns the number of unique records.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    runs = []
+    count = 0
+    try:
+        batch = []
+        for key in keys:
+            record = key[:width]
+            if len(record) != width:
+                raise ValueError(f"keys must be at least {width} bytes")
+            batch.append(record)
+            if len(batch) >= run_size:
+                runs.append(_write_run(batch, directory))
+                batch = []
+        if runs and batch:
+            runs.append(_write_run(batch, directory))
+            batch = []
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".hidx-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(_HEADER.pack(MAGIC, VERSION, width, 0))
+                if not runs:
+                    # Everything fit in one run: no need to spill and merge
+                    records = sorted(set(batch))
+                    out.write(b"".join(records))
+                    count = len(records)
+                else:
+                    count = _merge_runs(runs, width, out)
+                out.seek(0)
+                out.write(_HEADER.pack(MAGIC, VERSION, width, count))
+                out.flush()
+                os.fsync(out.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    finally:
+        for run in runs:
+            os.unlink(run)
+    return count
@@ -0,0 +1,133 @@
+"""
+``Idempotency-Key`` support for unsafe API requests.
+
+A client that retries a request after a timeout sends the same
+``Idempotency-Key`` header each time. The first request to arrive takes a
+short lock (``cache.add``) and runs; its response (status, headers, cookies
+and zlib-compressed body) is stored for ``idempotency_ttl`` seconds and
+replayed verbatim for every duplicate, marked with ``Idempotent-Replayed:
+true``. A duplicate arriving while the first is still running waits up to
+``idempotency_wait`` seconds for the stored response, then gets 409 and
+retries later. Reusing a key with a
+different request body is a client error (422).
+
+Server errors (5xx) and exceptions aren't stored, so a retry runs again.
+
+The lock and the stored responses must be visible to every worker process,
+so keys are only honoured with a shared cache (``SHARED_CACHE``); otherwise
+requests carrying one are refused with 503. The body fingerprint is keyed
+with ``SECRET_KEY``: registration bodies contain the plaintext password,
+which must not end up in the cache behind a fast unsalted hash.
+"""
+
+import hashlib
+import hmac
+import secrets
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+CACHE_PREFIX = "idempotency"
+
+
+class IdempotencyMixin:
+    """View mixin replaying stored responses for repeated idempotency keys."""
+
+    idempotent_methods = ("POST",)
+    idempotency_ttl = 24 * 3600  # seconds a response is replayed for
+    idempotency_lock_timeout = 30  # seconds; outlives any single request
+    idempotency_wait = 5.0  # seconds a concurrent duplicate waits
+    idempotency_poll_interval = 0.05
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None or request.method not in self.idempotent_methods:
+            return super().dispatch(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JsonResponse(
+                {"detail": f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters."},
+                status=400,
+            )
+        if not settings.SHARED_CACHE:
+            # Duplicates reaching another worker would run again
+            return JsonResponse(
+                {"detail": f"{HEADER} is not supported without a shared cache."},
+                status=503,
+            )
+
+        scope = hashlib.sha256(f"{request.path}\0{key}".encode()).hexdigest()
+        response_key = f"{CACHE_PREFIX}:response:{scope}"
+        lock_key = f"{CACHE_PREFIX}:lock:{scope}"
+        fingerprint = hmac.new(
+            settings.SECRET_KEY.encode(), request.body, hashlib.sha256
+        ).digest()
+
+        # The token identifies this request's lock: one that outlived its
+        # timeout must not release a lock a later request has taken since
+        token = secrets.token_hex(16)
+        if not cache.add(lock_key, token, timeout=self.idempotency_lock_timeout):
+            return self._replay(self._wait_for(response_key), fingerprint)
+        try:
+            stored = cache.get(response_key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code < 500 and not response.streaming:
+                if hasattr(response, "render"):
+                    response.render()
+                cookies = [
+                    (name, morsel.value, dict(morsel))
+                    for name, morsel in response.cookies.items()
+                ]
+                cache.set(
+                    response_key,
+                    (
+                        fingerprint,
+                        response.status_code,
+                        list(response.items()),
+                        cookies,
+                        zlib.compress(response.content),
+                    ),
+                    timeout=self.idempotency_ttl,
+                )
+            return response
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    def _wait_for(self, response_key):
+        deadline = time.monotonic() + self.idempotency_wait
+        while True:
+            stored = cache.get(response_key)
+            if stored is not None or time.monotonic() >= deadline:
+                return stored
+            time.sleep(self.idempotency_poll_interval)
+
+    def _replay(self, stored, fingerprint):
+        if stored is None:
+            response = JsonResponse(
+                {"detail": "A request with this idempotency key is still in progress."},
+                status=409,
+            )
+            response["Retry-After"] = "1"
+            return response
+        stored_fingerprint, status, headers, cookies, body = stored
+        if stored_fingerprint != fingerprint:
+            return JsonResponse(
+                {"detail": f"{HEADER} was already used with a different request body."},
+                status=422,
+            )
+        response = HttpResponse(zlib.decompress(body), status=status)
+        for name, value in headers:
+            response[name] = value
+        for name, value, attributes in cookies:
+            response.cookies[name] = value
+            response.cookies[name].update(attributes)
+        response["Idempotent-Replayed"] = "true"
+        return response
@@ -0,0 +1,329 @@
+"""
+Minimal Prometheus-style metrics registry.
+
+Counters and histograms are cheap to update (a dict lookup and an addition
+under a lock). By default samples live in process memory; when the
+``METRICS_MULTIPROC_DIR`` environment variable points at a writable
+directory, every worker process writes its samples to its own mmap-backed
+file in that directory and the ``/metrics`` endpoint aggregates all of them,
+so multi-worker servers report totals across workers.
+"""
+
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_INITIAL_MMAP_SIZE = 1 << 16
+_HEADER = struct.Struct("<I4x")
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+
+def _sample_key(name, labels):
+    """Serialize a sample name and its labels into a stable string key."""
+    return json.dumps([name, labels], separators=(",", ":"))
+
+
+class LocalStore:
+    """Sample store for a single process."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def items(self):
+        with self._lock:
+            return list(self._values.items())
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class MmapStore:
+    """
+    Per-process sample store backed by a memory-mapped file.
+
+    Layout: an 8-byte header holding the number of used bytes, followed by
+    entries of ``<key length><key bytes padded to 8><float64 value>``.
+    Values are updated in place, so an increment never reallocates once the
+    key exists.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size < _INITIAL_MMAP_SIZE:
+            self._file.truncate(_INITIAL_MMAP_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = _HEADER.unpack_from(self._mm, 0)[0] or _HEADER.size
+        for key, _, pos in _read_entries(self._mm, self._used):
+            self._positions[key] = pos
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._mm.close()
+        self._file.truncate(capacity)
+        self._capacity = capacity
+        self._mm = mmap.mmap(self._file.fileno(), capacity)
+
+    def _init_key(self, key):
+        encoded = key.encode("utf-8")
+        padded = len(encoded) + (8 - (len(encoded) + _KEY_LEN.size) % 8) % 8
+        entry_size = _KEY_LEN.size + padded + _VALUE.size
+        if self._used + entry_size > self._capacity:
+            self._grow(self._used + entry_size)
+        offset = self._used
+        _KEY_LEN.pack_into(self._mm, offset, len(encoded))
+        self._mm[offset + 4 : offset + 4 + len(encoded)] = encoded
+        pos = offset + _KEY_LEN.size + padded
+        _VALUE.pack_into(self._mm, pos, 0.0)
+        self._used += entry_size
+        _HEADER.pack_into(self._mm, 0, self._used)
+        self._positions[key] = pos
+        return pos
+
+    def inc(self, key, amount):
+        with self._lock:
+            pos = self._positions.get(key)
+            if pos is None:
+                pos = self._init_key(key)
+            value = _VALUE.unpack_from(self._mm, pos)[0]
+            _VALUE.pack_into(self._mm, pos, value + amount)
+
+    def items(self):
+        with self._lock:
+            return [
+                (key, _VALUE.unpack_from(self._mm, pos)[0])
+                for key, pos in self._positions.items()
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._mm[: _HEADER.size] = bytes(_HEADER.size)
+            self._used = _HEADER.size
+            self._positions.clear()
+
+
+def _read_entries(buf, used):
+    offset = _HEADER.size
+    while offset < used:
+        length = _KEY_LEN.unpack_from(buf, offset)[0]
+        key = bytes(buf[offset + 4 : offset + 4 + length]).decode("utf-8")
+        padded = length + (8 - (length + _KEY_LEN.size) % 8) % 8
+        pos = offset + _KEY_LEN.size + padded
+        yield key, _VALUE.unpack_from(buf, pos)[0], pos
+        offset = pos + _VALUE.size
+
+
+def _read_mmap_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        return []
+    used = _HEADER.unpack_from(data, 0)[0]
+    return [(key, value) for key, value, _ in _read_entries(data, used)]
+
+
+class Registry:
+    """Holds metric definitions and the sample store for this process."""
+
+    def __init__(self, multiproc_dir=None):
+        self.multiproc_dir = multiproc_dir
+        self._metrics = {}
+        self._store = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        # Re-open the store after a fork so each worker writes its own file.
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    if self.multiproc_dir:
+                        path = os.path.join(self.multiproc_dir, f"metrics_{pid}.db")
+                        self._store = MmapStore(path)
+                    else:
+                        self._store = LocalStore()
+                    self._pid = pid
+        return self._store
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric name: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def collect(self):
+        """Return ``{sample_key: value}`` summed over every process."""
+        if not self.multiproc_dir:
+            return dict(self.store.items())
+        totals = {}
+        for path in glob.glob(os.path.join(self.multiproc_dir, "metrics_*.db")):
+            for key, value in _read_mmap_file(path):
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def clear(self):
+        self.store.clear()
+
+    def generate_latest(self):
+        """Render every registered metric in the Prometheus text format."""
+        samples = {}
+        for key, value in self.collect().items():
+            name, labels = json.loads(key)
+            samples.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render(samples))
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return [[name, str(labels[name])] for name in self.labelnames]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _sample_key(self.name + "_total", self._labels(labels))
+        self.registry.store.inc(key, amount)
+
+    def render(self, samples):
+        for labels, value in sorted(samples.get(self.name + "_total", [])):
+            yield f"{self.name}_total{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        label_list = self._labels(labels)
+        store = self.registry.store
+        index = bisect_left(self.buckets, value)
+        bound = self.buckets[index] if index < len(self.buckets) else "+Inf"
+        store.inc(_sample_key(self.name + "_bucket", label_list + [["le", bound]]), 1)
+        store.inc(_sample_key(self.name + "_sum", label_list), value)
+        store.inc(_sample_key(self.name + "_count", label_list), 1)
+
+    def time(self, **labels):
+        """Context manager and decorator observing elapsed wall time."""
+        return _Timer(self, labels)
+
+    def render(self, samples):
+        per_series = {}
+        for labels, value in samples.get(self.name + "_bucket", []):
+            series = tuple(tuple(pair) for pair in labels[:-1])
+            per_series.setdefault(series, {})[labels[-1][1]] = value
+
+        for series in sorted(per_series):
+            counts = per_series[series]
+            cumulative = 0.0
+            for bound in list(self.buckets) + ["+Inf"]:
+                cumulative += counts.get(bound, 0.0)
+                le = bound if isinstance(bound, str) else repr(float(bound))
+                labels = list(series) + [("le", le)]
+                yield f"{self.name}_bucket{_format_labels(labels)} {_format_value(cumulative)}"
+        for suffix in ("_sum", "_count"):
+            for labels, value in sorted(samples.get(self.name + suffix, [])):
+                yield f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self._start, **self.labels)
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.histogram.observe(time.perf_counter() - start, **self.labels)
+
+        return wrapper
+
+
+REGISTRY = Registry(multiproc_dir=os.environ.get("METRICS_MULTIPROC_DIR") or None)
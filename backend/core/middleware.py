@@ -0,0 +1,165 @@
+import inspect
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import db_routers, timing
+
+logger = logging.getLogger("core.timing")
+
+
+def _db_execute_wrapper(execute, sql, params, many, context):
+    with timing.phase("db"):
+        return execute(sql, params, many, context)
+
+
+class _TimedCache:
+    """
+    Stand-in for a cache backend that times every call as the ``cache``
+    phase. Nested calls a backend makes on itself (``get_or_set`` calling
+    ``get``, the async methods running their sync versions) go to the real
+    backend and are not counted twice.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        if inspect.iscoroutinefunction(attr):
+
+            async def timed(*args, **kwargs):
+                with timing.phase("cache"):
+                    return await attr(*args, **kwargs)
+
+        else:
+
+            def timed(*args, **kwargs):
+                with timing.phase("cache"):
+                    return attr(*args, **kwargs)
+
+        return timed
+
+    def __contains__(self, key):
+        with timing.phase("cache"):
+            return key in self._backend
+
+
+@contextmanager
+def _timed_caches():
+    # Cache connections are per thread/context, and ``django.core.cache.cache``
+    # looks up ``caches["default"]`` on every access, so swapping the
+    # connections for the duration of the request covers every caller.
+    backends = {alias: caches[alias] for alias in settings.CACHES}
+    for alias, backend in backends.items():
+        caches[alias] = _TimedCache(backend)
+    try:
+        yield
+    finally:
+        for alias, backend in backends.items():
+            caches[alias] = backend
+
+
+class ServerTimingMiddleware:
+    """
+    Report where request time went as a ``Server-Timing`` header and a
+    structured log line.
+
+    Phases are collected through ``core.timing.phase``: database queries are
+    hooked via ``connection.execute_wrapper`` and cache calls by swapping each
+    cache connection for a timing proxy; password hashing, JWT encoding and
+    email sending are wrapped at their call sites. Enable with
+    ``SERVER_TIMING_ENABLED``; when disabled the middleware removes itself
+    from the chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = timing.activate()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_db_execute_wrapper))
+                stack.enter_context(_timed_caches())
+                response = self.get_response(request)
+            total = time.perf_counter() - start
+            phases = timing.current().phases
+        finally:
+            timing.deactivate(token)
+
+        metrics = [
+            f'{name};dur={duration * 1000:.2f};desc="{count}x"'
+            for name, (duration, count) in phases.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        response["Server-Timing"] = ", ".join(metrics)
+
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_timing",
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "total_ms": round(total * 1000, 2),
+                    "phases": {
+                        name: {"ms": round(duration * 1000, 2), "count": count}
+                        for name, (duration, count) in phases.items()
+                    },
+                }
+            )
+        )
+        return response
+
+
+class PrimaryPinningMiddleware:
+    """
+    Route reads of safe requests to database replicas, pinning to the primary
+    for unsafe methods, after a write, and for a few seconds after a write
+    made by a previous request of the same client (tracked with a cookie).
+
+    Removed from the chain at startup when no replicas are configured.
+    """
+
+    def __init__(self, get_response):
+        if not db_routers.replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cookie_name = settings.DATABASE_PRIMARY_PIN_COOKIE
+        self.pin_seconds = settings.DATABASE_PRIMARY_PIN_SECONDS
+
+    def __call__(self, request):
+        pinned = (
+            request.method not in ("GET", "HEAD", "OPTIONS")
+            or self.cookie_name in request.COOKIES
+        )
+        token = db_routers.activate(pinned=pinned)
+        try:
+            response = self.get_response(request)
+            wrote = db_routers.current().wrote
+        finally:
+            db_routers.deactivate(token)
+
+        if wrote and self.pin_seconds:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=self.pin_seconds,
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
@@ -0,0 +1,128 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite key, e.g. ``(date_joined, id)``.
+
+    Every page is a ``WHERE a <= x AND (a, b) < (x, y) ORDER BY a, b LIMIT n``
+    range scan on a matching index, so deep pages cost the same as the first one.
+    All ``ordering`` fields must sort in the same direction and the last one
+    must be unique. The cursor is an opaque base64 encoding of the last row's
+    key; datetime values are stored as ISO 8601 strings.
+    """
+
+    ordering = ("-date_joined", "-id")
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            values = self.decode_cursor(encoded, queryset.model)
+            queryset = queryset.filter(self._after(values))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @property
+    def _fields(self):
+        return [field.lstrip("-") for field in self.ordering]
+
+    def _after(self, values):
+        """
+        Row-value comparison ``key > values`` expanded into OR'd ANDs.
+
+        The OR alone isn't an index range predicate; the leading bound on the
+        first field (implied by it) is what lets the database seek instead
+        of scanning.
+        """
+        descending = self.ordering[0].startswith("-")
+        lookup = "lt" if descending else "gt"
+        bound = Q(**{f"{self._fields[0]}__{'lte' if descending else 'gte'}": values[0]})
+        condition = Q()
+        for index, field in enumerate(self._fields):
+            clause = Q(**{f"{field}__{lookup}": values[index]})
+            for previous, value in zip(self._fields[:index], values):
+                clause &= Q(**{previous: value})
+            condition |= clause
+        return bound & condition
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self._fields:
+            value = getattr(obj, field)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, encoded, model):
+        """Decode and validate a cursor against ``model``'s ordering fields."""
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        decoded = []
+        for field, value in zip(self._fields, values):
+            if not isinstance(value, (str, int)) or isinstance(value, bool):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                value = model._meta.get_field(field).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            decoded.append(value)
+        return decoded
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,73 @@
+"""
+JSON renderer backed by ``orjson`` (a declared dependency; without it this
+is plain ``JSONRenderer``).
+
+Output matches DRF's ``JSONRenderer`` with the default compact, unicode
+settings: datetimes are written natively with DRF's ``Z`` suffix for UTC,
+values orjson can't handle (lazy translation strings, Decimals, querysets,
+...) go through DRF's own encoder, and U+2028/U+2029 are escaped. Indented
+output (``Accept: application/json; indent=4`` or the browsable API) and
+anything orjson rejects, such as integers wider than 64 bits, fall back to
+the stdlib renderer. So do NaN and infinities, which orjson would write as
+``null``: DRF's strict renderer raises ``ValueError`` for them instead.
+"""
+
+import math
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - declared in pyproject.toml
+    orjson = None
+
+_LINE_SEPARATOR = "\u2028".encode()
+_PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+# DRF's encoder knows Promise, datetime, Decimal, QuerySet, iterables...
+_encode = encoders.JSONEncoder().default
+
+
+def _default(obj):
+    value = _encode(obj)
+    if isinstance(value, float) and not math.isfinite(value):
+        # e.g. Decimal("NaN"); orjson reports it and the stdlib path raises
+        raise TypeError("Out of range float values are not JSON compliant")
+    return value
+
+
+def _has_non_finite(data):
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(item) for item in data)
+    return False
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Non-finite floats come out as null; only then is the data walked
+        if b"null" in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if _LINE_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b"\\u2028")
+        if _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_PARAGRAPH_SEPARATOR, b"\\u2029")
+        return ret
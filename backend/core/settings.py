@@ -11,8 +11,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
-from pathlib import Path
 from datetime import timedelta
+from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -60,6 +60,7 @@ INSTALLED_APPS += [
     "rest_framework",
     "rest_framework.authtoken",
     "rest_framework_simplejwt",
+    "django_filters",
 ]
 
 # Allauth
@@ -77,9 +78,12 @@ INSTALLED_APPS += [
 
 
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.PrimaryPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -87,6 +91,18 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Server-Timing headers and per-request timing logs; the middleware removes
+# itself from the chain at startup when disabled
+SERVER_TIMING_ENABLED = int(os.environ.get("SERVER_TIMING_ENABLED", default=0))
+
+# Receivers connected through core.deferred_signals run after commit on a
+# bounded thread pool; calls beyond workers + queue size are dropped
+DEFERRED_SIGNAL_WORKERS = int(os.environ.get("DEFERRED_SIGNAL_WORKERS", default=4))
+DEFERRED_SIGNAL_QUEUE_SIZE = int(
+    os.environ.get("DEFERRED_SIGNAL_QUEUE_SIZE", default=1000)
+)
+DEFERRED_SIGNALS_EAGER = False
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -132,10 +148,63 @@ else:
         }
     }
 
+# Read replicas: comma-separated hosts sharing the primary's credentials.
+# Safe reads are routed to them (see core.db_routers); requests that write
+# pin the client to the primary for DATABASE_PRIMARY_PIN_SECONDS.
+SQL_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("SQL_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+DATABASES.update(
+    {
+        f"replica_{index}": {**DATABASES["default"], "HOST": host}
+        for index, host in enumerate(SQL_REPLICA_HOSTS, start=1)
+    }
+)
+DATABASE_REPLICAS = [
+    f"replica_{index}" for index in range(1, len(SQL_REPLICA_HOSTS) + 1)
+]
+
+DATABASE_ROUTERS = ["core.db_routers.PrimaryReplicaRouter"]
+DATABASE_PRIMARY_PIN_COOKIE = "primary_pin"
+DATABASE_PRIMARY_PIN_SECONDS = int(
+    os.environ.get("DATABASE_PRIMARY_PIN_SECONDS", default=5)
+)
+
+# Cache shared by every worker process. The refresh token denylist, cached
+# user state and permission versions, idempotency locks and verification
+# status all coordinate between workers through it, so any deployment with
+# more than one worker process must set REDIS_URL. Without it each process
+# gets its own in-memory cache, which is only correct for a single process
+# (see the authentication.E001 system check).
+REDIS_URL = os.environ.get("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+SHARED_CACHE = bool(REDIS_URL)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
+PASSWORD_INDEX_PATH = os.environ.get("PASSWORD_INDEX_PATH") or None
+
+# Email domain indexes built with `manage.py build_domain_index`; registration
+# rejects blocklisted domains (and their subdomains) unless allowlisted
+EMAIL_DOMAIN_BLOCKLIST_PATH = os.environ.get("EMAIL_DOMAIN_BLOCKLIST_PATH") or None
+EMAIL_DOMAIN_ALLOWLIST_PATH = os.environ.get("EMAIL_DOMAIN_ALLOWLIST_PATH") or None
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -144,7 +213,13 @@ AUTH_PASSWORD_VALIDATORS = [
         "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
     },
     {
-        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+        # The breached password index (manage.py build_password_index) includes
+        # Django's common password list, so it replaces CommonPasswordValidator
+        "NAME": (
+            "authentication.password_validation.BreachedPasswordValidator"
+            if PASSWORD_INDEX_PATH
+            else "django.contrib.auth.password_validation.CommonPasswordValidator"
+        ),
     },
     {
         "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
@@ -170,6 +245,24 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Content-hashed filenames plus precompressed .gz/.br siblings, served by
+# Nginx with gzip_static; collectstatic skips unchanged sources
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": os.environ.get(
+            "STATICFILES_STORAGE",
+            "core.storage.CompressedManifestStaticFilesStorage",
+        ),
+    },
+}
+
+# Shared-cache lifetime (seconds) for public, idempotent GET responses such as
+# the home endpoint; Nginx's micro-cache honours it (see nginx.prod.conf)
+API_CACHE_MAX_AGE = int(os.environ.get("API_CACHE_MAX_AGE", default=5))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -181,7 +274,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "authentication.User"
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
+    # ModelBackend with permission sets cached across requests
+    "authentication.backends.CachedModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
 ]
 
@@ -193,13 +287,50 @@ AUTHENTICATION_BACKENDS = [
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=120),  # 2 hours
     "REFRESH_TOKEN_LIFETIME": timedelta(days=15),  # 15 days
-    "ROTATE_REFRESH_TOKENS": False,
+    "ROTATE_REFRESH_TOKENS": True,
+    # Rotated tokens are revoked by authentication.denylist; simplejwt's own
+    # blacklist needs the token_blacklist app and must stay off
     "BLACKLIST_AFTER_ROTATION": False,
     "UPDATE_LAST_LOGIN": True,
     "SIGNING_KEY": os.environ.get("JWT_SIGNING_KEY", "foo"),
     "ALGORITHM": "HS512",
+    "TOKEN_REFRESH_SERIALIZER": "authentication.serializers.CustomTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "authentication.serializers.CustomTokenVerifySerializer",
 }
 
+# Authentication audit events (authentication.audit): buffered in each
+# worker and written in batches; rows older than the retention are removed
+# by `manage.py prune_audit_events`
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", default=1.0))
+AUDIT_BATCH_SIZE = 500
+AUDIT_MAX_BUFFER = 10000
+AUDIT_RETENTION_DAYS = int(os.environ.get("AUDIT_RETENTION_DAYS", default=90))
+
+# Lifetime of the status token returned at registration, and how often each
+# worker checks the cache for confirmations made by other workers
+VERIFICATION_STATUS_TOKEN_MAX_AGE = 24 * 3600  # seconds
+VERIFICATION_STATUS_POLL_INTERVAL = 1.0  # seconds
+
+# Request header holding the client address set by the reverse proxy in front
+# of the API: "X-Real-IP", or "X-Forwarded-For" to use its last hop. Leave it
+# empty when clients can reach Django directly, since they could forge it.
+CLIENT_IP_HEADER = os.environ.get("CLIENT_IP_HEADER", default="")
+
+# Who may scrape /metrics: peers connecting from these space-separated
+# addresses or networks (the socket address, never a proxy header, so do not
+# list the reverse proxy itself), or requests carrying
+# "Authorization: Bearer <METRICS_TOKEN>". Everyone else gets a 404.
+METRICS_ALLOWED_IPS = os.environ.get(
+    "METRICS_ALLOWED_IPS", default="127.0.0.1 ::1"
+).split()
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", default="")
+
+# Oldest sessions (and their refresh tokens) are revoked beyond this count
+MAX_SESSIONS_PER_USER = int(os.environ.get("MAX_SESSIONS_PER_USER", default=10))
+
+# In-process Bloom filter size for the refresh token denylist (bits per worker)
+JWT_DENYLIST_BLOOM_BITS = 1 << 24
+
 # =========================
 # REST framework
 # =========================
@@ -208,6 +339,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
+    # orjson-backed JSON when installed (stdlib json otherwise); the browsable
+    # API is only offered in development
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # =========================
@@ -249,4 +391,5 @@ REST_AUTH = {
     "USE_JWT": True,  # required by dj-rest-auth
     "JWT_AUTH_HTTPONLY": False,  # should be off, otherwise dj-rest-auth won't send out refresh tokens
     "REGISTER_SERIALIZER": "authentication.serializers.CustomRegisterSerializer",
+    "JWT_TOKEN_CLAIMS_SERIALIZER": "authentication.serializers.TokenClaimsSerializer",
 }
@@ -1,3 +1,5 @@
+import os
+
 from .settings import *
 
 # Database - Use SQLite
@@ -5,8 +7,16 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",  # In-memory
-    }
+    },
+    # Stand-in read replica: a second connection to the test database.
+    # Routing to it is off unless a test sets DATABASE_REPLICAS.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {"MIRROR": "default"},
+    },
 }
+DATABASE_REPLICAS = []
 
 # Allow all hosts for testing
 ALLOWED_HOSTS = ["*"]
@@ -24,6 +34,40 @@ LOGGING = {
     "root": {"handlers": ["console"], "level": "WARNING"},
 }
 
+# Tests don't run collectstatic, so there is no manifest to resolve hashed names
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
-CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Run deferred signal receivers inline when the transaction commits
+DEFERRED_SIGNALS_EAGER = True
+
+# No background audit writer; tests call authentication.audit.flush()
+AUDIT_FLUSH_INTERVAL = None
+
+# pytest-xdist runs each worker in its own process with its own in-memory
+# database; give each worker a distinct cache namespace too, so nothing keyed
+# on the cache (attempt counters, denylist version, user state) can leak
+# between workers even with a shared backend.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"tests-{XDIST_WORKER}",
+        "KEY_PREFIX": XDIST_WORKER,
+    }
+}
+
+# Each test process is its own single-worker deployment, so its local cache
+# is shared by everything that runs in it
+SHARED_CACHE = True
+
+# Keep metrics in process memory: workers must not aggregate each other's
+# samples through a shared multiprocess directory
+os.environ.pop("METRICS_MULTIPROC_DIR", None)
@@ -0,0 +1,111 @@
+"""
+Static files storage producing content-hashed names plus precompressed
+siblings (``.gz`` and, when the ``brotli`` package is installed, ``.br``) so
+Nginx can serve them with ``gzip_static`` and cache them as immutable.
+
+Post-processing is incremental: when the set of source files (names, sizes
+and modification times) is unchanged since the last run, hashing and
+compression are skipped entirely, and compressed siblings are only rewritten
+for files that changed.
+"""
+
+import gzip
+import hashlib
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    compress_extensions = (
+        ".css",
+        ".js",
+        ".mjs",
+        ".map",
+        ".svg",
+        ".txt",
+        ".html",
+        ".json",
+        ".xml",
+    )
+    min_compress_size = 256
+    fingerprint_name = ".collectstatic-fingerprint"
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        fingerprint = self.source_fingerprint(paths)
+        if fingerprint == self.read_fingerprint() and self.exists(self.manifest_name):
+            return
+
+        processed = set()
+        for original_path, processed_path, was_processed in super().post_process(
+            paths, dry_run=dry_run, **options
+        ):
+            if not isinstance(was_processed, Exception):
+                processed.add(original_path)
+                if processed_path:
+                    processed.add(processed_path)
+            yield original_path, processed_path, was_processed
+
+        for name in sorted(processed):
+            self.compress(name)
+        self.write_fingerprint(fingerprint)
+
+    def source_fingerprint(self, paths):
+        digest = hashlib.sha256()
+        for prefixed_path in sorted(paths):
+            storage, path = paths[prefixed_path]
+            stat = os.stat(storage.path(path))
+            digest.update(
+                f"{prefixed_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+            )
+        return digest.hexdigest()
+
+    def read_fingerprint(self):
+        try:
+            with open(self.path(self.fingerprint_name)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def write_fingerprint(self, fingerprint):
+        with open(self.path(self.fingerprint_name), "w") as f:
+            f.write(fingerprint)
+
+    def compress(self, name):
+        if not name.endswith(self.compress_extensions):
+            return
+        path = self.path(name)
+        source_mtime = os.path.getmtime(path)
+        if os.path.getsize(path) < self.min_compress_size:
+            return
+
+        targets = [(path + ".gz", self._gzip)]
+        if brotli is not None:
+            targets.append((path + ".br", brotli.compress))
+
+        content = None
+        for target, compress in targets:
+            if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+                continue
+            if content is None:
+                with open(path, "rb") as f:
+                    content = f.read()
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            with open(target, "wb") as f:
+                f.write(compressed)
+
+    @staticmethod
+    def _gzip(content):
+        # mtime=0 keeps the output reproducible across runs
+        return gzip.compress(content, compresslevel=9, mtime=0)
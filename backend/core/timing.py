@@ -0,0 +1,74 @@
+"""
+Per-request phase timings.
+
+``ServerTimingMiddleware`` activates a ``RequestTimings`` collector for the
+current request; code on the hot path wraps expensive work in
+``phase("name")``. When no collector is active (the middleware is disabled or
+the code runs outside a request) ``phase`` returns a shared no-op context
+manager, so the instrumentation costs a single context variable lookup.
+"""
+
+import time
+from contextvars import ContextVar
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Accumulated duration and call count per phase for one request."""
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, name, duration):
+        total, count = self.phases.get(name, (0.0, 0))
+        self.phases[name] = (total + duration, count + 1)
+
+
+class _Phase:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name):
+    """Time the enclosed block as ``name`` if a collector is active."""
+    timings = _current.get()
+    if timings is None:
+        return _NULL_PHASE
+    return _Phase(timings, name)
+
+
+def activate():
+    """Start collecting timings for the current context; returns a reset token."""
+    return _current.set(RequestTimings())
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
@@ -16,11 +16,13 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
-from .views import home
+from django.urls import include, path
+
+from .views import home, metrics
 
 urlpatterns = [
     path("", home, name="home"),
+    path("metrics", metrics, name="metrics"),
     path("accounts/", include("allauth.urls")),
     path("api/auth/", include("authentication.urls")),
     path("admin/", admin.site.urls),
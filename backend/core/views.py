@@ -1,11 +1,32 @@
 # core/views.py
 
-from django.core.mail import send_mail
-from django.conf import settings
-from django.http import JsonResponse
+import hmac
+import ipaddress
+import json
 from datetime import datetime
+from hashlib import md5
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.decorators.http import condition
+
+from .metrics import REGISTRY
+
+HOME_PAYLOAD = {"status": "Welcome to the API"}
+HOME_ETAG = md5(json.dumps(HOME_PAYLOAD).encode("utf-8")).hexdigest()
+
 
+def _home_etag(request):
+    # The welcome payload never changes, so probes with a matching
+    # If-None-Match get a 304 before the response body is built.
+    if request.GET.get("mail_test"):
+        return None
+    return HOME_ETAG
 
+
+@condition(etag_func=_home_etag)
 def home(request):
 
     if request.GET.get("mail_test") == "1" and settings.DEBUG:
@@ -16,6 +37,48 @@ def home(request):
             "test@example.com",
             ["test@example.com"],
         )
-        return JsonResponse({"status": "Test email sent"}, status=200)
+        response = JsonResponse({"status": "Test email sent"}, status=200)
+        add_never_cache_headers(response)
+        return response
+
+    response = JsonResponse(HOME_PAYLOAD, status=200)
+    patch_cache_control(response, public=True, max_age=settings.API_CACHE_MAX_AGE)
+    return response
+
+
+def _may_scrape_metrics(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(
+            " "
+        )
+        if scheme.lower() == "bearer" and hmac.compare_digest(
+            credentials.strip().encode(), token.encode()
+        ):
+            return True
+    try:
+        peer = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        peer in ipaddress.ip_network(allowed, strict=False)
+        for allowed in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics(request):
+    """
+    Expose process (or multi-process) metrics in the Prometheus text format.
 
-    return JsonResponse({"status": "Welcome to the API"}, status=200)
+    Only peers in ``METRICS_ALLOWED_IPS`` or requests with the
+    ``METRICS_TOKEN`` bearer token are served; anyone else gets a 404 so the
+    endpoint's existence is not advertised.
+    """
+    if not _may_scrape_metrics(request):
+        raise Http404
+    response = HttpResponse(
+        REGISTRY.generate_latest(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+    add_never_cache_headers(response)
+    return response
@@ -21,6 +21,7 @@ echo "✔ MIGRATE..."
 python manage.py migrate --noinput
 
 echo "✔ COLLECTSTATIC..."
+# Incremental: unchanged files are not copied, hashed or recompressed again
 python manage.py collectstatic --noinput
 
 exec "$@"
\ No newline at end of file
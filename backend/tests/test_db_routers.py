@@ -0,0 +1,92 @@
+import pytest
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.db_routers import PrimaryReplicaRouter, replica_reads
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+@pytest.fixture
+def tokens(user):
+    EmailAddress.objects.create(
+        user=user, email=user.email, verified=True, primary=True
+    )
+    response = APIClient().post(
+        reverse("rest_login"), {"email": user.email, "password": "user123"}
+    )
+    assert response.status_code == 200
+    return response.data
+
+
+def test_safe_request_reads_from_replica(replicas, tokens):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    with CaptureQueriesContext(
+        connections["default"]
+    ) as primary, CaptureQueriesContext(connections["replica"]) as replica:
+        response = client.get(reverse("session_list"))
+
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    assert replica.captured_queries
+    assert not primary.captured_queries
+    assert "primary_pin" not in response.cookies
+
+
+def test_unsafe_request_uses_primary_and_pins_client(replicas, user):
+    EmailAddress.objects.create(
+        user=user, email=user.email, verified=True, primary=True
+    )
+    client = APIClient()
+
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        response = client.post(
+            reverse("rest_login"), {"email": user.email, "password": "user123"}
+        )
+
+    assert response.status_code == 200
+    assert not replica.captured_queries
+    assert response.cookies["primary_pin"]["max-age"] == 5
+
+
+def test_pin_cookie_keeps_reads_on_primary(replicas, tokens):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    client.cookies["primary_pin"] = "1"
+
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        response = client.get(reverse("session_list"))
+
+    assert response.status_code == 200
+    assert not replica.captured_queries
+
+
+def test_reads_outside_requests_use_primary_unless_opted_in(replicas, user):
+    User = get_user_model()
+
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        assert User.objects.filter(pk=user.pk).exists()
+    assert not replica.captured_queries
+
+    with replica_reads(), CaptureQueriesContext(connections["replica"]) as replica:
+        assert User.objects.filter(pk=user.pk).exists()
+        User.objects.filter(pk=user.pk).update(first_name="Pinned")
+        assert User.objects.get(pk=user.pk).first_name == "Pinned"
+    assert len(replica.captured_queries) == 1
+
+
+def test_replicas_are_not_migrated(replicas):
+    router = PrimaryReplicaRouter()
+    assert router.allow_migrate("replica", "authentication") is False
+    assert router.allow_migrate("default", "authentication") is None
@@ -0,0 +1,37 @@
+import sys
+
+from django.contrib.sites.models import Site
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from core.db_snapshot import schema_key
+
+
+def test_test_database_is_fully_migrated(db):
+    executor = MigrationExecutor(connection)
+    targets = executor.loader.graph.leaf_nodes()
+
+    assert executor.migration_plan(targets) == []
+    # Rows written by data migrations and post_migrate are part of it too
+    assert Site.objects.filter(pk=1).exists()
+
+
+def test_schema_key_follows_migration_files(tmp_path, monkeypatch, settings):
+    package = tmp_path / "snapshot_test_migrations"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    migration = package / "0001_initial.py"
+    migration.write_text("# first\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "snapshot_test_migrations", raising=False)
+    settings.MIGRATION_MODULES = {"authentication": "snapshot_test_migrations"}
+
+    key = schema_key()
+    assert schema_key() == key
+
+    migration.write_text("# changed\n")
+    changed = schema_key()
+    assert changed != key
+
+    (package / "0002_more.py").write_text("")
+    assert schema_key() not in (key, changed)
@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pytest
+from allauth.account.models import EmailAddress, EmailConfirmation
+from allauth.account.signals import email_confirmed, user_signed_up
+from django.db import transaction
+from django.dispatch import Signal
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.utils import generate_verification_code
+from core.deferred_signals import (
+    DeferredDispatcher,
+    connect_deferred,
+    disconnect_deferred,
+)
+from core.metrics import REGISTRY
+
+RECEIVER_COST = 1.0
+
+something_happened = Signal()
+
+
+@pytest.fixture
+def deferred(request):
+    """Connect a receiver for the duration of a test."""
+    connected = []
+
+    def connect(signal, func, **kwargs):
+        connect_deferred(signal, func, **kwargs)
+        connected.append((signal, func))
+
+    yield connect
+    for signal, func in connected:
+        disconnect_deferred(signal, func)
+
+
+def register(email="new@example.com"):
+    return APIClient().post(
+        reverse("rest_register"),
+        {"email": email, "password1": "StrongPass123!", "password2": "StrongPass123!"},
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_request_latency_is_independent_of_receiver_cost(settings, deferred):
+    settings.DEFERRED_SIGNALS_EAGER = False
+    dispatcher = DeferredDispatcher(max_workers=2, max_pending=10)
+    signed_up = []
+
+    def slow_receiver(sender, user, **kwargs):
+        time.sleep(RECEIVER_COST)
+        signed_up.append(user.email)
+
+    deferred(user_signed_up, slow_receiver, dispatcher=dispatcher)
+
+    start = time.perf_counter()
+    response = register()
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 201
+    assert elapsed < RECEIVER_COST
+    assert signed_up == []
+    assert dispatcher.join(timeout=5)
+    assert signed_up == ["new@example.com"]
+    output = REGISTRY.generate_latest()
+    assert "slow_receiver" in output
+    assert 'outcome="success"} 1' in output
+
+
+@pytest.mark.django_db
+def test_receivers_wait_for_the_verification_transaction(
+    django_capture_on_commit_callbacks, deferred
+):
+    confirmed = []
+    deferred(
+        email_confirmed,
+        lambda sender, email_address, **kwargs: confirmed.append(email_address.email),
+    )
+    assert register().status_code == 201
+    code = generate_verification_code(EmailConfirmation.objects.get().key)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = APIClient().post(
+            reverse("rest_verify_email"), {"email": "new@example.com", "code": code}
+        )
+        assert response.status_code == 200
+        assert EmailAddress.objects.get().verified
+        assert confirmed == []
+
+    for callback in callbacks:
+        callback()
+    assert confirmed == ["new@example.com"]
+
+
+@pytest.mark.django_db
+def test_rolled_back_transactions_never_run_receivers(
+    django_capture_on_commit_callbacks, deferred
+):
+    calls = []
+    deferred(something_happened, lambda sender, **kwargs: calls.append(sender))
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                something_happened.send(sender="rolled back")
+                raise RuntimeError
+        something_happened.send(sender="committed")
+
+    assert len(callbacks) == 1
+    assert calls == ["committed"]
+
+
+def test_full_queue_drops_and_counts(settings):
+    settings.DEFERRED_SIGNALS_EAGER = False
+    dispatcher = DeferredDispatcher(max_workers=1, max_pending=1)
+    release = threading.Event()
+    calls = []
+
+    def blocking(sender, **kwargs):
+        release.wait(5)
+        calls.append(sender)
+
+    accepted = [dispatcher.dispatch(blocking, "blocking", i, {}) for i in range(3)]
+    release.set()
+
+    assert accepted == [True, True, False]
+    assert dispatcher.join(timeout=5)
+    assert sorted(calls) == [0, 1]
+    output = REGISTRY.generate_latest()
+    assert (
+        'deferred_signal_receiver_runs_total{receiver="blocking",outcome="dropped"} 1'
+        in output
+    )
+    assert (
+        'deferred_signal_receiver_runs_total{receiver="blocking",outcome="success"} 2'
+        in output
+    )
+    # Slots are released once calls finish
+    assert dispatcher.dispatch(blocking, "blocking", 3, {})
+    assert dispatcher.join(timeout=5)
+
+
+def test_receiver_errors_are_logged_and_counted(settings, caplog):
+    settings.DEFERRED_SIGNALS_EAGER = False
+    dispatcher = DeferredDispatcher(max_workers=1, max_pending=1)
+
+    def broken(sender, **kwargs):
+        raise ValueError("boom")
+
+    assert dispatcher.dispatch(broken, "broken", None, {})
+    assert dispatcher.join(timeout=5)
+    assert "Deferred signal receiver broken failed" in caplog.text
+    assert (
+        'deferred_signal_receiver_runs_total{receiver="broken",outcome="error"} 1'
+        in (REGISTRY.generate_latest())
+    )
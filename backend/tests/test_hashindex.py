@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+import pytest
+
+from core.hashindex import HEADER_SIZE, HashIndex, IndexFormatError, write_index
+
+
+def digest(value):
+    return hashlib.sha1(value.encode()).digest()
+
+
+def test_lookup_across_merged_runs(tmp_path):
+    path = tmp_path / "index.bin"
+    keys = [digest(str(i)) for i in range(1000)]
+
+    count = write_index(keys + keys[:10], path, width=8, run_size=64)
+
+    assert count == 1000
+    assert os.path.getsize(path) == HEADER_SIZE + 8 * 1000
+    assert not [name for name in os.listdir(tmp_path) if name != "index.bin"]
+    index = HashIndex(path)
+    assert len(index) == 1000
+    assert all(key in index for key in keys)
+    assert digest("missing") not in index
+
+
+def test_empty_index(tmp_path):
+    path = tmp_path / "empty.bin"
+    assert write_index([], path, width=4) == 0
+    assert digest("anything") not in HashIndex(path)
+
+
+def test_replaced_file_is_picked_up(tmp_path):
+    path = tmp_path / "index.bin"
+    write_index([digest("old")], path, width=8)
+    index = HashIndex(path, check_interval=0)
+    assert digest("old") in index
+
+    write_index([digest("new")], path, width=8)
+
+    assert digest("new") in index
+    assert digest("old") not in index
+
+
+def test_missing_file_keeps_last_index(tmp_path):
+    path = tmp_path / "index.bin"
+    write_index([digest("kept")], path, width=8)
+    index = HashIndex(path, check_interval=0)
+    os.unlink(path)
+
+    assert digest("kept") in index
+
+
+def test_rejects_corrupt_files(tmp_path):
+    path = tmp_path / "index.bin"
+    write_index([digest("a"), digest("b")], path, width=8)
+    with open(path, "r+b") as f:
+        f.truncate(HEADER_SIZE + 8)
+
+    with pytest.raises(IndexFormatError):
+        HashIndex(path)
+
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(IndexFormatError):
+        HashIndex(path)
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_home_is_publicly_cacheable_with_etag(client):
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert "public" in response["Cache-Control"]
+    assert "max-age=" in response["Cache-Control"]
+    assert response["ETag"]
+
+
+@pytest.mark.django_db
+def test_home_answers_matching_etag_with_304(client):
+    etag = client.get("/")["ETag"]
+
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_metrics_are_never_cached(client):
+    response = client.get("/metrics")
+
+    assert "no-cache" in response["Cache-Control"]
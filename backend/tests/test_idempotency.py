@@ -0,0 +1,222 @@
+import hashlib
+import json
+import threading
+import time
+
+import pytest
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from core.idempotency import CACHE_PREFIX, IdempotencyMixin
+
+LOST_LOCK_KEY = (
+    f"{CACHE_PREFIX}:lock:" + hashlib.sha256("/lost/\0x".encode()).hexdigest()
+)
+PAYLOAD = {
+    "email": "retry@example.com",
+    "password1": "StrongPass123!",
+    "password2": "StrongPass123!",
+}
+
+
+class SlowView(IdempotencyMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+    calls = 0
+
+    def post(self, request):
+        type(self).calls += 1
+        time.sleep(0.2)
+        return Response({"call": self.calls}, status=201)
+
+
+class CreatedView(IdempotencyMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        response = Response({"id": 7}, status=201, headers={"Location": "/things/7/"})
+        response["Vary"] = "Cookie"
+        response.set_cookie("session", "abc", max_age=60, httponly=True, samesite="Lax")
+        return response
+
+
+class LockLosingView(IdempotencyMixin, APIView):
+    """Runs past its lock, which a later request takes in the meantime."""
+
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        cache.delete(LOST_LOCK_KEY)  # timed out
+        cache.add(LOST_LOCK_KEY, "later-request")
+        return Response(status=201)
+
+
+@pytest.mark.django_db
+def test_registration_retry_replays_first_response():
+    client = APIClient()
+    first = client.post(reverse("rest_register"), PAYLOAD, HTTP_IDEMPOTENCY_KEY="abc")
+    retry = client.post(reverse("rest_register"), PAYLOAD, HTTP_IDEMPOTENCY_KEY="abc")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry["Idempotent-Replayed"] == "true"
+    assert get_user_model().objects.count() == 1
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+def test_key_reuse_with_different_body_is_rejected():
+    client = APIClient()
+    client.post(reverse("rest_register"), PAYLOAD, HTTP_IDEMPOTENCY_KEY="abc")
+    other = {**PAYLOAD, "email": "other@example.com"}
+    response = client.post(reverse("rest_register"), other, HTTP_IDEMPOTENCY_KEY="abc")
+
+    assert response.status_code == 422
+    assert not get_user_model().objects.filter(email="other@example.com").exists()
+
+
+@pytest.mark.django_db
+def test_verify_retry_counts_one_failed_attempt(user):
+    from allauth.account.models import EmailConfirmation
+    from django.utils import timezone
+
+    from authentication.views import CustomVerifyEmailView
+
+    address = EmailAddress.objects.create(
+        user=user, email=user.email, verified=False, primary=True
+    )
+    confirmation = EmailConfirmation.create(address)
+    confirmation.sent = timezone.now()
+    confirmation.save()
+    client = APIClient()
+    payload = {"email": user.email, "code": "000000"}
+    responses = [
+        client.post(reverse("rest_verify_email"), payload, HTTP_IDEMPOTENCY_KEY="v1")
+        for _ in range(3)
+    ]
+
+    assert [r.status_code for r in responses] == [400, 400, 400]
+    assert cache.get(CustomVerifyEmailView()._attempts_cache_key(confirmation.key)) == 1
+
+
+def test_concurrent_duplicates_do_the_work_once():
+    SlowView.calls = 0
+    view = SlowView.as_view()
+    factory = APIRequestFactory()
+    responses = []
+
+    def call():
+        request = factory.post(
+            "/slow/", {"a": 1}, format="json", HTTP_IDEMPOTENCY_KEY="k"
+        )
+        responses.append(view(request))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowView.calls == 1
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert sum(r.has_header("Idempotent-Replayed") for r in responses) == 2
+
+
+def test_duplicate_gets_409_while_first_is_still_running():
+    SlowView.calls = 0
+    view = SlowView.as_view(idempotency_wait=0)
+    factory = APIRequestFactory()
+    results = {}
+
+    def first():
+        results["first"] = view(
+            factory.post("/slow/", {}, format="json", HTTP_IDEMPOTENCY_KEY="x")
+        )
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    while not SlowView.calls:  # the first request holds the lock
+        time.sleep(0.005)
+    second = view(factory.post("/slow/", {}, format="json", HTTP_IDEMPOTENCY_KEY="x"))
+    thread.join()
+
+    assert second.status_code == 409
+    assert second["Retry-After"] == "1"
+    assert results["first"].status_code == 201
+
+
+def test_requests_without_key_are_not_stored():
+    SlowView.calls = 0
+    view = SlowView.as_view()
+    factory = APIRequestFactory()
+    for _ in range(2):
+        view(factory.post("/slow/", {}, format="json"))
+    assert SlowView.calls == 2
+
+
+@pytest.mark.django_db
+def test_stored_fingerprint_is_not_a_plain_hash_of_the_body():
+    # The registration body holds the plaintext password
+    body = json.dumps(PAYLOAD).encode()
+    APIClient().post(
+        reverse("rest_register"),
+        body,
+        content_type="application/json",
+        HTTP_IDEMPOTENCY_KEY="abc",
+    )
+
+    scope = hashlib.sha256(f"{reverse('rest_register')}\0abc".encode()).hexdigest()
+    fingerprint = cache.get(f"{CACHE_PREFIX}:response:{scope}")[0]
+    assert fingerprint != hashlib.sha256(body).digest()
+
+
+def test_keys_are_refused_without_a_shared_cache(settings):
+    settings.SHARED_CACHE = False
+    SlowView.calls = 0
+    request = APIRequestFactory().post(
+        "/slow/", {}, format="json", HTTP_IDEMPOTENCY_KEY="abc"
+    )
+
+    response = SlowView.as_view()(request)
+
+    assert response.status_code == 503
+    assert SlowView.calls == 0
+
+
+def test_replay_keeps_headers_and_cookies():
+    view = CreatedView.as_view()
+    factory = APIRequestFactory()
+    first, retry = (
+        view(factory.post("/things/", {}, format="json", HTTP_IDEMPOTENCY_KEY="h"))
+        for _ in range(2)
+    )
+    first.render()
+
+    assert retry["Idempotent-Replayed"] == "true"
+    assert retry.status_code == first.status_code == 201
+    for header in ("Content-Type", "Location", "Vary"):
+        assert retry[header] == first[header]
+    assert (
+        retry.cookies["session"].OutputString()
+        == first.cookies["session"].OutputString()
+    )
+    assert retry.content == first.content
+
+
+def test_expired_lock_taken_by_another_request_is_kept():
+    request = APIRequestFactory().post(
+        "/lost/", {}, format="json", HTTP_IDEMPOTENCY_KEY="x"
+    )
+
+    assert LockLosingView.as_view()(request).status_code == 201
+
+    assert cache.get(LOST_LOCK_KEY) == "later-request"
+    cache.delete(LOST_LOCK_KEY)
@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    "detail": _("Email successfully verified."),
+    "errors": {"email": [ErrorDetail("Enter a valid email address.", code="invalid")]},
+    "joined": datetime.datetime(
+        2025, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc
+    ),
+    "naive": datetime.datetime(2025, 1, 2, 3, 4, 5),
+    "offset": datetime.datetime(
+        2025,
+        1,
+        2,
+        3,
+        4,
+        5,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30)),
+    ),
+    "day": datetime.date(2025, 1, 2),
+    "time": datetime.time(3, 4, 5, 120),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "amount": decimal.Decimal("1.50"),
+    1: "non-string key",
+    "text": "line\u2028separator\u2029 ünïcode",
+    "nested": [{"a": None, "b": True, "c": 1.5}],
+}
+
+
+def test_output_matches_drf_renderer():
+    assert FastJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+def test_indent_falls_back_to_stdlib():
+    rendered = FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+    assert rendered == JSONRenderer().render({"a": 1}, "application/json; indent=2")
+
+
+def test_unencodable_values_fall_back_to_stdlib():
+    assert (
+        FastJSONRenderer().render({"big": 2**70}) == b'{"big":1180591620717411303424}'
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"score": float("nan")},
+        {"nested": [1, {"limit": float("inf")}]},
+        {"amount": decimal.Decimal("-Infinity")},
+    ],
+)
+def test_non_finite_floats_raise_like_drf(data):
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render(data)
+
+
+def test_parser_matches_drf_parser():
+    body = b'{"email": "user@example.com", "code": "123456", "n": [1, 2.5, null]}'
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+@pytest.mark.parametrize("body", [b'{"email": ', b'{"n": NaN}'])
+def test_parser_rejects_invalid_json(body):
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(body))
+
+
+def test_browsable_api_is_not_negotiated_in_production(client, db):
+    response = client.post(
+        "/api/auth/registration/verify-email/", {}, HTTP_ACCEPT="text/html"
+    )
+    assert response["Content-Type"] == "application/json"
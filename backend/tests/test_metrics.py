@@ -0,0 +1,94 @@
+import pytest
+from allauth.account.models import EmailAddress
+from django.urls import reverse
+
+from core.metrics import Counter, Histogram, Registry
+
+
+def test_counter_and_histogram_render():
+    registry = Registry()
+    requests = Counter(
+        "requests", "Requests.", labelnames=("outcome",), registry=registry
+    )
+    latency = Histogram(
+        "latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry
+    )
+
+    requests.inc(outcome="success")
+    requests.inc(2, outcome="success")
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    output = registry.generate_latest()
+    assert "# TYPE requests counter" in output
+    assert 'requests_total{outcome="success"} 3' in output
+    assert 'latency_seconds_bucket{le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{le="1.0"} 2' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in output
+    assert "latency_seconds_count 2" in output
+
+
+def test_counter_rejects_unknown_labels():
+    registry = Registry()
+    counter = Counter("things", "Things.", labelnames=("kind",), registry=registry)
+
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_multiprocess_store_aggregates_files(tmp_path):
+    registry = Registry(multiproc_dir=str(tmp_path))
+    counter = Counter("jobs", "Jobs.", registry=registry)
+    counter.inc()
+
+    # Simulate a second worker writing to its own file in the same directory
+    other = Registry(multiproc_dir=str(tmp_path))
+    other._pid = -1
+    other._store = type(registry.store)(str(tmp_path / "metrics_other.db"))
+    Counter("jobs", "Jobs.", registry=other).inc(4)
+
+    assert "jobs_total 5" in registry.generate_latest()
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_verification_outcomes(client, user):
+    EmailAddress.objects.create(
+        user=user, email=user.email, verified=True, primary=True
+    )
+    client.post(reverse("rest_verify_email"), {"email": user.email, "code": "123456"})
+
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert (
+        'auth_email_verifications_total{method="code",outcome="already_verified"}'
+        in body
+    )
+    assert 'auth_request_duration_seconds_count{endpoint="verify_email"}' in body
+
+
+def test_metrics_endpoint_hidden_from_other_addresses(client):
+    response = client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.7")
+    assert response.status_code == 404
+
+    # A forwarded header naming an allowed address does not help
+    response = client.get(
+        reverse("metrics"), REMOTE_ADDR="203.0.113.7", HTTP_X_FORWARDED_FOR="127.0.0.1"
+    )
+    assert response.status_code == 404
+
+
+def test_metrics_endpoint_accepts_allowed_network_or_token(client, settings):
+    settings.METRICS_ALLOWED_IPS = ["10.0.0.0/8"]
+    settings.METRICS_TOKEN = "scrape-secret"
+
+    assert client.get(reverse("metrics"), REMOTE_ADDR="10.1.2.3").status_code == 200
+    assert client.get(reverse("metrics")).status_code == 404
+    assert (
+        client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code
+        == 404
+    )
+    response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+    assert response.status_code == 200
@@ -0,0 +1,203 @@
+"""
+Performance regression suite for the authentication endpoints.
+
+Each test pins the number of queries an endpoint issues and a generous
+latency ceiling for the median of several calls under the test settings
+(MD5 hasher, in-memory SQLite, LocMemCache). Excluded from the default run;
+use ``make test-perf`` or ``pytest -m perf -n 0``.
+"""
+
+import statistics
+import time
+
+import pytest
+from allauth.account.models import EmailAddress, EmailConfirmation
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.perf, pytest.mark.django_db]
+
+ROUNDS = 15
+
+
+def median_ms(call, rounds=ROUNDS):
+    call()  # warm caches and lazy imports
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def verified_user(user):
+    EmailAddress.objects.create(
+        user=user, email=user.email, verified=True, primary=True
+    )
+    return user
+
+
+@pytest.fixture
+def tokens(api_client, verified_user):
+    response = api_client.post(
+        reverse("rest_login"), {"email": verified_user.email, "password": "user123"}
+    )
+    assert response.status_code == 200
+    return response.data
+
+
+def test_login(api_client, verified_user, django_assert_max_num_queries):
+    payload = {"email": verified_user.email, "password": "user123"}
+
+    def call():
+        assert api_client.post(reverse("rest_login"), payload).status_code == 200
+
+    with django_assert_max_num_queries(QUERIES["login"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["login"]
+
+
+def test_register(api_client, django_assert_max_num_queries):
+    counter = iter(range(1000))
+
+    def call():
+        n = next(counter)
+        payload = {
+            "email": f"perf{n}@example.com",
+            "password1": "StrongPass123!",
+            "password2": "StrongPass123!",
+        }
+        assert api_client.post(reverse("rest_register"), payload).status_code == 201
+
+    with django_assert_max_num_queries(QUERIES["register"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["register"]
+
+
+def test_verify_email_with_code(api_client, user, django_assert_max_num_queries):
+    from authentication.utils import generate_verification_code
+
+    address = EmailAddress.objects.create(user=user, email=user.email, verified=False)
+
+    def call():
+        EmailAddress.objects.filter(pk=address.pk).update(verified=False)
+        confirmation = EmailConfirmation.objects.create(
+            email_address=address,
+            key=f"perf-{time.perf_counter_ns()}",
+            sent=timezone.now(),
+        )
+        payload = {
+            "email": user.email,
+            "code": generate_verification_code(confirmation.key),
+        }
+        with django_assert_max_num_queries(QUERIES["verify_email"]):
+            assert (
+                api_client.post(reverse("rest_verify_email"), payload).status_code
+                == 200
+            )
+
+    assert median_ms(call) < LATENCY_MS["verify_email"]
+
+
+def test_token_refresh(api_client, tokens, django_assert_max_num_queries):
+    state = {"refresh": tokens["refresh"]}
+
+    def call():
+        response = api_client.post(reverse("token_refresh"), state)
+        assert response.status_code == 200
+        state["refresh"] = response.data["refresh"]
+
+    with django_assert_max_num_queries(QUERIES["token_refresh"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["token_refresh"]
+
+
+def test_token_verify(api_client, tokens, django_assert_max_num_queries):
+    def call():
+        response = api_client.post(reverse("token_verify"), {"token": tokens["access"]})
+        assert response.status_code == 200
+
+    with django_assert_max_num_queries(QUERIES["token_verify"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["token_verify"]
+
+
+def test_session_list(api_client, tokens, django_assert_max_num_queries):
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def call():
+        assert api_client.get(reverse("session_list")).status_code == 200
+
+    with django_assert_max_num_queries(QUERIES["session_list"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["session_list"]
+
+
+def test_logout(api_client, verified_user, django_assert_max_num_queries):
+    payload = {"email": verified_user.email, "password": "user123"}
+
+    def call():
+        refresh = api_client.post(reverse("rest_login"), payload).data["refresh"]
+        with django_assert_max_num_queries(QUERIES["logout"]):
+            response = api_client.post(reverse("rest_logout"), {"refresh": refresh})
+        assert response.status_code == 200
+
+    call()
+
+
+def test_current_user_not_modified(api_client, tokens, django_assert_max_num_queries):
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    etag = api_client.get(reverse("rest_user_details"))["ETag"]
+
+    def call():
+        response = api_client.get(reverse("rest_user_details"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    with django_assert_max_num_queries(QUERIES["current_user_not_modified"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["current_user_not_modified"]
+
+
+def test_user_list(api_client, admin_user, django_assert_max_num_queries):
+    api_client.force_authenticate(admin_user)
+
+    def call():
+        assert (
+            api_client.get(reverse("user_list"), {"verified": "false"}).status_code
+            == 200
+        )
+
+    with django_assert_max_num_queries(QUERIES["user_list"]):
+        call()
+    assert median_ms(call) < LATENCY_MS["user_list"]
+
+
+QUERIES = {
+    "login": 12,
+    "register": 15,
+    "verify_email": 14,
+    "token_refresh": 5,
+    "token_verify": 0,
+    "session_list": 2,
+    "logout": 6,
+    "current_user_not_modified": 0,
+    "user_list": 1,
+}
+
+LATENCY_MS = {
+    "login": 50,
+    "register": 100,
+    "verify_email": 50,
+    "token_refresh": 25,
+    "token_verify": 10,
+    "session_list": 25,
+    "current_user_not_modified": 10,
+    "user_list": 25,
+}
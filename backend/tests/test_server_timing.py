@@ -0,0 +1,85 @@
+import json
+import logging
+import re
+
+import pytest
+from allauth.account.models import EmailAddress, EmailConfirmation
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import timing
+
+
+def test_phase_is_noop_without_active_collector():
+    with timing.phase("db"):
+        pass
+
+    assert timing.current() is None
+
+
+def test_phase_accumulates_duration_and_count():
+    token = timing.activate()
+    try:
+        with timing.phase("cache"):
+            pass
+        with timing.phase("cache"):
+            pass
+        duration, count = timing.current().phases["cache"]
+    finally:
+        timing.deactivate(token)
+
+    assert count == 2
+    assert duration >= 0
+
+
+@pytest.mark.django_db
+def test_no_header_when_disabled(client):
+    response = client.get(reverse("home"))
+
+    assert "Server-Timing" not in response
+
+
+@pytest.mark.django_db
+@override_settings(SERVER_TIMING_ENABLED=True)
+def test_login_reports_phases(client, user, caplog):
+    EmailAddress.objects.create(
+        user=user, email=user.email, verified=True, primary=True
+    )
+
+    with caplog.at_level(logging.INFO, logger="core.timing"):
+        response = client.post(
+            reverse("rest_login"), {"email": user.email, "password": "user123"}
+        )
+
+    assert response.status_code == 200
+    header = response["Server-Timing"]
+    for name in ("db;", "hash;", "jwt;", "total;"):
+        assert name in header
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["event"] == "request_timing"
+    assert record["status"] == 200
+    assert "db" in record["phases"]
+
+
+@pytest.mark.django_db
+@override_settings(SERVER_TIMING_ENABLED=True)
+def test_cache_calls_are_timed_at_the_backend(client, user):
+    address = EmailAddress.objects.create(
+        user=user, email=user.email, verified=False, primary=True
+    )
+    confirmation = EmailConfirmation.create(address)
+    confirmation.sent = timezone.now()
+    confirmation.save()
+    backend = caches["default"]
+
+    response = client.post(
+        reverse("rest_verify_email"), {"email": user.email, "code": "000000"}
+    )
+
+    assert response.status_code == 400
+    # The failed-attempt counter is read and written through the cache
+    assert re.search(r'cache;dur=[\d.]+;desc="[2-9]\d*x"', response["Server-Timing"])
+    assert caches["default"] is backend
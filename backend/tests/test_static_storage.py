@@ -0,0 +1,40 @@
+import gzip
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.storage.CompressedManifestStaticFilesStorage"},
+}
+
+
+def collectstatic():
+    out = StringIO()
+    call_command("collectstatic", interactive=False, verbosity=1, stdout=out)
+    return out.getvalue()
+
+
+def test_collectstatic_writes_hashed_and_precompressed_files(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path, STORAGES=STORAGES):
+        collectstatic()
+
+    manifest = json.loads((tmp_path / "staticfiles.json").read_text())
+    hashed = manifest["paths"]["admin/css/base.css"]
+    assert hashed != "admin/css/base.css"
+
+    compressed = tmp_path / (hashed + ".gz")
+    assert compressed.exists()
+    assert gzip.decompress(compressed.read_bytes()) == (tmp_path / hashed).read_bytes()
+
+
+def test_collectstatic_skips_unchanged_sources(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path, STORAGES=STORAGES):
+        first = collectstatic()
+        second = collectstatic()
+
+    assert "post-processed" in first
+    assert "0 static files copied" in second
+    assert "post-processed" not in second
@@ -0,0 +1,46 @@
+// Follows a pending signup's email verification over server-sent events,
+// using the `status_token` returned by POST /api/auth/registration/.
+// EventSource reconnects on its own when the server ends a long stream.
+
+export interface VerificationStatus {
+  verified: boolean
+}
+
+export interface WatchOptions {
+  baseUrl?: string
+  onStatus?: (status: VerificationStatus) => void
+  onError?: (event: Event) => void
+}
+
+const DEFAULT_BASE_URL: string = import.meta.env.VITE_API_URL ?? ''
+
+/**
+ * Calls `onVerified` once the address behind `statusToken` is verified.
+ * Returns a function that closes the stream.
+ */
+export function watchVerificationStatus(
+  statusToken: string,
+  onVerified: () => void,
+  { baseUrl = DEFAULT_BASE_URL, onStatus, onError }: WatchOptions = {},
+): () => void {
+  const url = `${baseUrl}/api/auth/registration/status/?token=${encodeURIComponent(statusToken)}`
+  const source = new EventSource(url)
+
+  source.addEventListener('status', (event) => {
+    const status: VerificationStatus = JSON.parse((event as MessageEvent<string>).data)
+    onStatus?.(status)
+    if (status.verified) {
+      source.close()
+      onVerified()
+    }
+  })
+
+  source.onerror = (event) => {
+    // A rejected (expired) token is final; anything else is retried
+    if (source.readyState === EventSource.CLOSED) {
+      onError?.(event)
+    }
+  }
+
+  return () => source.close()
+}
@@ -0,0 +1,40 @@
+#!/bin/bash
+
+# Measure how many requests Nginx's micro-cache answers without reaching Django
+# Usage: ./scripts/bench-microcache.sh [url] [requests] [concurrency]
+# Example: ./scripts/bench-microcache.sh http://localhost:8018/ 2000 20
+#
+# Requires the production Nginx profile (nginx.prod.conf), which adds an
+# X-Cache-Status header to proxied responses.
+
+set -e
+
+URL="${1:-http://localhost:8018/}"
+REQUESTS="${2:-1000}"
+CONCURRENCY="${3:-10}"
+
+echo "🔍 Benchmarking $URL ($REQUESTS requests, concurrency $CONCURRENCY)..."
+
+START=$(date +%s.%N)
+STATUSES=$(seq "$REQUESTS" | xargs -P "$CONCURRENCY" -I{} \
+    curl -s -o /dev/null -D - "$URL" \
+    | tr -d '\r' | awk -F': ' 'tolower($1) == "x-cache-status" { print $2 }')
+END=$(date +%s.%N)
+
+count() { echo "$STATUSES" | grep -c "^$1$" || true; }
+
+HIT=$(count HIT)
+STALE=$(count STALE)
+UPDATING=$(count UPDATING)
+MISS=$(count MISS)
+EXPIRED=$(count EXPIRED)
+BYPASS=$(count BYPASS)
+AVOIDED=$((HIT + STALE + UPDATING))
+
+echo ""
+echo "📊 Cache status:"
+echo "  HIT=$HIT STALE=$STALE UPDATING=$UPDATING MISS=$MISS EXPIRED=$EXPIRED BYPASS=$BYPASS"
+echo ""
+echo "✔ Upstream hits avoided: $AVOIDED / $REQUESTS ($(awk "BEGIN { printf \"%.1f\", 100 * $AVOIDED / $REQUESTS }")%)"
+echo "✔ Upstream hits:         $((MISS + EXPIRED + BYPASS))"
+echo "✔ Wall time:             $(awk "BEGIN { printf \"%.2f\", $END - $START }")s"
@@ -0,0 +1,56 @@
+#!/bin/bash
+
+# Load-test the API through Nginx and report latency and upstream connection churn
+# Usage: ./scripts/nginx-loadtest.sh [url] [requests] [concurrency]
+# Example: ./scripts/nginx-loadtest.sh http://localhost:8018/api/auth/login/ 5000 50
+#
+# Run it once per Nginx profile to compare before/after:
+#   docker compose build nginx && docker compose up -d nginx
+#   ./scripts/nginx-loadtest.sh
+#   docker compose build --build-arg NGINX_CONF=nginx.prod.conf nginx && docker compose up -d nginx
+#   ./scripts/nginx-loadtest.sh
+#
+# Latency comes from ApacheBench (ab) when installed, otherwise from curl.
+# Connection churn is the number of sockets to the API port left in TIME_WAIT
+# inside the api container: every upstream connection that is opened and
+# closed instead of reused leaves one behind.
+
+set -e
+
+URL="${1:-http://localhost:8018/}"
+REQUESTS="${2:-2000}"
+CONCURRENCY="${3:-20}"
+API_PORT_HEX=$(printf '%04X' 8000)
+
+time_wait_count() {
+    # /proc/net/tcp state 06 is TIME_WAIT; column 2 is local_address:port
+    docker compose exec -T api sh -c "cat /proc/net/tcp /proc/net/tcp6 2>/dev/null" \
+        | awk -v port=":$API_PORT_HEX" '$4 == "06" && index($2, port) { n++ } END { print n + 0 }'
+}
+
+echo "🔍 Load testing $URL ($REQUESTS requests, concurrency $CONCURRENCY)..."
+
+BEFORE=$(time_wait_count)
+
+if command -v ab >/dev/null 2>&1; then
+    ab -q -k -n "$REQUESTS" -c "$CONCURRENCY" "$URL" \
+        | grep -E "Requests per second|Time per request|Failed requests|50%|95%|99%"
+else
+    echo "(…) ab not found, falling back to curl timings"
+    seq "$REQUESTS" | xargs -P "$CONCURRENCY" -I{} \
+        curl -s -o /dev/null -w "%{time_total}\n" "$URL" \
+        | sort -n | awk '
+            { t[NR] = $1; sum += $1 }
+            END {
+                printf "  mean: %.1f ms\n", 1000 * sum / NR
+                printf "  p50:  %.1f ms\n", 1000 * t[int(NR * 0.50)]
+                printf "  p95:  %.1f ms\n", 1000 * t[int(NR * 0.95)]
+                printf "  p99:  %.1f ms\n", 1000 * t[int(NR * 0.99)]
+            }'
+fi
+
+AFTER=$(time_wait_count)
+
+echo ""
+echo "✔ Upstream connections churned (new TIME_WAIT on api:8000): $((AFTER - BEFORE))"
+echo "  With the keepalive pool this stays close to 0; without it, it grows with every request."